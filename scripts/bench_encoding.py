@@ -0,0 +1,136 @@
+"""Benchmark: gateway CPU cost of encoding_format="float" vs "base64".
+
+GPU나 실제 백엔드 없이 게이트웨이 자체 비용만 측정한다.
+TEI 백엔드의 HTTP 클라이언트를 미리 만들어 둔 응답을 돌려주는 MockTransport로 바꾸고,
+ASGI로 /v1/embeddings를 직접 호출해 요청당 CPU 시간과 응답 바이트를 비교한다.
+
+    uv run python scripts/bench_encoding.py --dims 1024 --batch 256 --requests 50
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from embedding_gateway import router as router_module
+from embedding_gateway.backends.tei import TEIBackend
+from embedding_gateway.registry import ModelRegistry
+from embedding_gateway.router import router
+from embedding_gateway.vectors import pack_float32
+
+MODEL = "intfloat/multilingual-e5-large-instruct"
+
+
+def build_payloads(dims: int, batch: int) -> dict[str, bytes]:
+    """TEI가 반환할 float/base64 응답 본문을 미리 만들어 둔다."""
+    rng = random.Random(0)
+    vectors = [[rng.uniform(-1, 1) for _ in range(dims)] for _ in range(batch)]
+    usage = {"prompt_tokens": batch * 8, "total_tokens": batch * 8}
+    as_float = {
+        "object": "list",
+        "data": [
+            {"object": "embedding", "embedding": v, "index": i}
+            for i, v in enumerate(vectors)
+        ],
+        "model": MODEL,
+        "usage": usage,
+    }
+    as_base64 = {
+        **as_float,
+        "data": [
+            {
+                "object": "embedding",
+                "embedding": base64.b64encode(pack_float32(v)).decode("ascii"),
+                "index": i,
+            }
+            for i, v in enumerate(vectors)
+        ],
+    }
+    return {
+        "float": json.dumps(as_float).encode(),
+        "base64": json.dumps(as_base64).encode(),
+    }
+
+
+async def run(dims: int, batch: int, requests: int) -> list[dict]:
+    payloads = build_payloads(dims, batch)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        fmt = json.loads(request.content).get("encoding_format", "float")
+        return httpx.Response(
+            200, content=payloads[fmt], headers={"content-type": "application/json"}
+        )
+
+    tei = TEIBackend(base_url="http://tei", default_model=MODEL, available_models=[MODEL])
+    tei.client = httpx.AsyncClient(
+        base_url="http://tei", transport=httpx.MockTransport(handler)
+    )
+    reg = ModelRegistry()
+    reg.register_backend("tei", tei)
+    reg.register_model(MODEL, tei)
+    router_module.registry = reg
+    router_module.cache = None
+    router_module.store = None
+
+    app = FastAPI()
+    app.include_router(router)
+    texts = [f"benchmark text {i}" for i in range(batch)]
+
+    results = []
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://gateway"
+    ) as client:
+        for fmt in ("float", "base64"):
+            body = {"input": texts, "model": MODEL, "encoding_format": fmt}
+            await client.post("/v1/embeddings", json=body)  # warm-up
+
+            size = 0
+            cpu0 = time.process_time()
+            wall0 = time.perf_counter()
+            for _ in range(requests):
+                r = await client.post("/v1/embeddings", json=body)
+                r.raise_for_status()
+                size = len(r.content)
+            cpu = (time.process_time() - cpu0) / requests
+            wall = (time.perf_counter() - wall0) / requests
+            results.append({
+                "encoding_format": fmt,
+                "response_bytes": size,
+                "cpu_ms_per_request": round(cpu * 1000, 2),
+                "wall_ms_per_request": round(wall * 1000, 2),
+            })
+
+    await tei.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dims", type=int, default=1024)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dims, args.batch, args.requests))
+
+    print(f"\n  dims={args.dims} batch={args.batch} requests={args.requests}")
+    print(f"  {'format':<8s} {'bytes':>12s} {'cpu/req':>10s} {'wall/req':>10s}")
+    for r in results:
+        print(
+            f"  {r['encoding_format']:<8s} {r['response_bytes']:>12,d} "
+            f"{r['cpu_ms_per_request']:>8.2f}ms {r['wall_ms_per_request']:>8.2f}ms"
+        )
+    base, b64 = results
+    print(
+        f"\n  base64: {b64['response_bytes'] / base['response_bytes']:.0%} bytes, "
+        f"{b64['cpu_ms_per_request'] / base['cpu_ms_per_request']:.0%} CPU vs float\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
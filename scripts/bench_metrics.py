@@ -0,0 +1,121 @@
+"""Benchmark: /metrics instrumentation overhead on the /v1/embeddings hot path.
+
+bench_passthrough.py와 같이 TEI 응답을 MockTransport로 돌려주고 ASGI로 직접 호출한다.
+
+- micro: 요청 하나 기록(inflight inc/dec + histogram 2개 + counter 2개) 비용
+- off/on: 작은 요청(기본 1개 × 384차원)의 요청당 게이트웨이 CPU, 메트릭 기록 끔/켬
+  (on은 백엔드 응답 status hook 포함)
+
+    uv run python scripts/bench_metrics.py --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from embedding_gateway import metrics
+from embedding_gateway import router as router_module
+from embedding_gateway.backends.tei import TEIBackend
+from embedding_gateway.registry import ModelRegistry
+from embedding_gateway.router import router
+
+MODEL = "intfloat/multilingual-e5-large-instruct"
+
+
+def micro(ops: int) -> float:
+    """요청 하나를 기록하는 데 드는 ns."""
+    observed = metrics.RequestMetrics("bench-model", "bench")
+    started = time.perf_counter_ns()
+    for i in range(ops):
+        observed.inflight.inc()
+        observed.tokens.inc(8)
+        observed.finish(200, 1, 0.003 + (i % 7) * 0.01)
+    return (time.perf_counter_ns() - started) / ops
+
+
+async def run(dims: int, batch: int, requests: int) -> dict[str, float]:
+    rng = random.Random(0)
+    payload = json.dumps({
+        "object": "list",
+        "data": [
+            {"object": "embedding", "embedding": [rng.uniform(-1, 1) for _ in range(dims)], "index": i}
+            for i in range(batch)
+        ],
+        "model": MODEL,
+        "usage": {"prompt_tokens": batch * 8, "total_tokens": batch * 8},
+    }).encode()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=payload, headers={"content-type": "application/json"})
+
+    tei = TEIBackend(base_url="http://tei", default_model=MODEL, available_models=[MODEL])
+    reg = ModelRegistry()
+    reg.register_backend("tei", tei)
+    reg.register_model(MODEL, tei)
+    router_module.registry = reg
+    router_module.cache = None
+    router_module.store = None
+    router_module.singleflight = None
+    router_module.passthrough = False
+
+    app = FastAPI()
+    app.include_router(router)
+    body = {"input": [f"benchmark text {i}" for i in range(batch)], "model": MODEL}
+
+    results = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://gateway"
+    ) as client:
+        for mode, enabled in (("off", False), ("on", True), ("off", False), ("on", True)):
+            metrics.enabled = enabled
+            hooks = {"response": [metrics.response_hook("tei")]} if enabled else {}
+            await tei.client.aclose()
+            tei.client = httpx.AsyncClient(
+                base_url="http://tei",
+                transport=httpx.MockTransport(handler),
+                event_hooks=hooks,
+            )
+            await client.post("/v1/embeddings", json=body)  # warm-up
+
+            cpu0 = time.process_time()
+            for _ in range(requests):
+                r = await client.post("/v1/embeddings", json=body)
+                r.raise_for_status()
+            cpu_us = (time.process_time() - cpu0) * 1e6 / requests
+            # 두 번씩 측정해 더 낮은 값 사용 (warm-up/GC 영향 완화)
+            results[mode] = min(results.get(mode, cpu_us), cpu_us)
+
+        scrape = await client.get("/metrics")
+        results["scrape_bytes"] = len(scrape.content)
+
+    await tei.close()
+    metrics.enabled = True
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dims", type=int, default=384)
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    per_record = micro(args.ops)
+    results = asyncio.run(run(args.dims, args.batch, args.requests))
+
+    print(f"\n  dims={args.dims} batch={args.batch} requests={args.requests}")
+    print(f"  record one request:   {per_record:8.0f} ns")
+    print(f"  request CPU (off):    {results['off']:8.1f} us")
+    print(f"  request CPU (on):     {results['on']:8.1f} us")
+    print(f"  overhead:             {(results['on'] / results['off'] - 1):+8.1%}")
+    print(f"  /metrics size:        {results['scrape_bytes']:8,d} bytes\n")
+
+
+if __name__ == "__main__":
+    main()
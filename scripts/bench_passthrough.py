@@ -0,0 +1,164 @@
+"""Benchmark: gateway CPU per 1k vectors for the /v1/embeddings response path.
+
+bench_encoding.py와 같이 TEI 응답을 MockTransport로 돌려주고 ASGI로 직접 호출한다.
+
+- legacy:      벡터마다 pydantic 검증 + response_model 재검증/직렬화 (이전 방식)
+- single-pass: backend JSON 파싱 후 plain dict를 한 번에 인코딩 (orjson 있으면 사용)
+- passthrough: backend 응답 바이트에서 "model"만 교체해 그대로 반환
+- passthrough+cache: 기본 설정(cache + single-flight on)에서 캐시 miss인 요청.
+  응답 바이트는 그대로 돌려주고 캐시를 채우기 위해 한 번 파싱한다
+
+    uv run python scripts/bench_passthrough.py --dims 1024 --batch 256 --requests 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from embedding_gateway import responses
+from embedding_gateway import router as router_module
+from embedding_gateway.backends.tei import TEIBackend
+from embedding_gateway.cache import EmbeddingCache
+from embedding_gateway.models import (
+    EmbeddingData,
+    EmbeddingRequest,
+    EmbeddingResponse,
+    UsageInfo,
+)
+from embedding_gateway.registry import ModelRegistry
+from embedding_gateway.router import router
+from embedding_gateway.singleflight import SingleFlight
+
+MODEL = "intfloat/multilingual-e5-large-instruct"
+
+
+def build_payload(dims: int, batch: int) -> bytes:
+    rng = random.Random(0)
+    return json.dumps({
+        "object": "list",
+        "data": [
+            {
+                "object": "embedding",
+                "embedding": [rng.uniform(-1, 1) for _ in range(dims)],
+                "index": i,
+            }
+            for i in range(batch)
+        ],
+        "model": MODEL,
+        "usage": {"prompt_tokens": batch * 8, "total_tokens": batch * 8},
+    }).encode()
+
+
+def build_app(tei: TEIBackend) -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+
+    @app.post("/legacy/embeddings", response_model=EmbeddingResponse)
+    async def legacy(request: EmbeddingRequest) -> EmbeddingResponse:
+        # 이전 경로: 백엔드 JSON → EmbeddingData 검증 → EmbeddingResponse → response_model
+        response = await tei.client.post(
+            "/v1/embeddings", json={"input": request.input, "model": request.model}
+        )
+        data = response.json()
+        return EmbeddingResponse(
+            data=[
+                EmbeddingData(embedding=d["embedding"], index=d["index"])
+                for d in data["data"]
+            ],
+            model=request.model,
+            usage=UsageInfo(**data["usage"]),
+        )
+
+    return app
+
+
+async def run(dims: int, batch: int, requests: int) -> list[dict]:
+    payload = build_payload(dims, batch)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/info":
+            return httpx.Response(200, json={"model_id": MODEL})
+        return httpx.Response(
+            200, content=payload, headers={"content-type": "application/json"}
+        )
+
+    tei = TEIBackend(base_url="http://tei", default_model=MODEL, available_models=[MODEL])
+    tei.client = httpx.AsyncClient(
+        base_url="http://tei", transport=httpx.MockTransport(handler)
+    )
+    reg = ModelRegistry()
+    reg.register_backend("tei", tei)
+    reg.register_model(MODEL, tei)
+    router_module.registry = reg
+    router_module.store = None
+
+    app = build_app(tei)
+    modes = [
+        ("legacy", "/legacy/embeddings", False, False),
+        ("single-pass", "/v1/embeddings", False, False),
+        ("passthrough", "/v1/embeddings", True, False),
+        ("passthrough+cache", "/v1/embeddings", True, True),
+    ]
+    sent = 0
+
+    def body() -> dict:
+        # 요청마다 다른 텍스트 (캐시가 켜진 모드도 항상 miss)
+        nonlocal sent
+        sent += 1
+        return {"input": [f"benchmark text {sent} {i}" for i in range(batch)], "model": MODEL}
+
+    results = []
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://gateway"
+    ) as client:
+        for name, path, passthrough, cached in modes:
+            router_module.passthrough = passthrough
+            router_module.cache = EmbeddingCache(max_bytes=1 << 30) if cached else None
+            router_module.singleflight = SingleFlight() if cached else None
+            await client.post(path, json=body())  # warm-up
+
+            cpu0 = time.process_time()
+            for _ in range(requests):
+                r = await client.post(path, json=body())
+                r.raise_for_status()
+            cpu = time.process_time() - cpu0
+            results.append({
+                "mode": name,
+                "response_bytes": len(r.content),
+                "cpu_ms_per_1k_vectors": round(cpu * 1000 / (requests * batch) * 1000, 2),
+            })
+
+    await tei.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dims", type=int, default=1024)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dims, args.batch, args.requests))
+
+    encoder = "orjson" if responses.orjson is not None else "json"
+    print(f"\n  dims={args.dims} batch={args.batch} requests={args.requests} encoder={encoder}")
+    print(f"  {'mode':<18s} {'bytes':>12s} {'cpu/1k vectors':>16s}")
+    for r in results:
+        print(
+            f"  {r['mode']:<18s} {r['response_bytes']:>12,d} "
+            f"{r['cpu_ms_per_1k_vectors']:>14.2f}ms"
+        )
+    legacy = results[0]["cpu_ms_per_1k_vectors"]
+    for r in results[1:]:
+        print(f"  {r['mode']}: {r['cpu_ms_per_1k_vectors'] / legacy:.0%} of legacy CPU")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark: model name resolution with thousands of registered models.
+
+이전 방식(등록 순서대로 startswith 선형 탐색)과 alias 표 + trie 인덱스를,
+memo를 끈 상태와 켠 상태로 비교한다.
+
+    uv run python scripts/bench_registry.py --models 5000 --lookups 20000
+"""
+
+import argparse
+import random
+import time
+
+from embedding_gateway.registry import ModelRegistry
+
+
+def linear_resolve(model_map: dict, model_name: str) -> str | None:
+    """이전 ModelRegistry.resolve_model."""
+    if model_name in model_map:
+        return model_name
+    for registered in model_map:
+        if model_name.startswith(registered) or registered.startswith(model_name):
+            return registered
+    return None
+
+
+def build_names(count: int) -> list[str]:
+    rng = random.Random(0)
+    orgs = ["intfloat", "BAAI", "nlpai-lab", "jinaai", "sentence-transformers", "Snowflake"]
+    names = []
+    for i in range(count):
+        if i % 2:
+            names.append(f"{rng.choice(orgs)}/model-{i:05d}-v{i % 3}")
+        else:
+            names.append(f"embed-{i:05d}:{rng.choice(['0.6b', '4b', 'q8_0'])}")
+    return names
+
+
+def build_queries(names: list[str], lookups: int) -> dict[str, list[str]]:
+    rng = random.Random(1)
+    picks = [rng.choice(names) for _ in range(lookups)]
+    return {
+        "exact": picks,
+        "alias (:latest / case)": [f"{n.upper()}:latest" for n in picks],
+        "prefix": [n.rsplit(":", 1)[0] if ":" in n else n[:-3] for n in picks],
+        "miss": [f"unknown-{i}" for i in range(lookups)],
+    }
+
+
+def timed(fn, queries: list[str]) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    names = build_names(args.models)
+    backend = object()
+    reg = ModelRegistry()
+    start = time.perf_counter()
+    for name in names:
+        reg.register_model(name, backend)
+    build_ms = (time.perf_counter() - start) * 1000
+    model_map = dict.fromkeys(names, backend)
+
+    print(f"\n  models={args.models} lookups={args.lookups} index build={build_ms:.1f}ms")
+    print(f"  {'query':<24s} {'linear':>12s} {'index':>12s} {'index+memo':>12s}")
+    for kind, queries in build_queries(names, args.lookups).items():
+        linear_queries = queries[: max(len(queries) // 20, 100)]  # 선형 탐색은 느려서 일부만
+        linear = timed(lambda q: linear_resolve(model_map, q), linear_queries)
+        index = timed(reg._lookup, queries)
+        memo = timed(reg.resolve_model, queries)
+        print(f"  {kind:<24s} {linear:>10.2f}us {index:>10.2f}us {memo:>10.2f}us")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Load test: drive the gateway with concurrent /v1/embeddings traffic.
+
+benchmark.py는 요청을 하나씩 보내 cold/warm 지연만 측정한다. 이 스크립트는 비동기로 부하를 건다.
+
+- closed-loop: --concurrency개 worker가 응답을 받는 즉시 다음 요청을 보냄
+- open-loop:   --rate req/s로 (Poisson 도착) 응답과 무관하게 요청을 보냄.
+               지연은 예정 발송 시각부터 측정 (coordinated omission 방지)
+- --models "bge-m3=3,nlpai-lab/KURE-v1=1": 가중치에 따라 모델을 섞음
+- --batch "1=8,16=2,128=1": 요청당 input 개수 분포 (값=가중치)
+- --text-words "uniform:5-60" | "lognormal:20,0.6" | "fixed:32": 텍스트 길이(단어 수) 분포
+- --warmup초 동안의 요청은 집계에서 제외
+
+결과(throughput, p50/p90/p99/p999, 오류율)를 출력하고 --output에 JSON으로 저장한다.
+--baseline으로 이전 결과와 비교해 --max-regression을 넘게 나빠지면 exit code 1.
+
+    uv run python scripts/loadtest.py --models bge-m3 --concurrency 32 --duration 30
+    uv run python scripts/loadtest.py --rate 200 --duration 60 --output run.json --baseline base.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+import httpx
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+_WORDS = (
+    "embedding gateway vector search retrieval semantic query document passage "
+    "model latency throughput 임베딩 게이트웨이 검색 문서 문장 질의 모델 벡터 "
+    "the quick brown fox jumps over lazy dog lorem ipsum dolor sit amet"
+).split()
+
+
+@dataclass
+class LoadConfig:
+    url: str = "http://localhost:8000"
+    models: dict[str, float] = field(default_factory=lambda: {"bge-m3": 1.0})
+    batch: dict[int, float] = field(default_factory=lambda: {1: 1.0})
+    text_words: str = "uniform:5-60"
+    concurrency: int = 16
+    rate: float = 0.0  # > 0이면 open-loop
+    max_inflight: int = 1024  # open-loop에서 동시에 보낼 수 있는 최대 요청 수
+    duration: float = 30.0
+    warmup: float = 5.0
+    timeout: float = 120.0
+    seed: int = 0
+
+
+@dataclass
+class Sample:
+    model: str
+    started: float
+    latency: float
+    status: int  # 0 = 연결 오류/timeout
+    texts: int
+    tokens: int
+
+
+def parse_weights(value: str, cast=str) -> dict:
+    """"a=3,b=1" 또는 "a,b" (가중치 1) 형식."""
+    weights = {}
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.rpartition("=") if "=" in part else (part, "", "1")
+        weights[cast(name.strip())] = float(weight)
+    if not weights:
+        raise ValueError(f"empty weight list: {value!r}")
+    return weights
+
+
+def text_length_sampler(spec: str, rng: random.Random):
+    """단어 수 분포 spec → 길이를 뽑는 함수."""
+    kind, _, args = spec.partition(":")
+    if kind == "fixed":
+        n = int(args)
+        return lambda: n
+    if kind == "uniform":
+        lo, hi = (int(x) for x in args.split("-"))
+        return lambda: rng.randint(lo, hi)
+    if kind == "lognormal":
+        median, sigma = (float(x) for x in args.split(","))
+        return lambda: max(1, round(rng.lognormvariate(math.log(median), sigma)))
+    raise ValueError(f"unknown text length distribution: {spec!r}")
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class RequestFactory:
+    def __init__(self, config: LoadConfig):
+        self.rng = random.Random(config.seed)
+        self.models = list(config.models)
+        self.model_weights = list(config.models.values())
+        self.batches = list(config.batch)
+        self.batch_weights = list(config.batch.values())
+        self.words = text_length_sampler(config.text_words, self.rng)
+        self.counter = 0
+
+    def next(self) -> tuple[str, dict]:
+        model = self.rng.choices(self.models, self.model_weights)[0]
+        batch = self.rng.choices(self.batches, self.batch_weights)[0]
+        texts = []
+        for _ in range(batch):
+            # 캐시/single-flight에 걸리지 않도록 요청마다 고유한 텍스트
+            self.counter += 1
+            words = self.rng.choices(_WORDS, k=self.words())
+            texts.append(f"{self.counter} " + " ".join(words))
+        return model, {"model": model, "input": texts}
+
+
+async def _send(client: httpx.AsyncClient, model: str, body: dict, started: float) -> Sample:
+    texts = len(body["input"])
+    try:
+        r = await client.post("/v1/embeddings", json=body)
+        tokens = r.json().get("usage", {}).get("prompt_tokens", 0) if r.status_code == 200 else 0
+        status = r.status_code
+    except (httpx.HTTPError, ValueError):
+        status, tokens = 0, 0
+    return Sample(model, started, time.perf_counter() - started, status, texts, tokens)
+
+
+async def run(config: LoadConfig, transport: httpx.AsyncBaseTransport | None = None) -> dict:
+    factory = RequestFactory(config)
+    samples: list[Sample] = []
+    limits = httpx.Limits(
+        max_connections=max(config.concurrency, config.max_inflight if config.rate else 0),
+        max_keepalive_connections=config.concurrency,
+    )
+    async with httpx.AsyncClient(
+        base_url=config.url, timeout=config.timeout, limits=limits, transport=transport
+    ) as client:
+        begin = time.perf_counter()
+        deadline = begin + config.warmup + config.duration
+
+        if config.rate > 0:
+            inflight = asyncio.Semaphore(config.max_inflight)
+            tasks: set[asyncio.Task] = set()
+            arrivals = random.Random(config.seed + 1)
+            scheduled = begin
+
+            async def fire(model: str, body: dict, at: float) -> None:
+                async with inflight:
+                    samples.append(await _send(client, model, body, at))
+
+            while scheduled < deadline:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                model, body = factory.next()
+                task = asyncio.create_task(fire(model, body, scheduled))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                scheduled += arrivals.expovariate(config.rate)
+            if tasks:
+                await asyncio.wait(tasks)
+        else:
+            async def worker() -> None:
+                while time.perf_counter() < deadline:
+                    model, body = factory.next()
+                    samples.append(await _send(client, model, body, time.perf_counter()))
+
+            await asyncio.gather(*(worker() for _ in range(config.concurrency)))
+
+    measured_from = begin + config.warmup
+    measured = [s for s in samples if s.started >= measured_from]
+    elapsed = max(min(time.perf_counter(), deadline) - measured_from, 1e-9)
+    return summarize(config, measured, elapsed)
+
+
+def _summary(samples: list[Sample], elapsed: float) -> dict:
+    ok = [s for s in samples if s.status == 200]
+    latencies = sorted(s.latency for s in ok)
+    errors: dict[str, int] = {}
+    for s in samples:
+        if s.status != 200:
+            key = str(s.status) if s.status else "connection"
+            errors[key] = errors.get(key, 0) + 1
+    return {
+        "requests": len(samples),
+        "ok": len(ok),
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "errors": errors,
+        "req_per_s": round(len(ok) / elapsed, 2),
+        "texts_per_s": round(sum(s.texts for s in ok) / elapsed, 2),
+        "tokens_per_s": round(sum(s.tokens for s in ok) / elapsed, 2),
+        "latency_ms": {
+            f"p{p:g}": round(percentile(latencies, p) * 1000, 2) for p in PERCENTILES
+        } | {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+    }
+
+
+def summarize(config: LoadConfig, samples: list[Sample], elapsed: float) -> dict:
+    by_model: dict[str, list[Sample]] = {}
+    for s in samples:
+        by_model.setdefault(s.model, []).append(s)
+    return {
+        "config": asdict(config),
+        "mode": "open-loop" if config.rate > 0 else "closed-loop",
+        "measured_s": round(elapsed, 3),
+        "overall": _summary(samples, elapsed),
+        "models": {m: _summary(ss, elapsed) for m, ss in sorted(by_model.items())},
+    }
+
+
+def compare(result: dict, baseline: dict, max_regression: float) -> list[str]:
+    """baseline 대비 max_regression(비율) 이상 나빠진 지표 목록."""
+    regressions = []
+    now, base = result["overall"], baseline["overall"]
+    for key in ("req_per_s", "texts_per_s"):
+        if base[key] and now[key] < base[key] * (1 - max_regression):
+            regressions.append(f"{key}: {base[key]} → {now[key]}")
+    for key, value in base["latency_ms"].items():
+        if value and now["latency_ms"].get(key, 0) > value * (1 + max_regression):
+            regressions.append(f"latency {key}: {value}ms → {now['latency_ms'][key]}ms")
+    if now["error_rate"] > base["error_rate"] + max_regression / 10:
+        regressions.append(f"error_rate: {base['error_rate']} → {now['error_rate']}")
+    return regressions
+
+
+def print_report(result: dict) -> None:
+    print(f"\n  {result['mode']}, measured {result['measured_s']}s")
+    header = (
+        f"  {'model':<40s} {'req':>7s} {'err%':>6s} {'req/s':>8s} {'texts/s':>9s} "
+        f"{'tok/s':>9s} {'p50':>9s} {'p90':>9s} {'p99':>9s} {'p99.9':>9s}"
+    )
+    print(header)
+    rows = list(result["models"].items())
+    if len(rows) > 1:
+        rows.append(("(all)", result["overall"]))
+    for name, s in rows:
+        lat = s["latency_ms"]
+        print(
+            f"  {name[:40]:<40s} {s['requests']:>7d} {s['error_rate'] * 100:>5.1f}% "
+            f"{s['req_per_s']:>8.1f} {s['texts_per_s']:>9.1f} {s['tokens_per_s']:>9.1f} "
+            f"{lat['p50']:>7.1f}ms {lat['p90']:>7.1f}ms {lat['p99']:>7.1f}ms {lat['p99.9']:>7.1f}ms"
+        )
+    if result["overall"]["errors"]:
+        print(f"  errors: {result['overall']['errors']}")
+    print()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[2:]),
+    )
+    parser.add_argument("--url", default=LoadConfig.url)
+    parser.add_argument("--models", default="bge-m3", help='"model=weight,..."')
+    parser.add_argument("--batch", default="1", help='"size=weight,..."')
+    parser.add_argument("--text-words", default=LoadConfig.text_words)
+    parser.add_argument("--concurrency", type=int, default=LoadConfig.concurrency)
+    parser.add_argument("--rate", type=float, default=0.0, help="req/s (open-loop)")
+    parser.add_argument("--max-inflight", type=int, default=LoadConfig.max_inflight)
+    parser.add_argument("--duration", type=float, default=LoadConfig.duration)
+    parser.add_argument("--warmup", type=float, default=LoadConfig.warmup)
+    parser.add_argument("--timeout", type=float, default=LoadConfig.timeout)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    config = LoadConfig(
+        url=args.url,
+        models=parse_weights(args.models),
+        batch=parse_weights(args.batch, int),
+        text_words=args.text_words,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        max_inflight=args.max_inflight,
+        duration=args.duration,
+        warmup=args.warmup,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+    text_length_sampler(config.text_words, random.Random())  # spec 검증
+
+    result = asyncio.run(run(config))
+    print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"  saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.max_regression)
+        if regressions:
+            print(f"  regressions vs {args.baseline} (> {args.max_regression:.0%}):")
+            for r in regressions:
+                print(f"    - {r}")
+            return 1
+        print(f"  no regressions vs {args.baseline} (threshold {args.max_regression:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
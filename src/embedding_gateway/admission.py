@@ -0,0 +1,341 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from embedding_gateway import metrics, timing
+from embedding_gateway.errors import AdmissionRejectedError
+
+# 요청 처리 시간 EWMA 가중치
+_EWMA_ALPHA = 0.2
+# 처리 시간을 아직 모를 때 Retry-After 최소값(초)
+MIN_RETRY_AFTER = 1.0
+# 우선순위 lane (앞쪽이 높음)
+LANES = ("interactive", "bulk")
+DEFAULT_TENANT = "default"
+
+
+class _Waiter:
+    """대기 요청. WFQ finish tag 순서로 정렬 (같으면 도착 순서)."""
+
+    __slots__ = ("finish", "seq", "start", "future")
+
+    def __init__(self, finish: float, seq: int, start: float, future: asyncio.Future):
+        self.finish = finish
+        self.seq = seq
+        self.start = start
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.finish, self.seq) < (other.finish, other.seq)
+
+
+class ConcurrencyLimiter:
+    """동시에 처리할 요청 수를 max_concurrency개로 제한하고 나머지는 lane별 FIFO 대기열에서 기다리게 한다.
+
+    - 슬롯이 나면 interactive lane을 먼저 진행시키되, 두 lane이 모두 대기 중일 때
+      bulk_share 비율만큼은 bulk에 양보해 bulk가 굶지 않게 한다.
+    - 대기열에 이미 max_queue개가 있으면 바로 거절한다. 단 interactive 요청은
+      가장 나중에 들어온 bulk 대기 요청을 밀어내고(429) 그 자리에 들어간다.
+    - 같은 lane 안에서는 tenant별 weighted fair queuing: 요청마다 finish tag
+      (max(virtual time, tenant의 직전 finish tag) + 텍스트 수 / weight)를 붙여 작은 순서로 진행한다.
+      tenant가 하나뿐이면 FIFO와 같다.
+    - 예상 대기 시간((앞선 대기 수 + 1) / max_concurrency × 평균 처리 시간)이
+      max_wait를 넘으면 바로 거절하고, 실제로 max_wait 이상 기다려도 거절한다.
+    - max_concurrency가 0이면 제한 없음 (처리 중 요청 수만 센다).
+
+    제한 값은 set_limits()로 실행 중에 바꿀 수 있다. 늘리면 대기 중인 요청을 바로 깨운다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 0,
+        max_queue: int = 0,
+        max_wait: float = 0.0,
+        bulk_share: float = 0.1,
+        weights: dict[str, float] | None = None,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.bulk_share = bulk_share
+        self.active = 0
+        self._waiters: dict[str, list[_Waiter]] = {lane: [] for lane in LANES}
+        self._bulk_credit = 0.0
+        # tenant별 가중치 (없으면 1), WFQ virtual time과 tenant별 마지막 finish tag
+        self.weights = weights if weights is not None else {}
+        self._virtual_time = 0.0
+        self._finish: dict[str, float] = {}
+        self._seq = itertools.count()
+        self.service_time: float | None = None
+        self.admitted = 0
+        self.queued_requests = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.rejected_queue_full = 0
+        self.rejected_wait = 0
+        self.preempted = 0
+        self._wait_metrics = {lane: metrics.ADMISSION_WAIT.labels(name, lane) for lane in LANES}
+
+    @property
+    def queued(self) -> int:
+        return sum(len(w) for w in self._waiters.values())
+
+    def _has_room(self) -> bool:
+        return not self.max_concurrency or self.active < self.max_concurrency
+
+    def estimate_wait(self, lane: str = "interactive") -> float:
+        """lane 요청이 지금 들어오면 처리 시작까지 기다릴 것으로 예상되는 시간(초).
+
+        interactive는 앞선 interactive 대기 요청만, bulk는 모든 대기 요청을 앞에 둔다.
+        """
+        if self._has_room() and not self.queued:
+            return 0.0
+        ahead = len(self._waiters["interactive"]) if lane == "interactive" else self.queued
+        return (ahead + 1) / self.max_concurrency * (self.service_time or 0.0)
+
+    def _reject(self, reason: str, expected: float) -> AdmissionRejectedError:
+        return AdmissionRejectedError(
+            f"Too many requests for {self.name}: {reason}",
+            retry_after=max(expected, MIN_RETRY_AFTER),
+        )
+
+    def _enqueue(self, lane: str, tenant: str, cost: float) -> _Waiter:
+        start = max(self._virtual_time, self._finish.get(tenant, 0.0))
+        finish = start + cost / self.weights.get(tenant, 1.0)
+        self._finish[tenant] = finish
+        waiter = _Waiter(
+            finish, next(self._seq), start, asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(self._waiters[lane], waiter)
+        return waiter
+
+    def _remove(self, lane: str, waiter: _Waiter) -> None:
+        waiters = self._waiters[lane]
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            return
+        heapq.heapify(waiters)
+
+    async def acquire(
+        self, lane: str = "interactive", tenant: str = DEFAULT_TENANT, cost: float = 1.0
+    ) -> None:
+        """슬롯 하나를 받을 때까지 대기. cost는 WFQ에서 쓰는 요청 크기(텍스트 수)."""
+        wait_metric = self._wait_metrics[lane] if metrics.enabled else None
+        if self._has_room() and not self.queued:
+            self.active += 1
+            self.admitted += 1
+            if wait_metric is not None:
+                wait_metric.observe(0.0)
+            return
+
+        expected = self.estimate_wait(lane)
+        # 거절될 요청이 bulk 대기 요청을 밀어내지 않도록 대기 시간부터 확인
+        if self.max_wait and expected > self.max_wait:
+            self.rejected_wait += 1
+            raise self._reject(
+                f"estimated wait {expected:.1f}s exceeds {self.max_wait:.1f}s", expected
+            )
+        if self.queued >= self.max_queue:
+            if lane == "interactive" and self._waiters["bulk"]:
+                self.preempted += 1
+                newest = max(self._waiters["bulk"], key=lambda w: w.seq)
+                self._remove("bulk", newest)
+                newest.future.set_exception(self._reject(
+                    "preempted by interactive requests", self.estimate_wait("bulk")
+                ))
+            else:
+                self.rejected_queue_full += 1
+                raise self._reject(f"queue is full ({self.queued} waiting)", expected)
+
+        waiter = self._enqueue(lane, tenant, cost)
+        future = waiter.future
+        enqueued_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.max_wait or None):
+                await future
+        except TimeoutError:
+            # timeout과 슬롯 할당이 겹치면 받은 슬롯으로 그대로 진행
+            if not future.done() or future.cancelled():
+                self.rejected_wait += 1
+                raise self._reject(
+                    f"waited {self.max_wait:.1f}s in queue", self.estimate_wait(lane)
+                ) from None
+        except asyncio.CancelledError:
+            # 슬롯을 받은 직후 취소되면 돌려놓는다
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            if future.cancelled():
+                self._remove(lane, waiter)
+        waited = time.perf_counter() - enqueued_at
+        self.admitted += 1
+        self.queued_requests += 1
+        self.queue_wait_total += waited
+        self.queue_wait_max = max(self.queue_wait_max, waited)
+        if wait_metric is not None:
+            wait_metric.observe(waited)
+
+    def release(self, elapsed: float | None = None) -> None:
+        self.active -= 1
+        if elapsed is not None:
+            self.service_time = (
+                elapsed if self.service_time is None
+                else _EWMA_ALPHA * elapsed + (1 - _EWMA_ALPHA) * self.service_time
+            )
+        self._wake()
+
+    def _next_lane(self) -> str | None:
+        interactive, bulk = self._waiters["interactive"], self._waiters["bulk"]
+        if not bulk:
+            return "interactive" if interactive else None
+        if not interactive:
+            return "bulk"
+        # 둘 다 대기 중이면 슬롯 bulk_share 비율만큼 bulk 차례
+        self._bulk_credit += self.bulk_share
+        if self._bulk_credit >= 1.0:
+            self._bulk_credit -= 1.0
+            return "bulk"
+        return "interactive"
+
+    def _wake(self) -> None:
+        while self._has_room():
+            lane = self._next_lane()
+            if lane is None:
+                return
+            waiter = heapq.heappop(self._waiters[lane])
+            if waiter.future.done():
+                continue
+            self._virtual_time = max(self._virtual_time, waiter.start)
+            self.active += 1
+            waiter.future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(
+        self, lane: str = "interactive", tenant: str = DEFAULT_TENANT, cost: float = 1.0
+    ) -> AsyncIterator[None]:
+        await self.acquire(lane, tenant, cost)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def set_limits(
+        self,
+        max_concurrency: int | None = None,
+        max_queue: int | None = None,
+        max_wait: float | None = None,
+        bulk_share: float | None = None,
+    ) -> None:
+        """실행 중 제한 변경. 줄인 경우 이미 처리 중인 요청은 그대로 끝까지 처리된다."""
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        if max_queue is not None:
+            self.max_queue = max_queue
+        if max_wait is not None:
+            self.max_wait = max_wait
+        if bulk_share is not None:
+            self.bulk_share = bulk_share
+        self._wake()
+
+    def limits(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait": self.max_wait,
+            "bulk_share": self.bulk_share,
+        }
+
+    def stats(self) -> dict:
+        return {
+            **self.limits(),
+            "active": self.active,
+            "queued": self.queued,
+            **{f"queued_{lane}": len(w) for lane, w in self._waiters.items()},
+            "admitted": self.admitted,
+            "queued_requests": self.queued_requests,
+            "queue_wait_avg_ms": (
+                round(self.queue_wait_total / self.queued_requests * 1000, 3)
+                if self.queued_requests else 0.0
+            ),
+            "queue_wait_max_ms": round(self.queue_wait_max * 1000, 3),
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_wait": self.rejected_wait,
+            "preempted": self.preempted,
+            "service_time_ms": (
+                round(self.service_time * 1000, 3) if self.service_time is not None else None
+            ),
+            "estimated_wait_ms": round(self.estimate_wait() * 1000, 3),
+        }
+
+
+class AdmissionController:
+    """백엔드별, 모델별 ConcurrencyLimiter.
+
+    요청은 모델 → 백엔드 순서로 슬롯을 받는다 (항상 같은 순서라 서로 기다리며 막히지 않음).
+    모델별 제한은 설정된 모델에만 적용된다.
+    """
+
+    def __init__(
+        self,
+        backends: dict[str, ConcurrencyLimiter],
+        models: dict[str, ConcurrencyLimiter] | None = None,
+        model_max_queue: int = 0,
+        max_wait: float = 0.0,
+        bulk_share: float = 0.1,
+        weights: dict[str, float] | None = None,
+    ):
+        self.backends = backends
+        self.models = models or {}
+        self.model_max_queue = model_max_queue
+        self.max_wait = max_wait
+        self.bulk_share = bulk_share
+        # 모든 limiter가 공유하는 tenant 가중치
+        self.weights = weights if weights is not None else {}
+        for limiter in (*self.backends.values(), *self.models.values()):
+            limiter.weights = self.weights
+
+    def limiter(self, scope: str, name: str, create: bool = False) -> ConcurrencyLimiter | None:
+        """scope("backend" | "model")의 limiter. create=True면 없는 모델 limiter를 새로 만든다."""
+        limiters = self.backends if scope == "backend" else self.models
+        limiter = limiters.get(name)
+        if limiter is None and create and scope == "model":
+            limiter = self.models[name] = ConcurrencyLimiter(
+                name,
+                max_queue=self.model_max_queue,
+                max_wait=self.max_wait,
+                bulk_share=self.bulk_share,
+                weights=self.weights,
+            )
+        return limiter
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        backend: str,
+        model: str,
+        lane: str = "interactive",
+        tenant: str = DEFAULT_TENANT,
+        cost: float = 1.0,
+    ) -> AsyncIterator[None]:
+        async with AsyncExitStack() as stack:
+            with timing.phase("admission"):
+                for limiter in (self.models.get(model), self.backends.get(backend)):
+                    if limiter is not None:
+                        await stack.enter_async_context(limiter.slot(lane, tenant, cost))
+            yield
+
+    def stats(self) -> dict:
+        return {
+            "backends": {n: l.stats() for n, l in self.backends.items()},
+            "models": {n: l.stats() for n, l in self.models.items()},
+        }
@@ -1,17 +1,30 @@
 from abc import ABC, abstractmethod
 
+import httpx
+
 from embedding_gateway.models import EmbeddingResponse
 
 
 class EmbeddingBackend(ABC):
+    # True면 health check가 실패해도 요청 시 스스로 컨테이너를 띄울 수 있음 (managed 모드)
+    starts_on_demand = False
+
     @abstractmethod
     async def embed(
         self,
         texts: list[str],
         model: str,
         dimensions: int | None = None,
+        encoding_format: str = "float",
     ) -> EmbeddingResponse: ...
 
+    async def embed_raw(self, texts: list[str], model: str) -> bytes | None:
+        """float, dimensions 없는 요청의 응답 JSON 바이트를 그대로 반환 (passthrough fast path).
+
+        백엔드 응답 형식이 OpenAI 호환이 아니면 None (기본값).
+        """
+        return None
+
     @abstractmethod
     async def health_check(self) -> dict: ...
 
@@ -20,3 +33,14 @@ class EmbeddingBackend(ABC):
 
     @abstractmethod
     async def close(self) -> None: ...
+
+    async def prewarm(self) -> None:
+        """시작 시 백엔드 연결을 미리 열어둔다 (기본은 아무것도 하지 않음)."""
+
+    def http_clients(self) -> dict[str, httpx.AsyncClient]:
+        """connection pool 메트릭용 {대상 URL: client}."""
+        return {}
+
+    def stats(self) -> dict:
+        """백엔드 내부 통계 (GET /stats). 기본은 빈 dict."""
+        return {}
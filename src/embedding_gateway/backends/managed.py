@@ -0,0 +1,625 @@
+import asyncio
+import logging
+import re
+import subprocess
+import time
+from abc import abstractmethod
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+import httpx
+
+from embedding_gateway import context, metrics, timing
+from embedding_gateway.backends.base import EmbeddingBackend
+from embedding_gateway.backends.pool import ContainerPool
+from embedding_gateway.backends.replicas import ReplicaSet, split_urls
+from embedding_gateway.backends.scheduling import SwapScheduler
+from embedding_gateway.backends.transport import HTTPOptions, make_client, prewarm
+from embedding_gateway.models import EmbeddingData, EmbeddingResponse, UsageInfo
+from embedding_gateway.responses import dumps, loads, rewrite_model
+from embedding_gateway.vectors import format_embedding
+
+logger = logging.getLogger(__name__)
+
+SWAP_STRATEGIES = ("recreate", "reuse", "bluegreen")
+
+T = TypeVar("T")
+
+
+class ManagedContainerBackend(EmbeddingBackend):
+    """Docker 컨테이너로 모델을 띄우는 OpenAI 호환 백엔드(TEI, vLLM) 공통 로직.
+
+    managed 모드 (docker_image 설정): 로컬 Docker 컨테이너를 자동 관리 (시작/중지/모델 스왑).
+    unmanaged 모드 (docker_image 빈값): 원격 서버에 HTTP 프록시만 수행.
+    """
+
+    label = "managed"
+    env_prefix = ""
+    health_poll_interval = 2.0
+
+    def __init__(
+        self,
+        base_url: str,
+        default_model: str,
+        available_models: list[str],
+        docker_image: str = "",
+        container_name: str = "",
+        wsl_distro: str = "Ubuntu-24.04",
+        swap_timeout: float = 120.0,
+        timeout: float = 120.0,
+        hf_token: str = "",
+        swap_min_hold: float = 5.0,
+        swap_max_wait: float = 0.0,
+        docker_command: list[str] | None = None,
+        pool_size: int = 0,
+        pool_memory_mb: float = 0.0,
+        model_memory_mb: dict[str, float] | None = None,
+        default_model_memory_mb: float = 2048.0,
+        model_gpus: dict[str, str] | None = None,
+        swap_strategy: str = "recreate",
+        bluegreen_port: int = 0,
+        lb_policy: str = "least_outstanding",
+        eject_failures: int = 3,
+        retry_interval: float = 10.0,
+        http: HTTPOptions | None = None,
+    ):
+        # 원격 모드는 base_url에 쉼표로 여러 replica를 지정할 수 있음
+        urls = split_urls(base_url)
+        if docker_image and len(urls) > 1:
+            raise ValueError(
+                f"{self.label} managed mode supports a single base URL, got {len(urls)}"
+            )
+        self.base_url = urls[0]
+        self.default_model = default_model
+        self.available_models = available_models
+        self.docker_image = docker_image
+        self.container_name = container_name
+        self.wsl_distro = wsl_distro
+        self.swap_timeout = swap_timeout
+        self.hf_token = hf_token
+        self.timeout = timeout
+        self.http = http or HTTPOptions()
+        self.docker_command = docker_command
+        if swap_strategy not in SWAP_STRATEGIES:
+            raise ValueError(
+                f"Unknown {self.label} swap strategy '{swap_strategy}' "
+                f"(expected one of {', '.join(SWAP_STRATEGIES)})"
+            )
+        self.swap_strategy = swap_strategy
+        # 스왑 방식별 소요 시간: recreate(rm+run), start(정지된 컨테이너 재시작), create(최초 생성)
+        self.swap_timings: dict[str, dict[str, float]] = {}
+        self._legacy_removed = False
+        # managed 모드는 replica 하나를 두고 bluegreen 스왑 시 client만 교체
+        self.replicas = ReplicaSet(
+            urls,
+            self._make_client,
+            policy=lb_policy,
+            eject_failures=eject_failures,
+            retry_interval=retry_interval,
+        )
+        self.current_model: str | None = None
+        self._swap_lock = asyncio.Lock()
+        # bluegreen 전략: blue(base 포트, container_name)와 green(bluegreen_port) 컨테이너를 번갈아 사용
+        self.bluegreen_port = bluegreen_port
+        self._color = "blue"
+        self._client_inflight: dict[httpx.AsyncClient, int] = {}
+        self._drain_task: asyncio.Task | None = None
+        self.scheduler = SwapScheduler(
+            self,
+            min_hold=swap_min_hold,
+            max_wait=swap_max_wait,
+            overlap=swap_strategy == "bluegreen",
+        )
+        # pool 모드: 여러 모델 컨테이너를 서로 다른 포트에 동시에 상주
+        self.pool: ContainerPool | None = None
+        if pool_size > 0:
+            self.pool = ContainerPool(
+                self,
+                size=pool_size,
+                memory_budget_mb=pool_memory_mb,
+                model_memory_mb=model_memory_mb,
+                default_memory_mb=default_model_memory_mb,
+                model_gpus=model_gpus,
+            )
+
+    @property
+    def managed(self) -> bool:
+        """True if this backend manages its own Docker container locally."""
+        return bool(self.docker_image)
+
+    @property
+    def starts_on_demand(self) -> bool:
+        return self.managed
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """첫 번째(managed 모드에서는 유일한) replica의 client."""
+        return self.replicas.primary.client
+
+    @client.setter
+    def client(self, client: httpx.AsyncClient) -> None:
+        self.replicas.primary.client = client
+
+    @property
+    def port(self) -> str:
+        """base_url에서 추출한 호스트 포트."""
+        return self.base_url.rsplit(":", 1)[-1].split("/")[0]
+
+    @abstractmethod
+    async def _detect_current_model(self) -> str | None: ...
+
+    @abstractmethod
+    def _run_args(
+        self, model_id: str, container_name: str, port: int | str, gpu: str | None
+    ) -> list[str]:
+        """`docker run -d` 이후에 붙는 인자 (이름/포트/이미지/모델 옵션)."""
+
+    def _make_client(self, base_url: str) -> httpx.AsyncClient:
+        return make_client(base_url, self.timeout, self.http, self.label.lower())
+
+    @staticmethod
+    def _gpu_arg(gpu: str | None) -> str:
+        """`--gpus` 값. gpu가 지정되면 해당 GPU 인덱스에 고정."""
+        return f"device={gpu}" if gpu else "all"
+
+    async def initialize(self) -> None:
+        """시작 시 현재 컨테이너의 모델을 감지."""
+        if self.managed and self.swap_strategy == "reuse":
+            await self.collect_garbage()
+        if self.pool is not None and self.managed:
+            logger.info(
+                f"{self.label} pool mode: {self.pool.size} slots, "
+                f"budget {self.pool.memory_budget_mb or 'unlimited'}MB"
+            )
+            return
+        self.current_model = await self._detect_current_model()
+        if self.current_model is None and self.managed and self.swap_strategy == "bluegreen":
+            # 이전 실행에서 green 쪽으로 전환된 상태일 수 있음
+            blue, self.client = self.client, self._color_client("green")
+            self.current_model = await self._detect_current_model()
+            if self.current_model:
+                self._color = "green"
+                await blue.aclose()
+            else:
+                await self.client.aclose()
+                self.client = blue
+        if self.current_model:
+            logger.info(f"{self.label} current model: {self.current_model}")
+        else:
+            logger.info(f"{self.label} container not running or not healthy")
+
+    def _docker_cmd(self, *args: str) -> list[str]:
+        if self.docker_command:
+            return [*self.docker_command, *args]
+        return ["wsl", "-d", self.wsl_distro, "--", "docker", *args]
+
+    async def _run_cmd(
+        self, cmd: list[str], timeout: float = 30.0
+    ) -> tuple[int, str, str]:
+        """Run a command using subprocess.run in a thread (Windows-safe)."""
+        cmd_str = " ".join(cmd)
+        logger.debug(f"Running: {cmd_str}")
+
+        def _sync_run() -> subprocess.CompletedProcess:
+            return subprocess.run(
+                cmd, capture_output=True, timeout=timeout
+            )
+
+        try:
+            result = await asyncio.to_thread(_sync_run)
+            stdout = result.stdout.decode(errors="replace")
+            stderr = result.stderr.decode(errors="replace")
+            if result.returncode != 0:
+                logger.warning(
+                    f"Command failed (rc={result.returncode}): {cmd_str}\n"
+                    f"stderr: {stderr}"
+                )
+            else:
+                logger.debug(f"Command OK (rc=0): {cmd_str}")
+            return result.returncode, stdout, stderr
+        except subprocess.TimeoutExpired:
+            logger.error(f"Command timed out ({timeout}s): {cmd_str}")
+            return -1, "", "timeout"
+        except Exception as e:
+            logger.error(f"Command exception: {cmd_str} → {e}")
+            return -2, "", str(e)
+
+    async def _swap_model(self, model_id: str) -> None:
+        """컨테이너를 교체하여 다른 모델 로딩 (managed 모드 전용)."""
+        if not self.managed:
+            raise RuntimeError(
+                f"Cannot swap model on remote {self.label} backend. "
+                f"Current: {self.current_model}, requested: {model_id}. "
+                f"Set {self.env_prefix}_DOCKER_IMAGE to enable local Docker management."
+            )
+        waiting = time.monotonic()
+        async with self._swap_lock:
+            metrics.SWAP_LOCK_WAIT.labels(self.label.lower()).observe(
+                time.monotonic() - waiting
+            )
+            # Lock 획득 후 다시 확인 (다른 요청이 이미 swap 했을 수 있음)
+            if model_id == self.current_model:
+                return
+
+            logger.info(
+                f"Swapping {self.label} model: {self.current_model} → {model_id}"
+            )
+            started = time.monotonic()
+
+            if self.swap_strategy == "bluegreen":
+                # 새 컨테이너를 다른 포트에 띄우고 warm-up 후 client를 전환
+                await self._swap_bluegreen(model_id)
+                kind = "bluegreen"
+            else:
+                if self.swap_strategy == "reuse":
+                    # 1~2. 현재 모델 컨테이너 정지 후 대상 모델 컨테이너 시작 (없으면 생성)
+                    kind = await self._swap_reuse(model_id)
+                else:
+                    # 1~2. 기존 컨테이너 제거 후 새 컨테이너 시작
+                    await self._start_container(model_id, self.container_name, self.port)
+                    kind = "recreate"
+
+                logger.info(f"{self.label} container started, waiting for health...")
+
+                # 3. health 대기
+                await self._wait_healthy()
+                self.current_model = model_id
+            elapsed = time.monotonic() - started
+            self._record_swap(kind, elapsed)
+            logger.info(
+                f"{self.label} model swapped to: {model_id} ({kind}, {elapsed:.1f}s)"
+            )
+
+    def _color_name(self, color: str) -> str:
+        return self.container_name if color == "blue" else f"{self.container_name}-green"
+
+    def _color_port(self, color: str) -> int:
+        if color == "blue":
+            return int(self.port)
+        return self.bluegreen_port or int(self.port) + 100
+
+    def _color_client(self, color: str) -> httpx.AsyncClient:
+        host = self.base_url.rsplit(":", 1)[0]
+        return self._make_client(f"{host}:{self._color_port(color)}")
+
+    async def _swap_bluegreen(self, model_id: str) -> None:
+        """새 모델을 반대 색 포트에 띄우고 healthy + warm-up 후 client를 원자적으로 전환.
+
+        기존 컨테이너는 in-flight 요청이 모두 끝난 뒤 백그라운드에서 제거한다.
+        """
+        # 이전 스왑의 drain이 끝나야 그 색을 다시 쓸 수 있음
+        if self._drain_task is not None:
+            await self._drain_task
+
+        color = "green" if self._color == "blue" else "blue"
+        name, port = self._color_name(color), self._color_port(color)
+        await self._start_container(model_id, name, port)
+        client = self._color_client(color)
+        try:
+            logger.info(f"{self.label} {color} container started, waiting for health...")
+            await self._wait_healthy(client)
+            await self._post_embeddings(["warm-up"], model_id, None, "float", client)
+        except Exception:
+            await self._run_cmd(self._docker_cmd("rm", "-f", name), timeout=15.0)
+            await client.aclose()
+            raise
+
+        old_client, old_name = self.client, self._color_name(self._color)
+        self.client, self._color, self.current_model = client, color, model_id
+        self._drain_task = asyncio.create_task(self._retire(old_client, old_name))
+
+    async def _retire(self, client: httpx.AsyncClient, container_name: str) -> None:
+        """client로 나간 요청이 모두 끝나면 컨테이너를 제거."""
+        deadline = time.monotonic() + self.timeout
+        while self._client_inflight.get(client) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self._client_inflight.pop(client, None)
+        rc, _, stderr = await self._run_cmd(
+            self._docker_cmd("rm", "-f", container_name), timeout=15.0
+        )
+        if rc != 0:
+            logger.warning(f"Container remove returned rc={rc}: {stderr}")
+        await client.aclose()
+
+    def model_container_name(self, model_id: str) -> str:
+        """reuse 전략에서 모델별로 유지하는 컨테이너 이름."""
+        slug = re.sub(r"[^a-zA-Z0-9_.-]+", "-", model_id).strip("-.").lower()
+        return f"{self.container_name}.{slug}"
+
+    async def _remove_legacy_container(self) -> None:
+        """recreate 전략(또는 docker-compose)으로 띄운 단일 컨테이너가 포트를 잡고 있을 수 있어 한 번 제거."""
+        if not self._legacy_removed:
+            await self._run_cmd(
+                self._docker_cmd("rm", "-f", self.container_name), timeout=15.0
+            )
+            self._legacy_removed = True
+
+    async def _swap_reuse(self, model_id: str) -> str:
+        """정지된 모델별 컨테이너를 docker start로 재사용. 반환값은 "start" 또는 "create"."""
+        await self._remove_legacy_container()
+        if self.current_model:
+            rc, _, stderr = await self._run_cmd(
+                self._docker_cmd("stop", self.model_container_name(self.current_model)),
+                timeout=60.0,
+            )
+            if rc != 0:
+                logger.warning(f"Container stop returned rc={rc}: {stderr}")
+
+        name = self.model_container_name(model_id)
+        rc, _, _ = await self._run_cmd(self._docker_cmd("start", name), timeout=30.0)
+        if rc == 0:
+            return "start"
+
+        # 최초 사용: 모델별 이름으로 새로 생성
+        await self._start_container(model_id, name, self.port)
+        return "create"
+
+    async def collect_garbage(self) -> list[str]:
+        """available_models에서 빠진 모델의 reuse 컨테이너를 제거."""
+        rc, stdout, _ = await self._run_cmd(
+            self._docker_cmd(
+                "ps", "-a",
+                "--filter", f"name={self.container_name}.",
+                "--format", "{{.Names}}",
+            ),
+            timeout=15.0,
+        )
+        if rc != 0:
+            return []
+        keep = {self.model_container_name(m) for m in self.available_models}
+        prefix = f"{self.container_name}."
+        removed = []
+        for name in stdout.split():
+            if name.startswith(prefix) and name not in keep:
+                await self._run_cmd(self._docker_cmd("rm", "-f", name), timeout=15.0)
+                removed.append(name)
+        if removed:
+            logger.info(f"Removed stale {self.label} containers: {', '.join(removed)}")
+        return removed
+
+    def _record_swap(self, kind: str, elapsed: float) -> None:
+        timing = self.swap_timings.setdefault(
+            kind, {"count": 0, "total_s": 0.0, "last_s": 0.0}
+        )
+        timing["count"] += 1
+        timing["total_s"] += elapsed
+        timing["last_s"] = elapsed
+        metrics.SWAP_DURATION.labels(self.label.lower(), kind).observe(elapsed)
+
+    async def _start_container(
+        self,
+        model_id: str,
+        container_name: str,
+        port: int | str,
+        gpu: str | None = None,
+    ) -> None:
+        """같은 이름의 컨테이너를 제거하고 model_id로 새 컨테이너를 시작."""
+        rc, _, stderr = await self._run_cmd(
+            self._docker_cmd("rm", "-f", container_name),
+            timeout=15.0,
+        )
+        if rc != 0:
+            logger.warning(f"Container remove returned rc={rc}: {stderr}")
+
+        run_cmd = self._docker_cmd(
+            "run", "-d", *self._run_args(model_id, container_name, port, gpu)
+        )
+        rc, stdout, stderr = await self._run_cmd(run_cmd, timeout=30.0)
+        if rc != 0:
+            raise RuntimeError(
+                f"Failed to start {self.label} container for {model_id} "
+                f"(rc={rc}): {stderr.strip()}"
+            )
+
+    async def _wait_healthy(self, client: httpx.AsyncClient | None = None) -> None:
+        """컨테이너가 healthy 될 때까지 대기."""
+        client = client or self.client
+        deadline = asyncio.get_event_loop().time() + self.swap_timeout
+        while asyncio.get_event_loop().time() < deadline:
+            try:
+                r = await client.get("/health", timeout=5.0)
+                if r.status_code == 200:
+                    return
+            except Exception:
+                pass
+            await asyncio.sleep(self.health_poll_interval)
+        raise TimeoutError(
+            f"{self.label} did not become healthy within {self.swap_timeout}s"
+        )
+
+    async def embed(
+        self,
+        texts: list[str],
+        model: str,
+        dimensions: int | None = None,
+        encoding_format: str = "float",
+    ) -> EmbeddingResponse:
+        return await self._dispatch(
+            model,
+            lambda client: self._post_embeddings(
+                texts, model, dimensions, encoding_format, client
+            ),
+        )
+
+    async def embed_raw(self, texts: list[str], model: str) -> bytes:
+        """백엔드 응답 바이트를 그대로 반환 (model 값만 요청한 이름으로 교체)."""
+        return await self._dispatch(
+            model, lambda client: self._post_raw(texts, model, client)
+        )
+
+    async def _dispatch(self, model: str, post: Callable[[httpx.AsyncClient], Awaitable[T]]) -> T:
+        """model을 서비스하는 컨테이너/replica의 client를 골라 post(client)를 실행."""
+        if self.managed and self.pool is not None:
+            if model not in self.available_models:
+                raise ValueError(
+                    f"Model '{model}' not in available {self.label} models"
+                )
+            with timing.phase("queue"):
+                slot = await self.pool.acquire(model)
+            try:
+                return await post(slot.client)
+            finally:
+                self.pool.release(slot)
+
+        # current_model이 None이면 먼저 감지 시도
+        if self.current_model is None:
+            detected = await self._detect_current_model()
+            if detected:
+                self.current_model = detected
+                logger.info(f"{self.label} model detected (late): {detected}")
+
+        # unmanaged(원격) 모드: 모델 체크 없이 원격 replica에 직접 요청
+        if not self.managed:
+            async with self.replicas.use() as replica:
+                return await post(replica.client)
+
+        # managed 모드: 모델이 다르면 스케줄러가 큐잉 후 Docker 컨테이너 교체
+        if model != self.current_model and model not in self.available_models:
+            raise ValueError(
+                f"Model '{model}' not in available {self.label} models"
+            )
+        await self.scheduler.acquire(model, context.swap_max_wait.get())
+        # bluegreen 전환 후에도 이 요청은 시작 시점의 컨테이너로 끝까지 처리
+        client = self.client
+        self._client_inflight[client] = self._client_inflight.get(client, 0) + 1
+        try:
+            return await post(client)
+        finally:
+            if client in self._client_inflight:
+                self._client_inflight[client] -= 1
+            self.scheduler.release()
+
+    async def _post(self, client: httpx.AsyncClient, payload: dict) -> httpx.Response:
+        try:
+            with timing.phase("backend"):
+                response = await client.post("/v1/embeddings", json=payload)
+            response.raise_for_status()
+        except httpx.PoolTimeout:
+            metrics.POOL_TIMEOUTS.labels(self.label.lower()).inc()
+            raise
+        except httpx.HTTPStatusError as e:
+            body = e.response.text[:500] if e.response else ""
+            raise RuntimeError(
+                f"{self.label} returned HTTP {e.response.status_code}: {body}"
+            ) from e
+        return response
+
+    async def _post_raw(
+        self, texts: list[str], model: str, client: httpx.AsyncClient
+    ) -> bytes:
+        response = await self._post(client, {"input": texts, "model": model})
+        with timing.phase("parse"):
+            body = rewrite_model(response.content, model)
+            if body is None:
+                data = loads(response.content)
+                data["model"] = model
+                body = dumps(data)
+        return body
+
+    async def _post_embeddings(
+        self,
+        texts: list[str],
+        model: str,
+        dimensions: int | None,
+        encoding_format: str,
+        client: httpx.AsyncClient | None = None,
+    ) -> EmbeddingResponse:
+        client = client or self.client
+        payload: dict = {"input": texts, "model": model}
+        if encoding_format == "base64":
+            # 백엔드가 만든 float32 base64를 그대로 전달 (float 파싱 없음)
+            payload["encoding_format"] = "base64"
+
+        response = await self._post(client, payload)
+
+        # 백엔드 응답은 이미 형식이 정해져 있으므로 pydantic 검증 없이 구성
+        with timing.phase("parse"):
+            data = loads(response.content)
+            return EmbeddingResponse.model_construct(
+                data=[
+                    EmbeddingData.model_construct(
+                        embedding=format_embedding(d["embedding"], encoding_format, dimensions),
+                        index=d["index"],
+                    )
+                    for d in data["data"]
+                ],
+                model=model,
+                usage=UsageInfo(
+                    prompt_tokens=data.get("usage", {}).get("prompt_tokens", 0),
+                    total_tokens=data.get("usage", {}).get("total_tokens", 0),
+                ),
+            )
+
+    async def health_check(self) -> dict:
+        if self.managed and self.pool is not None:
+            return {**await self.pool.health_check(), "mode": "pool"}
+        mode = "managed" if self.managed else "remote"
+        if len(self.replicas) > 1:
+            async def probe(replica) -> bool:
+                r = await replica.client.get("/health", timeout=5.0)
+                return r.status_code == 200
+
+            results = await self.replicas.check(probe)
+            return {
+                "status": "healthy" if any(results.values()) else "unhealthy",
+                "current_model": self.current_model,
+                "mode": mode,
+                "replicas": {
+                    url: "healthy" if ok else "unhealthy" for url, ok in results.items()
+                },
+            }
+        try:
+            r = await self.client.get("/health", timeout=5.0)
+            return {
+                "status": "healthy" if r.status_code == 200 else "unhealthy",
+                "current_model": self.current_model,
+                "mode": mode,
+            }
+        except Exception as e:
+            return {
+                "status": "unhealthy",
+                "error": str(e),
+                "current_model": self.current_model,
+                "mode": mode,
+            }
+
+    async def list_models(self) -> list[str]:
+        return list(self.available_models)
+
+    async def prewarm(self) -> None:
+        # managed 모드는 컨테이너가 떠 있을 때만 (스왑 후 새 client는 요청과 함께 연결됨)
+        if self.managed and (self.pool is not None or self.current_model is None):
+            return
+        for replica in self.replicas.replicas:
+            await prewarm(replica.client, "/health", self.http.prewarm)
+
+    def http_clients(self) -> dict[str, httpx.AsyncClient]:
+        clients = {r.url: r.client for r in self.replicas.replicas}
+        if self.pool is not None:
+            clients.update({str(s.client.base_url): s.client for s in self.pool.slots.values()})
+        return clients
+
+    def stats(self) -> dict:
+        if not self.managed:
+            return {"replicas": self.replicas.stats()}
+        if self.pool is not None:
+            return {"pool": self.pool.stats()}
+        return {
+            "scheduler": self.scheduler.stats(),
+            "swap_strategy": self.swap_strategy,
+            "swap_timings": {
+                kind: {
+                    "count": t["count"],
+                    "avg_s": round(t["total_s"] / t["count"], 3),
+                    "last_s": round(t["last_s"], 3),
+                }
+                for kind, t in self.swap_timings.items()
+            },
+        }
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+        await self.replicas.close()
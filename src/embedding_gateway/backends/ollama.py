@@ -1,44 +1,96 @@
 import httpx
 
+from embedding_gateway import metrics, timing
 from embedding_gateway.backends.base import EmbeddingBackend
+from embedding_gateway.backends.replicas import ReplicaSet, split_urls
+from embedding_gateway.backends.transport import HTTPOptions, make_client, prewarm
 from embedding_gateway.models import EmbeddingData, EmbeddingResponse, UsageInfo
+from embedding_gateway.responses import loads
+from embedding_gateway.vectors import format_embedding
 
 
 class OllamaBackend(EmbeddingBackend):
-    def __init__(self, base_url: str, timeout: float = 120.0):
-        self.base_url = base_url.rstrip("/")
-        self.client = httpx.AsyncClient(base_url=self.base_url, timeout=timeout)
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 120.0,
+        lb_policy: str = "least_outstanding",
+        eject_failures: int = 3,
+        retry_interval: float = 10.0,
+        http: HTTPOptions | None = None,
+    ):
+        # base_url에 쉼표로 여러 replica를 지정하면 요청을 분산
+        urls = split_urls(base_url)
+        self.base_url = urls[0]
+        self.http = http or HTTPOptions()
+        self.replicas = ReplicaSet(
+            urls,
+            lambda url: make_client(url, timeout, self.http, "ollama"),
+            policy=lb_policy,
+            eject_failures=eject_failures,
+            retry_interval=retry_interval,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """첫 번째 replica의 client."""
+        return self.replicas.primary.client
+
+    @client.setter
+    def client(self, client: httpx.AsyncClient) -> None:
+        self.replicas.primary.client = client
 
     async def embed(
         self,
         texts: list[str],
         model: str,
         dimensions: int | None = None,
+        encoding_format: str = "float",
     ) -> EmbeddingResponse:
-        response = await self.client.post(
-            "/api/embed",
-            json={"model": model, "input": texts},
-        )
-        response.raise_for_status()
-        data = response.json()
-
-        embeddings = data["embeddings"]
-        if dimensions:
-            embeddings = [emb[:dimensions] for emb in embeddings]
-
-        return EmbeddingResponse(
-            data=[
-                EmbeddingData(embedding=emb, index=i)
-                for i, emb in enumerate(embeddings)
-            ],
-            model=model,
-            usage=UsageInfo(
-                prompt_tokens=data.get("prompt_eval_count", 0),
-                total_tokens=data.get("prompt_eval_count", 0),
-            ),
-        )
+        with timing.phase("backend"):
+            async with self.replicas.use() as replica:
+                try:
+                    response = await replica.client.post(
+                        "/api/embed",
+                        json={"model": model, "input": texts},
+                    )
+                except httpx.PoolTimeout:
+                    metrics.POOL_TIMEOUTS.labels("ollama").inc()
+                    raise
+                # 5xx는 replica 실패로 기록되도록 use() 안에서 raise
+                response.raise_for_status()
+
+        # Ollama는 base64 출력을 지원하지 않으므로 게이트웨이에서 float32로 패킹
+        with timing.phase("parse"):
+            data = loads(response.content)
+            return EmbeddingResponse.model_construct(
+                data=[
+                    EmbeddingData.model_construct(
+                        embedding=format_embedding(emb, encoding_format, dimensions),
+                        index=i,
+                    )
+                    for i, emb in enumerate(data["embeddings"])
+                ],
+                model=model,
+                usage=UsageInfo(
+                    prompt_tokens=data.get("prompt_eval_count", 0),
+                    total_tokens=data.get("prompt_eval_count", 0),
+                ),
+            )
 
     async def health_check(self) -> dict:
+        if len(self.replicas) > 1:
+            async def probe(replica) -> bool:
+                r = await replica.client.get("/", timeout=5.0)
+                return r.status_code == 200
+
+            results = await self.replicas.check(probe)
+            return {
+                "status": "healthy" if any(results.values()) else "unhealthy",
+                "replicas": {
+                    url: "healthy" if ok else "unhealthy" for url, ok in results.items()
+                },
+            }
         try:
             r = await self.client.get("/", timeout=5.0)
             return {"status": "healthy" if r.status_code == 200 else "unhealthy"}
@@ -46,9 +98,20 @@ class OllamaBackend(EmbeddingBackend):
             return {"status": "unhealthy", "error": str(e)}
 
     async def list_models(self) -> list[str]:
-        r = await self.client.get("/api/tags")
-        r.raise_for_status()
+        async with self.replicas.use() as replica:
+            r = await replica.client.get("/api/tags")
+            r.raise_for_status()
         return [m["name"] for m in r.json().get("models", [])]
 
+    async def prewarm(self) -> None:
+        for replica in self.replicas.replicas:
+            await prewarm(replica.client, "/api/version", self.http.prewarm)
+
+    def http_clients(self) -> dict[str, httpx.AsyncClient]:
+        return {r.url: r.client for r in self.replicas.replicas}
+
+    def stats(self) -> dict:
+        return {"replicas": self.replicas.stats()}
+
     async def close(self) -> None:
-        await self.client.aclose()
+        await self.replicas.close()
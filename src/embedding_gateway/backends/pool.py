@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING
+
+import httpx
+
+if TYPE_CHECKING:
+    from embedding_gateway.backends.managed import ManagedContainerBackend
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSlot:
+    """풀에 상주하는 모델 컨테이너 하나."""
+
+    def __init__(
+        self,
+        index: int,
+        model: str,
+        port: int,
+        container_name: str,
+        client: httpx.AsyncClient,
+        memory_mb: float,
+        gpu: str | None,
+    ):
+        self.index = index
+        self.model = model
+        self.port = port
+        self.container_name = container_name
+        self.client = client
+        self.memory_mb = memory_mb
+        self.gpu = gpu
+        self.inflight = 0
+        self.last_used = time.monotonic()
+        self.ready = asyncio.Event()
+        self.error: Exception | None = None
+
+    def info(self) -> dict:
+        return {
+            "model": self.model,
+            "port": self.port,
+            "container": self.container_name,
+            "memory_mb": self.memory_mb,
+            "gpu": self.gpu,
+            "inflight": self.inflight,
+            "ready": self.ready.is_set(),
+            "idle_s": round(time.monotonic() - self.last_used, 1),
+        }
+
+
+class ContainerPool:
+    """여러 모델 컨테이너를 서로 다른 포트에 동시에 띄워두는 managed 백엔드용 풀.
+
+    모델별 메모리 사용량(설정값)의 합이 memory_budget_mb를 넘지 않도록 관리하며,
+    새 모델이 필요하면 요청이 없는(inflight=0) 가장 오래 안 쓴 모델부터 내린다.
+    슬롯 i는 base 포트 + i, 컨테이너 이름 `{container_name}-{i}`를 사용한다.
+    """
+
+    def __init__(
+        self,
+        backend: "ManagedContainerBackend",
+        size: int,
+        memory_budget_mb: float,
+        model_memory_mb: dict[str, float] | None = None,
+        default_memory_mb: float = 2048.0,
+        model_gpus: dict[str, str] | None = None,
+    ):
+        self.backend = backend
+        self.size = size
+        self.memory_budget_mb = memory_budget_mb
+        self.model_memory_mb = model_memory_mb or {}
+        self.default_memory_mb = default_memory_mb
+        self.model_gpus = model_gpus or {}
+        self.slots: dict[str, PoolSlot] = {}
+        self._changed = asyncio.Condition()
+        self._blocked = 0
+        self._tasks: set[asyncio.Task] = set()
+        self.loads = 0
+        self.evictions = 0
+        self.load_time_total = 0.0
+
+    def memory_for(self, model: str) -> float:
+        return self.model_memory_mb.get(model, self.default_memory_mb)
+
+    @property
+    def used_memory_mb(self) -> float:
+        return sum(s.memory_mb for s in self.slots.values())
+
+    def _free_index(self) -> int | None:
+        used = {s.index for s in self.slots.values()}
+        for i in range(self.size):
+            if i not in used:
+                return i
+        return None
+
+    def _fits(self, memory_mb: float) -> bool:
+        if self._free_index() is None:
+            return False
+        return (
+            not self.memory_budget_mb
+            or self.used_memory_mb + memory_mb <= self.memory_budget_mb
+        )
+
+    def _lru_idle(self) -> PoolSlot | None:
+        idle = [s for s in self.slots.values() if s.inflight == 0 and s.ready.is_set()]
+        return min(idle, key=lambda s: s.last_used, default=None)
+
+    async def acquire(self, model: str) -> PoolSlot:
+        """model이 상주하는 슬롯을 반환 (필요하면 로딩). 사용 후 release() 필수."""
+        deadline = time.monotonic() + self.backend.swap_timeout
+        while True:
+            slot = self.slots.get(model)
+            if slot is not None:
+                slot.inflight += 1
+                slot.last_used = time.monotonic()
+                try:
+                    await slot.ready.wait()
+                except BaseException:
+                    self.release(slot)
+                    raise
+                if slot.error is not None:
+                    self.release(slot)
+                    raise slot.error
+                return slot
+
+            memory_mb = self.memory_for(model)
+            if self.memory_budget_mb and memory_mb > self.memory_budget_mb:
+                raise RuntimeError(
+                    f"{self.backend.label} model '{model}' needs {memory_mb:.0f}MB, "
+                    f"more than the pool budget {self.memory_budget_mb:.0f}MB"
+                )
+
+            async with self._changed:
+                while not self._fits(memory_mb):
+                    victim = self._lru_idle()
+                    if victim is not None:
+                        await self._evict(victim)
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"No {self.backend.label} pool capacity for '{model}' "
+                            f"within {self.backend.swap_timeout}s"
+                        )
+                    self._blocked += 1
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    finally:
+                        self._blocked -= 1
+                if model in self.slots:
+                    continue  # 기다리는 동안 다른 요청이 로딩을 시작함
+                slot = self._new_slot(model, memory_mb)
+                self.slots[model] = slot
+            self._spawn(self._load(slot))
+
+    def release(self, slot: PoolSlot) -> None:
+        slot.inflight -= 1
+        slot.last_used = time.monotonic()
+        if slot.inflight == 0 and self._blocked:
+            self._spawn(self._notify())
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    def _new_slot(self, model: str, memory_mb: float) -> PoolSlot:
+        index = self._free_index()
+        port = int(self.backend.port) + index
+        host = self.backend.base_url.rsplit(":", 1)[0]
+        return PoolSlot(
+            index=index,
+            model=model,
+            port=port,
+            container_name=f"{self.backend.container_name}-{index}",
+            client=self.backend._make_client(f"{host}:{port}"),
+            memory_mb=memory_mb,
+            gpu=self.model_gpus.get(model),
+        )
+
+    async def _load(self, slot: PoolSlot) -> None:
+        started = time.monotonic()
+        logger.info(
+            f"Loading {self.backend.label} pool model {slot.model} "
+            f"on port {slot.port} (slot {slot.index})"
+        )
+        try:
+            # slot 0은 기본 포트를 쓰므로 단일 컨테이너가 남아 있으면 먼저 제거
+            await self.backend._remove_legacy_container()
+            await self.backend._start_container(
+                slot.model, slot.container_name, slot.port, slot.gpu
+            )
+            await self.backend._wait_healthy(slot.client)
+        except Exception as e:
+            logger.error(f"{self.backend.label} pool load failed for {slot.model}: {e}")
+            slot.error = e
+            self.slots.pop(slot.model, None)
+            await self.backend._run_cmd(
+                self.backend._docker_cmd("rm", "-f", slot.container_name), timeout=15.0
+            )
+            await slot.client.aclose()
+            await self._notify()
+        else:
+            self.loads += 1
+            self.load_time_total += time.monotonic() - started
+            logger.info(f"{self.backend.label} pool model ready: {slot.model}")
+        finally:
+            slot.ready.set()
+
+    async def _evict(self, slot: PoolSlot) -> None:
+        logger.info(
+            f"Evicting {self.backend.label} pool model {slot.model} (slot {slot.index})"
+        )
+        self.slots.pop(slot.model, None)
+        self.evictions += 1
+        rc, _, stderr = await self.backend._run_cmd(
+            self.backend._docker_cmd("rm", "-f", slot.container_name), timeout=15.0
+        )
+        if rc != 0:
+            logger.warning(f"Container remove returned rc={rc}: {stderr}")
+        await slot.client.aclose()
+
+    async def health_check(self) -> dict:
+        resident = {}
+        for model, slot in list(self.slots.items()):
+            try:
+                r = await slot.client.get("/health", timeout=5.0)
+                resident[model] = "healthy" if r.status_code == 200 else "unhealthy"
+            except Exception:
+                resident[model] = "unhealthy"
+        healthy = any(v == "healthy" for v in resident.values())
+        return {"status": "healthy" if healthy else "unhealthy", "resident": resident}
+
+    async def close(self) -> None:
+        for slot in list(self.slots.values()):
+            await slot.client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "memory_budget_mb": self.memory_budget_mb,
+            "memory_used_mb": self.used_memory_mb,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "load_time_total_s": round(self.load_time_total, 3),
+            "resident": [s.info() for s in self.slots.values()],
+        }
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LB_POLICIES = ("least_outstanding", "ewma")
+# 응답 시간 EWMA 가중치
+_EWMA_ALPHA = 0.3
+
+
+def _is_replica_failure(exc: BaseException) -> bool:
+    """연결 오류나 5xx 응답이면 True (백엔드가 RuntimeError로 감싼 경우 포함)."""
+    for e in (exc, exc.__cause__):
+        if isinstance(e, httpx.TransportError):
+            return True
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code >= 500:
+            return True
+    return False
+
+
+def split_urls(value: str) -> list[str]:
+    """"http://a:8080,http://b:8080" 형식의 replica URL 목록을 분리."""
+    return [u.strip().rstrip("/") for u in value.split(",") if u.strip()]
+
+
+class Replica:
+    """같은 백엔드를 서비스하는 서버 하나와 그 client."""
+
+    def __init__(self, url: str, client: httpx.AsyncClient):
+        self.url = url
+        self.client = client
+        self.inflight = 0
+        self.latency_ewma: float | None = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.ejected_at = 0.0
+        self.ejections = 0
+
+    def info(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "inflight": self.inflight,
+            "latency_ewma_ms": (
+                round(self.latency_ewma * 1000, 2) if self.latency_ewma is not None else None
+            ),
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+        }
+
+
+class ReplicaSet:
+    """백엔드 replica 목록에 요청을 분배.
+
+    - least_outstanding: in-flight 요청이 가장 적은 replica (동률이면 EWMA 응답 시간이 짧은 쪽)
+    - ewma: EWMA 응답 시간 × (in-flight + 1)이 가장 작은 replica
+    연결 오류나 5xx 응답이 eject_failures번 연속되거나 health check가 실패하면 제외하고,
+    retry_interval이 지나면 요청 하나를 다시 보내보거나 health check 성공 시 복귀시킨다.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        make_client: Callable[[str], httpx.AsyncClient],
+        policy: str = "least_outstanding",
+        eject_failures: int = 3,
+        retry_interval: float = 10.0,
+    ):
+        if not urls:
+            raise ValueError("At least one replica URL is required")
+        if policy not in LB_POLICIES:
+            raise ValueError(
+                f"Unknown load balancing policy '{policy}' "
+                f"(expected one of {', '.join(LB_POLICIES)})"
+            )
+        self.replicas = [Replica(url, make_client(url)) for url in urls]
+        self.policy = policy
+        self.eject_failures = eject_failures
+        self.retry_interval = retry_interval
+
+    @property
+    def primary(self) -> Replica:
+        return self.replicas[0]
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def _load(self, replica: Replica) -> tuple[float, float]:
+        latency = replica.latency_ewma or 0.0
+        if self.policy == "ewma":
+            return (latency * (replica.inflight + 1), replica.inflight)
+        return (replica.inflight, latency)
+
+    def pick(self) -> Replica:
+        if len(self.replicas) == 1:
+            return self.primary
+        now = time.monotonic()
+        candidates = [
+            r for r in self.replicas
+            if r.healthy or now - r.ejected_at >= self.retry_interval
+        ]
+        # 모두 제외된 상태면 실패하더라도 전체 중에서 고른다
+        return min(candidates or self.replicas, key=self._load)
+
+    @asynccontextmanager
+    async def use(self) -> AsyncIterator[Replica]:
+        """replica 하나를 골라 in-flight/응답 시간/연결 오류·5xx를 기록."""
+        replica = self.pick()
+        if not replica.healthy:
+            # half-open: 다음 재시도는 retry_interval 뒤
+            replica.ejected_at = time.monotonic()
+        replica.inflight += 1
+        replica.requests += 1
+        started = time.monotonic()
+        try:
+            yield replica
+        except Exception as e:
+            if _is_replica_failure(e):
+                self._record_failure(replica)
+            raise
+        else:
+            elapsed = time.monotonic() - started
+            replica.latency_ewma = (
+                elapsed if replica.latency_ewma is None
+                else _EWMA_ALPHA * elapsed + (1 - _EWMA_ALPHA) * replica.latency_ewma
+            )
+            replica.consecutive_failures = 0
+            if not replica.healthy:
+                self._restore(replica)
+        finally:
+            replica.inflight -= 1
+
+    def _record_failure(self, replica: Replica) -> None:
+        replica.failures += 1
+        replica.consecutive_failures += 1
+        if replica.healthy and replica.consecutive_failures >= self.eject_failures:
+            self._eject(replica, f"{replica.consecutive_failures} consecutive failures")
+
+    def _eject(self, replica: Replica, reason: str) -> None:
+        if len(self.replicas) == 1:
+            return
+        replica.healthy = False
+        replica.ejected_at = time.monotonic()
+        replica.ejections += 1
+        logger.warning(f"Ejected replica {replica.url}: {reason}")
+
+    def _restore(self, replica: Replica) -> None:
+        replica.healthy = True
+        replica.consecutive_failures = 0
+        logger.info(f"Replica {replica.url} is back")
+
+    async def check(self, probe: Callable[[Replica], Awaitable[bool]]) -> dict[str, bool]:
+        """모든 replica를 동시에 probe해 제외/복귀를 갱신하고 replica별 결과를 반환."""
+
+        async def run(replica: Replica) -> bool:
+            try:
+                return await probe(replica)
+            except Exception:
+                return False
+
+        results = await asyncio.gather(*(run(r) for r in self.replicas))
+        for replica, ok in zip(self.replicas, results):
+            if ok and not replica.healthy:
+                self._restore(replica)
+            elif not ok and replica.healthy:
+                self._eject(replica, "health check failed")
+        return {r.url: ok for r, ok in zip(self.replicas, results)}
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "replicas": {r.url: r.info() for r in self.replicas},
+        }
+
+    async def close(self) -> None:
+        for replica in self.replicas:
+            await replica.client.aclose()
@@ -0,0 +1,277 @@
+import asyncio
+import contextvars
+import logging
+from typing import TYPE_CHECKING
+
+from embedding_gateway import context
+from embedding_gateway.errors import SwapWaitTooLongError
+
+if TYPE_CHECKING:
+    from embedding_gateway.backends.managed import ManagedContainerBackend
+
+logger = logging.getLogger(__name__)
+
+# 측정된 스왑 시간이 없을 때 쓰는 초기 추정치(초)
+DEFAULT_SWAP_ESTIMATE = 60.0
+# 스왑 시간 EWMA 가중치
+_EWMA_ALPHA = 0.5
+
+
+class _Waiter:
+    __slots__ = ("future", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future, enqueued_at: float):
+        self.future = future
+        self.enqueued_at = enqueued_at
+
+
+class SwapScheduler:
+    """managed 백엔드의 모델 스왑을 요청 큐 기반으로 스케줄링.
+
+    - 로딩된 모델 요청은 바로 통과시키고, 다른 모델 요청은 모델별 큐에 쌓는다.
+    - 다른 모델이 기다리기 시작하면 로딩된 모델은 min_hold와 그 모델의 예상 스왑 시간 중
+      큰 값만큼 더 서비스한 뒤, 새 요청 수락을 멈추고 in-flight 요청이 모두 끝나면 스왑한다.
+    - 다음 모델은 (대기 중인 요청들의 누적 대기 시간 / 측정된 스왑 시간)이 가장 큰 모델.
+    - 예상 대기 시간이 호출자의 허용치를 넘으면 SwapWaitTooLongError로 즉시 거절한다.
+
+    overlap=True (bluegreen 전략)이면 새 모델이 다른 포트에서 뜨는 동안에도 로딩된 모델 요청을
+    계속 받고, in-flight 요청을 기다리지 않고 스왑을 시작한다.
+    """
+
+    def __init__(
+        self,
+        backend: "ManagedContainerBackend",
+        min_hold: float = 5.0,
+        max_wait: float = 0.0,
+        overlap: bool = False,
+    ):
+        self.backend = backend
+        self.min_hold = min_hold
+        self.max_wait = max_wait
+        self.overlap = overlap
+        self.inflight = 0
+        self.target: str | None = None
+        self.committed = False
+        self._waiting: dict[str, list[_Waiter]] = {}
+        self._swap_started = 0.0
+        # 마지막으로 끝난 스왑의 (시작, 종료) 시각
+        self._last_swap = (0.0, 0.0)
+        self._task: asyncio.Task | None = None
+        self.swap_estimates: dict[str, float] = {}
+        self.swaps = 0
+        self.swap_failures = 0
+        self.swap_time_total = 0.0
+        self.rejected = 0
+        self.queued_requests = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    def estimate_swap(self, model: str) -> float:
+        if model in self.swap_estimates:
+            return self.swap_estimates[model]
+        if self.swap_estimates:
+            return sum(self.swap_estimates.values()) / len(self.swap_estimates)
+        return DEFAULT_SWAP_ESTIMATE
+
+    def estimate_wait(self, model: str) -> float:
+        """model 요청이 지금 들어오면 처리 시작까지 걸릴 것으로 예상되는 시간(초)."""
+        remaining = 0.0
+        if self.target is not None:
+            elapsed = self._now() - self._swap_started
+            remaining = max(self.estimate_swap(self.target) - elapsed, 0.0)
+            if model == self.target:
+                return remaining
+        if model == self.backend.current_model and (self.overlap or (
+            self.target is None and not self.committed
+        )):
+            return 0.0
+        return remaining + self.estimate_swap(model)
+
+    def _live(self, model: str) -> list[_Waiter]:
+        waiters = [w for w in self._waiting.get(model, []) if not w.future.done()]
+        if waiters:
+            self._waiting[model] = waiters
+        else:
+            self._waiting.pop(model, None)
+        return waiters
+
+    def _hold_expired(self, active: str | None) -> bool | None:
+        """다른 모델이 대기 중이면 hold 만료 여부, 대기 중인 모델이 없으면 None."""
+        now = self._now()
+        expired = None
+        for model in list(self._waiting):
+            if model == active:
+                continue
+            waiters = self._live(model)
+            if not waiters:
+                continue
+            hold = max(self.min_hold, self.estimate_swap(model))
+            if now - waiters[0].enqueued_at >= hold:
+                return True
+            expired = False
+        return expired
+
+    def _admissible(self, model: str) -> bool:
+        if model != self.backend.current_model:
+            return False
+        if self.overlap:
+            return True
+        if self.target or self.committed:
+            return False
+        if self._hold_expired(model):
+            self.committed = True
+            return False
+        return True
+
+    async def acquire(self, model: str, max_wait: float | None = None) -> None:
+        """model을 쓰는 요청 하나를 시작할 수 있을 때까지 대기."""
+        if self._admissible(model):
+            self.inflight += 1
+            return
+
+        # 요청별 허용치(X-Max-Swap-Wait)는 0이면 스왑을 기다리지 않음, 백엔드 설정은 0이면 제한 없음
+        tolerance = max_wait if max_wait is not None else (self.max_wait or None)
+        expected = self.estimate_wait(model)
+        if tolerance is not None and (tolerance == 0 or expected > tolerance):
+            self.rejected += 1
+            raise SwapWaitTooLongError(
+                f"Model '{model}' is not loaded; estimated wait {expected:.0f}s "
+                f"exceeds {tolerance:.0f}s",
+                retry_after=expected,
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        enqueued_at = self._now()
+        self._waiting.setdefault(model, []).append(_Waiter(future, enqueued_at))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 슬롯을 받은 직후 취소되면 inflight를 돌려놓는다
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            self._record_wait(enqueued_at)
+
+    def _record_wait(self, enqueued_at: float) -> None:
+        """샘플링된 요청의 대기 시간을 스왑과 겹친 구간(swap)과 나머지(queue)로 나눠 기록."""
+        timer = context.timer.get()
+        if timer is None:
+            return
+        now = self._now()
+        start, end = self._last_swap
+        swapping = max(min(end, now) - max(start, enqueued_at), 0.0)
+        timer.add("swap", swapping)
+        timer.add("queue", now - enqueued_at - swapping)
+
+    def release(self) -> None:
+        self.inflight -= 1
+        self._schedule()
+
+    def _admit(self, model: str) -> None:
+        now = self._now()
+        for waiter in self._live(model):
+            self.inflight += 1
+            waited = now - waiter.enqueued_at
+            self.queued_requests += 1
+            self.queue_wait_total += waited
+            self.queue_wait_max = max(self.queue_wait_max, waited)
+            waiter.future.set_result(None)
+        self._waiting.pop(model, None)
+
+    def _pick_next(self, active: str | None) -> str | None:
+        now = self._now()
+        best, best_score = None, -1.0
+        for model in list(self._waiting):
+            if model == active:
+                continue
+            waiters = self._live(model)
+            if not waiters:
+                continue
+            waited = sum(now - w.enqueued_at for w in waiters)
+            score = waited / max(self.estimate_swap(model), 1e-3)
+            if score > best_score:
+                best, best_score = model, score
+        return best
+
+    def _schedule(self) -> None:
+        if self.target is not None:
+            return
+        active = self.backend.current_model
+
+        if not self.committed:
+            expired = self._hold_expired(active)
+            if expired is None:
+                self._admit(active)
+                return
+            idle = self.inflight == 0 and not self._live(active)
+            if not (expired or idle):
+                self._admit(active)
+                return
+            self.committed = True
+
+        # 스왑 결정 후에는 로딩된 모델의 in-flight 요청이 모두 끝날 때까지 대기
+        # (overlap 모드는 기존 컨테이너가 계속 서비스하므로 기다리지 않음)
+        if self.overlap:
+            self._admit(active)
+        elif self.inflight > 0:
+            return
+        nxt = self._pick_next(active)
+        if nxt is None:
+            self.committed = False
+            self._admit(active)
+            return
+        self.target = nxt
+        # 스왑은 특정 요청에 속하지 않으므로 빈 context에서 실행 (요청 timer에 섞이지 않게)
+        self._task = asyncio.create_task(
+            self._run_swap(nxt), context=contextvars.Context()
+        )
+
+    async def _run_swap(self, model: str) -> None:
+        self._swap_started = self._now()
+        try:
+            await self.backend._swap_model(model)
+        except Exception as e:
+            self.swap_failures += 1
+            logger.error(f"{self.backend.label} swap to {model} failed: {e}")
+            for waiter in self._live(model):
+                waiter.future.set_exception(e)
+            self._waiting.pop(model, None)
+        else:
+            duration = self._now() - self._swap_started
+            self.swaps += 1
+            self.swap_time_total += duration
+            previous = self.swap_estimates.get(model)
+            self.swap_estimates[model] = (
+                duration if previous is None
+                else _EWMA_ALPHA * duration + (1 - _EWMA_ALPHA) * previous
+            )
+        finally:
+            self._last_swap = (self._swap_started, self._now())
+            self.target = None
+            self.committed = False
+            self._schedule()
+
+    def stats(self) -> dict:
+        return {
+            "current_model": self.backend.current_model,
+            "swapping_to": self.target,
+            "inflight": self.inflight,
+            "queued": {m: len(self._live(m)) for m in list(self._waiting)},
+            "swaps": self.swaps,
+            "swap_failures": self.swap_failures,
+            "swap_time_total_s": round(self.swap_time_total, 3),
+            "swap_estimates_s": {m: round(v, 3) for m, v in self.swap_estimates.items()},
+            "rejected": self.rejected,
+            "queued_requests": self.queued_requests,
+            "avg_queue_wait_s": (
+                round(self.queue_wait_total / self.queued_requests, 3)
+                if self.queued_requests else 0.0
+            ),
+            "max_queue_wait_s": round(self.queue_wait_max, 3),
+        }
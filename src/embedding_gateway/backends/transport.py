@@ -0,0 +1,101 @@
+"""백엔드 HTTP client 생성과 connection pool 상태.
+
+백엔드마다 pool 크기/keepalive, connect/read/pool timeout, HTTP/2를 따로 설정한다.
+TEI는 `--max-concurrent-requests`(기본 64)를 넘는 요청을 429로 거절하므로
+max_connections를 그 값에 맞추면 게이트웨이 쪽 pool 대기로 자연스럽게 흐름이 조절된다.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+import httpx
+
+from embedding_gateway import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # optional: uv sync --extra http2
+    h2 = None
+
+
+@dataclass(frozen=True)
+class HTTPOptions:
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0  # idle keepalive 연결을 닫기까지(초)
+    connect_timeout: float = 10.0
+    pool_timeout: float = 10.0  # pool에 빈 연결이 생길 때까지 기다리는 최대 시간(초)
+    http2: bool = False
+    prewarm: int = 0  # 시작 시 미리 열어둘 연결 수
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self, read: float) -> httpx.Timeout:
+        """read/write는 백엔드 timeout(임베딩 계산 시간), connect/pool은 별도."""
+        return httpx.Timeout(read, connect=self.connect_timeout, pool=self.pool_timeout)
+
+
+_warned_http2 = False
+
+
+def make_client(
+    base_url: str, timeout: float, options: HTTPOptions | None, backend: str
+) -> httpx.AsyncClient:
+    """백엔드 하나(또는 replica/컨테이너 하나)용 AsyncClient."""
+    global _warned_http2
+    options = options or HTTPOptions()
+    http2 = options.http2
+    if http2 and h2 is None:
+        if not _warned_http2:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            _warned_http2 = True
+        http2 = False
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=options.timeout(timeout),
+        limits=options.limits,
+        http2=http2,
+        event_hooks={"response": [metrics.response_hook(backend)]},
+    )
+
+
+async def prewarm(client: httpx.AsyncClient, path: str, connections: int) -> int:
+    """path로 connections개 요청을 동시에 보내 연결을 미리 열어둔다. 성공한 요청 수 반환."""
+    if connections <= 0:
+        return 0
+
+    async def hit() -> bool:
+        try:
+            await client.get(path)
+            return True
+        except httpx.HTTPError:
+            return False
+
+    results = await asyncio.gather(*(hit() for _ in range(connections)))
+    return sum(results)
+
+
+def pool_stats(client: httpx.AsyncClient) -> dict:
+    """client의 connection pool 상태 (httpcore pool을 읽을 수 없으면 빈 dict)."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return {}
+    idle = sum(1 for c in connections if c.is_idle())
+    limit = getattr(pool, "_max_connections", None)
+    return {
+        "connections": len(connections),
+        "active": len(connections) - idle,
+        "idle": idle,
+        "max_connections": limit,
+        "utilization": round((len(connections) - idle) / limit, 4) if limit else None,
+    }
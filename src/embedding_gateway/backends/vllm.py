@@ -1,22 +1,21 @@
-import asyncio
-import logging
-import subprocess
+from embedding_gateway.backends.managed import ManagedContainerBackend
 
-import httpx
 
-from embedding_gateway.backends.base import EmbeddingBackend
-from embedding_gateway.models import EmbeddingData, EmbeddingResponse, UsageInfo
-
-logger = logging.getLogger(__name__)
-
-
-class VLLMBackend(EmbeddingBackend):
-    """vLLM 임베딩 백엔드.
+class VLLMBackend(ManagedContainerBackend):
+    """vLLM 임베딩 백엔드 (TEI가 지원하지 못하는 모델용).
 
     managed 모드 (docker_image 설정): 로컬 Docker 컨테이너를 자동 관리 (시작/중지/모델 스왑).
     unmanaged 모드 (docker_image 빈값): 원격 서버에 HTTP 프록시만 수행.
+
+    vLLM은 시작할 때 --gpu-memory-utilization 비율만큼 GPU 메모리를 미리 잡는다.
+    pool 모드에서는 pool 메모리 예산을 gpu_memory_utilization에 해당하는 양으로 보고,
+    슬롯마다 모델 메모리(model_memory_mb)만큼의 비율만 주어 여러 컨테이너가 한 GPU에 함께 뜨도록 한다.
     """
 
+    label = "vLLM"
+    env_prefix = "VLLM"
+    health_poll_interval = 3.0
+
     def __init__(
         self,
         base_url: str,
@@ -28,23 +27,35 @@ class VLLMBackend(EmbeddingBackend):
         swap_timeout: float = 300.0,
         timeout: float = 120.0,
         hf_token: str = "",
+        gpu_memory_utilization: float = 0.8,
+        **kwargs,
     ):
-        self.base_url = base_url.rstrip("/")
-        self.default_model = default_model
-        self.available_models = available_models
-        self.docker_image = docker_image
-        self.container_name = container_name
-        self.wsl_distro = wsl_distro
-        self.swap_timeout = swap_timeout
-        self.hf_token = hf_token
-        self.client = httpx.AsyncClient(base_url=self.base_url, timeout=timeout)
-        self.current_model: str | None = None
-        self._swap_lock = asyncio.Lock()
+        super().__init__(
+            base_url=base_url,
+            default_model=default_model,
+            available_models=available_models,
+            docker_image=docker_image,
+            container_name=container_name,
+            wsl_distro=wsl_distro,
+            swap_timeout=swap_timeout,
+            timeout=timeout,
+            hf_token=hf_token,
+            **kwargs,
+        )
+        self.gpu_memory_utilization = gpu_memory_utilization
+        if self.managed and self.pool is not None and self.pool.size > 1:
+            if not self.pool.memory_budget_mb:
+                raise ValueError(
+                    "vLLM pool mode with more than one slot needs VLLM_POOL_MEMORY_MB "
+                    "(each container reserves a fixed share of GPU memory)"
+                )
 
-    @property
-    def managed(self) -> bool:
-        """True if this backend manages its own Docker container locally."""
-        return bool(self.docker_image)
+    def _memory_utilization(self, model_id: str) -> float:
+        """컨테이너에 줄 --gpu-memory-utilization 값."""
+        if self.pool is None or not self.pool.memory_budget_mb:
+            return self.gpu_memory_utilization
+        share = self.pool.memory_for(model_id) / self.pool.memory_budget_mb
+        return round(self.gpu_memory_utilization * min(share, 1.0), 3)
 
     async def _detect_current_model(self) -> str | None:
         """vLLM /v1/models 엔드포인트에서 현재 로딩된 모델 확인."""
@@ -58,199 +69,23 @@ class VLLMBackend(EmbeddingBackend):
             pass
         return None
 
-    async def initialize(self) -> None:
-        """시작 시 현재 vLLM 컨테이너의 모델을 감지."""
-        self.current_model = await self._detect_current_model()
-        if self.current_model:
-            logger.info(f"vLLM current model: {self.current_model}")
-        else:
-            logger.info("vLLM container not running or not healthy")
-
-    def _docker_cmd(self, *args: str) -> list[str]:
-        return ["wsl", "-d", self.wsl_distro, "--", "docker", *args]
-
-    async def _run_cmd(
-        self, cmd: list[str], timeout: float = 30.0
-    ) -> tuple[int, str, str]:
-        """Run a command using subprocess.run in a thread (Windows-safe)."""
-        cmd_str = " ".join(cmd)
-        logger.debug(f"Running: {cmd_str}")
-
-        def _sync_run() -> subprocess.CompletedProcess:
-            return subprocess.run(
-                cmd, capture_output=True, timeout=timeout
-            )
-
-        try:
-            result = await asyncio.to_thread(_sync_run)
-            stdout = result.stdout.decode(errors="replace")
-            stderr = result.stderr.decode(errors="replace")
-            if result.returncode != 0:
-                logger.warning(
-                    f"Command failed (rc={result.returncode}): {cmd_str}\n"
-                    f"stderr: {stderr}"
-                )
-            else:
-                logger.debug(f"Command OK (rc=0): {cmd_str}")
-            return result.returncode, stdout, stderr
-        except subprocess.TimeoutExpired:
-            logger.error(f"Command timed out ({timeout}s): {cmd_str}")
-            return -1, "", "timeout"
-        except Exception as e:
-            logger.error(f"Command exception: {cmd_str} -> {e}")
-            return -2, "", str(e)
-
-    async def _swap_model(self, model_id: str) -> None:
-        """컨테이너를 교체하여 다른 모델 로딩 (managed 모드 전용)."""
-        if not self.managed:
-            raise RuntimeError(
-                f"Cannot swap model on remote vLLM backend. "
-                f"Current: {self.current_model}, requested: {model_id}. "
-                f"Set VLLM_DOCKER_IMAGE to enable local Docker management."
-            )
-        async with self._swap_lock:
-            if model_id == self.current_model:
-                return
-
-            logger.info(
-                f"Swapping vLLM model: {self.current_model} -> {model_id}"
-            )
-
-            # 1. 기존 컨테이너 제거
-            rc, _, stderr = await self._run_cmd(
-                self._docker_cmd("rm", "-f", self.container_name),
-                timeout=15.0,
-            )
-            if rc != 0:
-                logger.warning(f"Container remove returned rc={rc}: {stderr}")
-
-            # 2. 새 컨테이너 시작
-            env_args: list[str] = []
-            if self.hf_token:
-                env_args = ["-e", f"HF_TOKEN={self.hf_token}"]
-
-            # base_url에서 포트 추출
-            port = self.base_url.rsplit(":", 1)[-1].split("/")[0]
-
-            run_cmd = self._docker_cmd(
-                "run", "-d",
-                "--name", self.container_name,
-                "--gpus", "all",
-                "-p", f"{port}:8000",
-                "-v", "vllm-model-cache:/root/.cache/huggingface",
-                *env_args,
-                self.docker_image,
-                model_id,
-                "--dtype", "float16",
-                "--max-model-len", "8192",
-                "--gpu-memory-utilization", "0.8",
-                "--trust-remote-code",
-            )
-            rc, stdout, stderr = await self._run_cmd(run_cmd, timeout=30.0)
-            if rc != 0:
-                raise RuntimeError(
-                    f"Failed to start vLLM container for {model_id} "
-                    f"(rc={rc}): {stderr.strip()}"
-                )
-
-            logger.info("vLLM container started, waiting for health...")
-
-            # 3. health 대기
-            await self._wait_healthy()
-            self.current_model = model_id
-            logger.info(f"vLLM model swapped to: {model_id}")
-
-    async def _wait_healthy(self) -> None:
-        """vLLM이 healthy 될 때까지 대기."""
-        deadline = asyncio.get_event_loop().time() + self.swap_timeout
-        while asyncio.get_event_loop().time() < deadline:
-            try:
-                r = await self.client.get("/health", timeout=5.0)
-                if r.status_code == 200:
-                    return
-            except Exception:
-                pass
-            await asyncio.sleep(3.0)
-        raise TimeoutError(
-            f"vLLM did not become healthy within {self.swap_timeout}s"
-        )
-
-    async def embed(
-        self,
-        texts: list[str],
-        model: str,
-        dimensions: int | None = None,
-    ) -> EmbeddingResponse:
-        # current_model이 None이면 먼저 감지 시도
-        if self.current_model is None:
-            detected = await self._detect_current_model()
-            if detected:
-                self.current_model = detected
-                logger.info(f"vLLM model detected (late): {detected}")
-
-        # managed 모드: 모델이 다르면 Docker 컨테이너 교체
-        # unmanaged(원격) 모드: 모델 체크 없이 원격 서버에 직접 요청
-        if self.managed and model != self.current_model:
-            if model not in self.available_models:
-                raise ValueError(
-                    f"Model '{model}' not in available vLLM models"
-                )
-            logger.info(
-                f"vLLM model switch: {self.current_model} -> {model}"
-            )
-            await self._swap_model(model)
-
-        try:
-            response = await self.client.post(
-                "/v1/embeddings",
-                json={"input": texts, "model": model},
-            )
-            response.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            body = e.response.text[:500] if e.response else ""
-            raise RuntimeError(
-                f"vLLM returned HTTP {e.response.status_code}: {body}"
-            ) from e
-
-        data = response.json()
-
-        embeddings_data = []
-        for d in data["data"]:
-            emb = d["embedding"]
-            if dimensions:
-                emb = emb[:dimensions]
-            embeddings_data.append(
-                EmbeddingData(embedding=emb, index=d["index"])
-            )
-
-        return EmbeddingResponse(
-            data=embeddings_data,
-            model=model,
-            usage=UsageInfo(
-                prompt_tokens=data.get("usage", {}).get("prompt_tokens", 0),
-                total_tokens=data.get("usage", {}).get("total_tokens", 0),
-            ),
-        )
-
-    async def health_check(self) -> dict:
-        mode = "managed" if self.managed else "remote"
-        try:
-            r = await self.client.get("/health", timeout=5.0)
-            return {
-                "status": "healthy" if r.status_code == 200 else "unhealthy",
-                "current_model": self.current_model,
-                "mode": mode,
-            }
-        except Exception as e:
-            return {
-                "status": "unhealthy",
-                "error": str(e),
-                "current_model": self.current_model,
-                "mode": mode,
-            }
-
-    async def list_models(self) -> list[str]:
-        return list(self.available_models)
-
-    async def close(self) -> None:
-        await self.client.aclose()
+    def _run_args(
+        self, model_id: str, container_name: str, port: int | str, gpu: str | None
+    ) -> list[str]:
+        env_args: list[str] = []
+        if self.hf_token:
+            env_args = ["-e", f"HF_TOKEN={self.hf_token}"]
+
+        return [
+            "--name", container_name,
+            "--gpus", self._gpu_arg(gpu),
+            "-p", f"{port}:8000",
+            "-v", "vllm-model-cache:/root/.cache/huggingface",
+            *env_args,
+            self.docker_image,
+            model_id,
+            "--dtype", "float16",
+            "--max-model-len", "8192",
+            "--gpu-memory-utilization", str(self._memory_utilization(model_id)),
+            "--trust-remote-code",
+        ]
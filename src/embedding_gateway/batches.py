@@ -0,0 +1,591 @@
+"""오프라인 대량 임베딩용 비동기 batch job API (OpenAI Batch API 스타일).
+
+JSONL 파일을 업로드하면 job id를 돌려주고, 백그라운드에서 한 번에 한 job씩 처리한다.
+
+- 입력 줄을 (모델, dimensions) 그룹으로 나누고 그룹 단위로 처리한다. 백엔드별로 모으고
+  현재 로딩된 모델부터 처리하므로 managed TEI/vLLM은 job 하나에 모델당 최대 한 번만 스왑한다.
+- 그룹 안에서는 window개씩 /v1/embeddings와 같은 경로(캐시, 분할, admission bulk lane)로 보낸다.
+  window 안은 텍스트 길이순으로 정렬해 보내서 chunk마다 길이가 비슷하도록(padding 최소화) 한다.
+- 결과는 그룹별 float32 파일에 이어 쓰고, window마다 진행 상황(job.json)을 저장한다.
+  재시작하면 마지막 checkpoint부터 이어서 처리한다.
+
+디렉토리 구조 (BATCH_DIR/<job id>/):
+    input.jsonl   업로드한 원본
+    meta.json     기본 model, 업로드 시점의 요청 model → resolved model 표
+    job.json      상태와 그룹별 진행 상황
+    <그룹 index>.f32  그룹 순서대로의 little-endian float32 벡터
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from embedding_gateway.errors import GatewayBusyError
+from embedding_gateway.registry import ModelRegistry
+from embedding_gateway.responses import dumps
+from embedding_gateway.vectors import unpack_float32
+
+logger = logging.getLogger(__name__)
+
+# (resolved model, texts, dimensions) -> (float32 벡터, prompt tokens)
+EmbedFn = Callable[[str, list[str], int | None], Awaitable[tuple[list[bytes], int]]]
+
+ACTIVE_STATUSES = ("queued", "in_progress")
+# 다운로드 시 한 번에 내보내는 줄 수
+_DOWNLOAD_LINES = 256
+
+
+@dataclass
+class BatchGroup:
+    model: str  # resolved model
+    dimensions: int | None
+    count: int = 0
+    done: int = 0
+    vector_dims: int | None = None  # 첫 결과에서 확인한 벡터 길이
+
+
+@dataclass
+class BatchJob:
+    id: str
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    total: int = 0
+    prompt_tokens: int = 0
+    groups: list[BatchGroup] = field(default_factory=list)
+    error: str | None = None
+    last_error: str | None = None
+
+    @property
+    def completed(self) -> int:
+        return sum(g.done for g in self.groups)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "object": "batch",
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "request_counts": {"total": self.total, "completed": self.completed},
+            "prompt_tokens": self.prompt_tokens,
+            "groups": [asdict(g) for g in self.groups],
+            "error": self.error,
+            "last_error": self.last_error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BatchJob":
+        return cls(
+            id=data["id"],
+            status=data["status"],
+            created_at=data["created_at"],
+            started_at=data.get("started_at"),
+            finished_at=data.get("finished_at"),
+            total=data["request_counts"]["total"],
+            prompt_tokens=data.get("prompt_tokens", 0),
+            groups=[BatchGroup(**g) for g in data["groups"]],
+            error=data.get("error"),
+            last_error=data.get("last_error"),
+        )
+
+
+def parse_line(
+    line: bytes, lineno: int, default_model: str | None
+) -> tuple[str, str, int | None, str]:
+    """JSONL 한 줄 → (custom_id, model, dimensions, text).
+
+    {"custom_id": ..., "model": ..., "input": "..."} 또는 OpenAI batch 형식
+    {"custom_id": ..., "body": {"model": ..., "input": "..."}}. model이 없으면 default_model.
+    """
+    try:
+        obj = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"line {lineno}: invalid JSON ({e})") from None
+    body = obj.get("body", obj) if isinstance(obj, dict) else None
+    if not isinstance(body, dict):
+        raise ValueError(f"line {lineno}: expected a JSON object")
+    text = body.get("input")
+    if not isinstance(text, str):
+        raise ValueError(f"line {lineno}: 'input' must be a single string")
+    model = body.get("model") or default_model
+    if not model:
+        raise ValueError(f"line {lineno}: no 'model' and no default model given")
+    dimensions = body.get("dimensions")
+    if dimensions is not None and not isinstance(dimensions, int):
+        raise ValueError(f"line {lineno}: 'dimensions' must be an integer")
+    return str(obj.get("custom_id", lineno)), model, dimensions, text
+
+
+def _iter_lines(path: Path) -> Iterator[tuple[int, bytes]]:
+    with open(path, "rb") as f:
+        for lineno, line in enumerate(f, 1):
+            if line.strip():
+                yield lineno, line
+
+
+class BatchJobManager:
+    def __init__(
+        self,
+        root: str | Path,
+        registry: ModelRegistry,
+        embed: EmbedFn,
+        window: int = 1024,
+        retries: int = 5,
+        busy_timeout: float = 600.0,
+    ):
+        self.root = Path(root)
+        self.registry = registry
+        self.embed = embed
+        self.window = window
+        self.retries = retries
+        self.busy_timeout = busy_timeout
+        self.jobs: dict[str, BatchJob] = {}
+        # 입력 줄의 (model, dimensions) → 그룹 index (job별, 다운로드/재개 시 재사용)
+        self._group_index: dict[str, dict[tuple[str, int | None], int]] = {}
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._running: str | None = None
+
+    # --- 저장 ---
+
+    def _dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def _save(self, job: BatchJob) -> None:
+        self._write_state(job.id, job.to_dict())
+
+    def _write_state(self, job_id: str, state: dict) -> None:
+        path = self._dir(job_id) / "job.json"
+        # checkpoint 스레드와 cancel()이 동시에 써도 서로의 임시 파일을 덮지 않도록 이름을 나눔
+        tmp = path.with_name(f"job.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, path)
+
+    def _checkpoint(self, job_id: str, g: int, vectors: list[bytes], state: dict) -> None:
+        """window 결과를 그룹 파일에 이어 쓰고 진행 상황을 저장 (스레드에서 실행)."""
+        with open(self._dir(job_id) / f"{g}.f32", "ab") as f:
+            f.write(b"".join(vectors))
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_state(job_id, state)
+
+    def _resolve(self, model: str) -> str:
+        resolved = self.registry.resolve_model(model)
+        if resolved is None:
+            raise ValueError(f"Model '{model}' not found")
+        return resolved
+
+    def _order_groups(self, groups: list[BatchGroup]) -> list[BatchGroup]:
+        """백엔드별로 모으고, 각 백엔드에서 지금 로딩된 모델을 먼저 처리하도록 정렬.
+
+        dimensions만 다른 같은 모델의 그룹은 붙여 두어 job 하나에서 모델 스왑이 한 번을 넘지 않게 한다.
+        """
+        backends = {id(b): i for i, b in enumerate(self.registry.backends.values())}
+        model_order: dict[str, int] = {}
+        for i, group in enumerate(groups):
+            model_order.setdefault(group.model, i)
+
+        def key(item: tuple[int, BatchGroup]):
+            first_seen, group = item
+            backend = self.registry.get_backend(group.model)
+            loaded = getattr(backend, "current_model", None) == group.model
+            return (
+                backends.get(id(backend), len(backends)),
+                not loaded,
+                model_order[group.model],
+                first_seen,
+            )
+
+        return [g for _, g in sorted(enumerate(groups), key=key)]
+
+    def _plan(self, job_id: str, default_model: str | None) -> tuple[BatchJob, dict[str, str]]:
+        """입력 파일을 검증하고 그룹을 만든다 (스레드에서 실행).
+
+        요청 model → resolved model 표도 함께 반환한다. 이후 처리/다운로드는 이 표를 쓰므로
+        catalog 갱신으로 해석이 바뀌거나 모델이 빠져도 job의 그룹은 그대로다.
+        """
+        groups: dict[tuple[str, int | None], BatchGroup] = {}
+        resolved: dict[str, str] = {}
+        total = 0
+        for lineno, line in _iter_lines(self._dir(job_id) / "input.jsonl"):
+            _, model, dimensions, _ = parse_line(line, lineno, default_model)
+            if model not in resolved:
+                try:
+                    resolved[model] = self._resolve(model)
+                except ValueError as e:
+                    raise ValueError(f"line {lineno}: {e}") from None
+            key = (resolved[model], dimensions)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = BatchGroup(model=resolved[model], dimensions=dimensions)
+            group.count += 1
+            total += 1
+        if not total:
+            raise ValueError("Input file has no lines")
+        job = BatchJob(id=job_id, total=total, groups=self._order_groups(list(groups.values())))
+        return job, resolved
+
+    def _groups_of(self, job: BatchJob) -> dict[tuple[str, int | None], int]:
+        index = self._group_index.get(job.id)
+        if index is None:
+            index = self._group_index[job.id] = {
+                (g.model, g.dimensions): i for i, g in enumerate(job.groups)
+            }
+        return index
+
+    def _lines(self, job: BatchJob) -> Iterator[tuple[int, str, str, str]]:
+        """입력 줄마다 (그룹 index, custom_id, 요청 model, text)."""
+        index = self._groups_of(job)
+        meta = self._meta(job.id)
+        default_model = meta.get("default_model")
+        resolved: dict[str, str] = dict(meta.get("models", {}))
+        for lineno, line in _iter_lines(self._dir(job.id) / "input.jsonl"):
+            custom_id, model, dimensions, text = parse_line(line, lineno, default_model)
+            if model not in resolved:  # models 표가 없는 이전 job
+                resolved[model] = self._resolve(model)
+            yield index[(resolved[model], dimensions)], custom_id, model, text
+
+    def _meta(self, job_id: str) -> dict:
+        path = self._dir(job_id) / "meta.json"
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    # --- API ---
+
+    async def start(self) -> None:
+        """디스크의 job을 읽고, 끝나지 않은 job은 마지막 checkpoint부터 이어서 처리."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        resumed = []
+        for path in sorted(self.root.glob("*/job.json")):
+            try:
+                job = BatchJob.from_dict(json.loads(path.read_text()))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Skipping unreadable batch job {path.parent.name}: {e}")
+                continue
+            self.jobs[job.id] = job
+            if job.status in ACTIVE_STATUSES:
+                resumed.append(job)
+        for job in sorted(resumed, key=lambda j: j.created_at):
+            self._truncate(job)
+            job.status = "queued"
+            self._queue.put_nowait(job.id)
+        if resumed:
+            logger.info(f"Resuming {len(resumed)} batch job(s)")
+        self._task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def create(
+        self, chunks: AsyncIterator[bytes], default_model: str | None = None
+    ) -> BatchJob:
+        """업로드된 JSONL을 저장하고 검증한 뒤 job을 큐에 넣는다. 잘못된 입력이면 ValueError."""
+        job_id = f"batch_{uuid.uuid4().hex}"
+        path = self._dir(job_id)
+        path.mkdir(parents=True)
+        try:
+            with open(path / "input.jsonl", "wb") as f:
+                async for chunk in chunks:
+                    f.write(chunk)
+            job, models = await asyncio.to_thread(self._plan, job_id, default_model)
+            (path / "meta.json").write_text(
+                json.dumps({"default_model": default_model, "models": models})
+            )
+        except BaseException:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+        self._save(job)
+        self.jobs[job_id] = job
+        self._queue.put_nowait(job_id)
+        return job
+
+    def get(self, job_id: str) -> BatchJob | None:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> BatchJob | None:
+        job = self.jobs.get(job_id)
+        if job is not None and job.status in ACTIVE_STATUSES:
+            # 실행 중이면 다음 window 전에 멈춘다
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            self._save(job)
+        return job
+
+    def delete(self, job_id: str) -> bool:
+        job = self.cancel(job_id)
+        if job is None:
+            return False
+        self.jobs.pop(job_id, None)
+        self._group_index.pop(job_id, None)
+        shutil.rmtree(self._dir(job_id), ignore_errors=True)
+        return True
+
+    def stats(self) -> dict:
+        by_status: dict[str, int] = {}
+        for job in self.jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {"jobs": len(self.jobs), "running": self._running, **by_status}
+
+    # --- 처리 ---
+
+    def _truncate(self, job: BatchJob) -> None:
+        """checkpoint 이후에 쓰다 만 벡터를 잘라낸다."""
+        for i, group in enumerate(job.groups):
+            path = self._dir(job.id) / f"{i}.f32"
+            if path.exists() and group.vector_dims:
+                with open(path, "r+b") as f:
+                    f.truncate(group.done * group.vector_dims * 4)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            self._running = job_id
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if job.status == "in_progress":
+                    logger.warning(f"Batch job {job_id} failed: {e}")
+                    job.status = "failed"
+                    job.error = str(e) or type(e).__name__
+                    job.finished_at = time.time()
+                    self._save(job)
+            finally:
+                self._running = None
+
+    async def _run(self, job: BatchJob) -> None:
+        job.status = "in_progress"
+        job.started_at = job.started_at or time.time()
+        self._save(job)
+        for g, group in enumerate(job.groups):
+            if group.done >= group.count:
+                continue
+            # 입력 파일 파싱과 결과/checkpoint 쓰기는 스레드에서 (큰 job이 interactive 요청을 막지 않도록)
+            windows = self._windows(job, g, group.done)
+            while (texts := await asyncio.to_thread(next, windows, None)) is not None:
+                if job.status != "in_progress":
+                    return
+                result = await self._embed(job, group, texts)
+                if result is None or job.status != "in_progress":  # 호출 중에 취소/삭제됨
+                    return
+                vectors, tokens = result
+                group.vector_dims = group.vector_dims or len(vectors[0]) // 4
+                group.done += len(texts)
+                job.prompt_tokens += tokens
+                job.last_error = None
+                await asyncio.to_thread(self._checkpoint, job.id, g, vectors, job.to_dict())
+                if job.status != "in_progress":
+                    # checkpoint 중에 취소됨: 스레드가 덮어쓴 상태 대신 취소 상태를 남긴다
+                    if job.id in self.jobs:
+                        self._save(job)
+                    return
+        job.status = "completed"
+        job.finished_at = time.time()
+        self._save(job)
+
+    def _windows(self, job: BatchJob, g: int, skip: int) -> Iterator[list[str]]:
+        """그룹 g의 텍스트를 (이미 처리한 skip개 이후부터) window개씩."""
+        window: list[str] = []
+        seen = 0
+        for group, _, _, text in self._lines(job):
+            if group != g:
+                continue
+            seen += 1
+            if seen <= skip:
+                continue
+            window.append(text)
+            if len(window) >= self.window:
+                yield window
+                window = []
+        if window:
+            yield window
+
+    async def _embed(
+        self, job: BatchJob, group: BatchGroup, texts: list[str]
+    ) -> tuple[list[bytes], int] | None:
+        """길이순으로 정렬해 보내고 원래 순서로 되돌린다. 실패하면 재시도.
+
+        재시도 사이에 job이 취소/삭제되면 None.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        attempt = 0
+        busy = 0.0
+        while True:
+            if job.status != "in_progress":
+                return None
+            try:
+                vectors, tokens = await self.embed(
+                    group.model, [texts[i] for i in order], group.dimensions
+                )
+                break
+            except GatewayBusyError as e:
+                # 게이트웨이가 바쁘면(admission 대기열, 스왑 대기, 백엔드 down) busy_timeout까지 기다린다
+                job.last_error = str(e)
+                busy += e.retry_after
+                if busy > self.busy_timeout:
+                    raise
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                attempt += 1
+                job.last_error = str(e) or type(e).__name__
+                if attempt > self.retries:
+                    raise
+                await asyncio.sleep(min(2 ** attempt, 60))
+        result: list[bytes] = [b""] * len(texts)
+        for i, vector in zip(order, vectors):
+            result[i] = vector
+        return result, tokens
+
+    # --- 결과 ---
+
+    def _readers(self, job: BatchJob) -> list:
+        return [open(self._dir(job.id) / f"{i}.f32", "rb") for i in range(len(job.groups))]
+
+    def results_jsonl(self, job: BatchJob) -> Iterator[bytes]:
+        """입력 순서대로 {"custom_id", "model", "embedding"} 줄."""
+        readers = self._readers(job)
+        try:
+            lines = []
+            for g, custom_id, model, _ in self._lines(job):
+                size = job.groups[g].vector_dims * 4
+                vector = unpack_float32(readers[g].read(size))
+                lines.append(dumps({"custom_id": custom_id, "model": model, "embedding": vector}))
+                if len(lines) >= _DOWNLOAD_LINES:
+                    yield b"\n".join(lines) + b"\n"
+                    lines = []
+            if lines:
+                yield b"\n".join(lines) + b"\n"
+        finally:
+            for f in readers:
+                f.close()
+
+    def vector_dims(self, job: BatchJob) -> int:
+        """모든 그룹의 벡터 길이 (다르면 packed 형식으로 내보낼 수 없으므로 ValueError)."""
+        dims = {g.vector_dims for g in job.groups}
+        if len(dims) != 1:
+            raise ValueError("Job has vectors of different lengths; download as JSONL instead")
+        return dims.pop()
+
+    def results_float32(self, job: BatchJob) -> Iterator[bytes]:
+        """입력 순서대로 이어 붙인 little-endian float32 벡터 (행 = 입력 줄)."""
+        if len(job.groups) == 1:
+            with open(self._dir(job.id) / "0.f32", "rb") as f:
+                while chunk := f.read(1 << 20):
+                    yield chunk
+            return
+        size = self.vector_dims(job) * 4
+        readers = self._readers(job)
+        try:
+            rows = []
+            for g, _, _, _ in self._lines(job):
+                rows.append(readers[g].read(size))
+                if len(rows) >= _DOWNLOAD_LINES:
+                    yield b"".join(rows)
+                    rows = []
+            if rows:
+                yield b"".join(rows)
+        finally:
+            for f in readers:
+                f.close()
+
+
+# Set during app startup via lifespan (BATCH_DIR가 비어있으면 None)
+manager: BatchJobManager | None = None
+
+batch_router = APIRouter()
+
+
+def _manager() -> BatchJobManager:
+    if manager is None:
+        raise HTTPException(status_code=503, detail="Batch jobs are disabled (set BATCH_DIR)")
+    return manager
+
+
+def _job(job_id: str) -> BatchJob:
+    job = _manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch '{job_id}' not found")
+    return job
+
+
+@batch_router.post("/v1/batches")
+async def create_batch(request: Request, model: str | None = Query(default=None)) -> dict:
+    """본문 JSONL(한 줄에 input 하나)을 업로드해 job 생성. model은 줄에 model이 없을 때의 기본값."""
+    try:
+        job = await _manager().create(request.stream(), model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.to_dict()
+
+
+@batch_router.get("/v1/batches")
+async def list_batches() -> dict:
+    jobs = sorted(_manager().jobs.values(), key=lambda j: j.created_at, reverse=True)
+    return {"object": "list", "data": [j.to_dict() for j in jobs]}
+
+
+@batch_router.get("/v1/batches/{job_id}")
+async def get_batch(job_id: str) -> dict:
+    return _job(job_id).to_dict()
+
+
+@batch_router.post("/v1/batches/{job_id}/cancel")
+async def cancel_batch(job_id: str) -> dict:
+    _job(job_id)
+    return _manager().cancel(job_id).to_dict()
+
+
+@batch_router.delete("/v1/batches/{job_id}")
+async def delete_batch(job_id: str) -> dict:
+    _job(job_id)
+    _manager().delete(job_id)
+    return {"id": job_id, "object": "batch", "deleted": True}
+
+
+@batch_router.get("/v1/batches/{job_id}/results")
+async def download_batch(
+    job_id: str, format: Literal["jsonl", "float32"] = Query(default="jsonl")
+) -> StreamingResponse:
+    """완료된 job 결과. float32는 입력 순서대로의 row-major 벡터 (차원은 헤더로 전달)."""
+    job = _job(job_id)
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Batch '{job_id}' is {job.status}")
+    mgr = _manager()
+    if format == "jsonl":
+        return StreamingResponse(mgr.results_jsonl(job), media_type="application/x-ndjson")
+    try:
+        dims = mgr.vector_dims(job)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return StreamingResponse(
+        mgr.results_float32(job),
+        media_type="application/octet-stream",
+        headers={
+            "X-Embedding-Dimensions": str(dims),
+            "X-Embedding-Count": str(job.total),
+            "Content-Disposition": f'attachment; filename="{job_id}.f32"',
+        },
+    )
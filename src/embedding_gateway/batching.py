@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from embedding_gateway.backends.base import EmbeddingBackend
+from embedding_gateway.errors import GatewayBusyError
+from embedding_gateway.models import EmbeddingData, EmbeddingResponse, UsageInfo
+
+logger = logging.getLogger(__name__)
+
+BatchKey = tuple[str, int | None, str]
+
+
+class _PendingBatch:
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+        # (시작 offset, 개수, future, enqueue 시각)
+        self.waiters: list[tuple[int, int, asyncio.Future, float]] = []
+        self.timer: asyncio.TimerHandle | None = None
+
+    def add(self, texts: list[str], future: asyncio.Future) -> None:
+        self.waiters.append((len(self.texts), len(texts), future, time.perf_counter()))
+        self.texts.extend(texts)
+
+
+def _split_usage(usage: UsageInfo, weights: list[int]) -> list[UsageInfo]:
+    """배치 전체 usage를 호출자별 텍스트 길이 비율로 나눈다 (합계 보존)."""
+    total = sum(weights) or 1
+    shares = [usage.prompt_tokens * w // total for w in weights]
+    shares[-1] += usage.prompt_tokens - sum(shares)
+    totals = [usage.total_tokens * w // total for w in weights]
+    totals[-1] += usage.total_tokens - sum(totals)
+    return [UsageInfo(prompt_tokens=p, total_tokens=t) for p, t in zip(shares, totals)]
+
+
+class MicroBatcher:
+    """동시에 들어온 작은 요청을 모델별로 모아 한 번의 백엔드 호출로 처리.
+
+    (model, dimensions, encoding_format)별 큐에 요청을 쌓다가 max_batch_size개가 차거나
+    첫 요청 후 max_wait_ms가 지나면 flush한다. max_batch_size 이상인 요청은 그대로 통과.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: EmbeddingBackend,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+    ):
+        self.name = name
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: dict[BatchKey, _PendingBatch] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+        self.queue_delay_total = 0.0
+        self.queue_delay_max = 0.0
+
+    async def embed(
+        self,
+        texts: list[str],
+        model: str,
+        dimensions: int | None = None,
+        encoding_format: str = "float",
+    ) -> EmbeddingResponse:
+        if len(texts) >= self.max_batch_size:
+            return await self.backend.embed(texts, model, dimensions, encoding_format)
+
+        loop = asyncio.get_running_loop()
+        key = (model, dimensions, encoding_format)
+        batch = self._pending.get(key)
+        if batch is not None and len(batch.texts) + len(texts) > self.max_batch_size:
+            self._flush(key)
+            batch = None
+        if batch is None:
+            batch = _PendingBatch()
+            batch.timer = loop.call_later(self.max_wait, self._flush, key, batch)
+            self._pending[key] = batch
+
+        future = loop.create_future()
+        batch.add(texts, future)
+        if len(batch.texts) >= self.max_batch_size:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: BatchKey, expected: _PendingBatch | None = None) -> None:
+        batch = self._pending.get(key)
+        if batch is None or (expected is not None and batch is not expected):
+            return
+        del self._pending[key]
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.create_task(self._run(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: BatchKey, batch: _PendingBatch) -> None:
+        started = time.perf_counter()
+        self.batches += 1
+        self.items += len(batch.texts)
+        self.requests += len(batch.waiters)
+        for _, _, _, enqueued in batch.waiters:
+            delay = started - enqueued
+            self.queue_delay_total += delay
+            self.queue_delay_max = max(self.queue_delay_max, delay)
+
+        model, dimensions, encoding_format = key
+        try:
+            result = await self.backend.embed(
+                batch.texts, model, dimensions, encoding_format
+            )
+        except Exception as e:
+            for _, _, future, _ in batch.waiters:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        ordered = sorted(result.data, key=lambda d: d.index)
+        usages = _split_usage(
+            result.usage,
+            [
+                sum(len(t) for t in batch.texts[start:start + count])
+                for start, count, _, _ in batch.waiters
+            ],
+        )
+        for (start, count, future, _), usage in zip(batch.waiters, usages):
+            if future.done():
+                continue
+            future.set_result(EmbeddingResponse.model_construct(
+                data=[
+                    EmbeddingData.model_construct(embedding=d.embedding, index=i)
+                    for i, d in enumerate(ordered[start:start + count])
+                ],
+                model=model,
+                usage=usage,
+            ))
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "items": self.items,
+            "requests": self.requests,
+            "pending": sum(len(b.texts) for b in self._pending.values()),
+            "avg_fill_ratio": (
+                round(self.items / (self.batches * self.max_batch_size), 4)
+                if self.batches else 0.0
+            ),
+            "avg_queue_delay_ms": (
+                round(self.queue_delay_total / self.requests * 1000, 3)
+                if self.requests else 0.0
+            ),
+            "max_queue_delay_ms": round(self.queue_delay_max * 1000, 3),
+        }
+
+
+EmbedFn = Callable[[list[str], str, int | None, str], Awaitable[EmbeddingResponse]]
+
+
+class SubBatcher:
+    """큰 input 리스트를 chunk로 나눠 최대 concurrency개씩 동시에 백엔드로 보낸다.
+
+    chunk는 chunk_size개 이하이면서 글자 수 합이 max_chars 이하가 되도록 나눈다 (토큰 수 근사,
+    0이면 개수만). max_chars보다 긴 텍스트 하나는 혼자 한 chunk가 된다.
+    결과는 원래 순서로 합치고 usage는 합산한다. 실패한 chunk만 retries회까지 재시도하며,
+    재시도 후에도 실패하면 아직 진행 중인 나머지 chunk는 취소한다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        chunk_size: int = 64,
+        concurrency: int = 4,
+        retries: int = 2,
+        retry_backoff: float = 0.5,
+        max_chars: int = 0,
+    ):
+        self.name = name
+        self.chunk_size = chunk_size
+        self.max_chars = max_chars
+        self.concurrency = concurrency
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.split_requests = 0
+        self.chunks = 0
+        self.chunk_retries = 0
+        self.chunk_failures = 0
+
+    def fits(self, texts: list[str]) -> bool:
+        """나누지 않고 한 번에 보낼 수 있는 요청인지."""
+        if len(texts) > self.chunk_size:
+            return False
+        return not self.max_chars or sum(len(t) for t in texts) <= self.max_chars
+
+    def _split(self, texts: list[str]) -> list[tuple[int, list[str]]]:
+        """(원래 offset, chunk) 목록."""
+        chunks: list[tuple[int, list[str]]] = []
+        start = chars = 0
+        for i, text in enumerate(texts):
+            if i > start and (
+                i - start >= self.chunk_size
+                or (self.max_chars and chars + len(text) > self.max_chars)
+            ):
+                chunks.append((start, texts[start:i]))
+                start, chars = i, 0
+            chars += len(text)
+        chunks.append((start, texts[start:]))
+        return chunks
+
+    async def embed(
+        self,
+        embed_fn: EmbedFn,
+        texts: list[str],
+        model: str,
+        dimensions: int | None = None,
+        encoding_format: str = "float",
+    ) -> EmbeddingResponse:
+        if self.fits(texts):
+            return await embed_fn(texts, model, dimensions, encoding_format)
+
+        self.split_requests += 1
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_chunk(chunk: list[str]) -> EmbeddingResponse:
+            async with semaphore:
+                self.chunks += 1
+                for attempt in range(self.retries + 1):
+                    try:
+                        return await embed_fn(chunk, model, dimensions, encoding_format)
+                    except (ValueError, GatewayBusyError):
+                        # 잘못된 모델 등 요청 자체의 오류나 즉시 거절은 재시도하지 않음
+                        raise
+                    except Exception as e:
+                        if attempt == self.retries:
+                            self.chunk_failures += 1
+                            raise
+                        self.chunk_retries += 1
+                        logger.warning(
+                            f"{self.name} chunk of {len(chunk)} failed "
+                            f"(attempt {attempt + 1}/{self.retries + 1}): {e}"
+                        )
+                        await asyncio.sleep(self.retry_backoff * 2**attempt)
+
+        chunks = self._split(texts)
+        tasks = [asyncio.create_task(run_chunk(chunk)) for _, chunk in chunks]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # 오류는 이미 클라이언트로 가므로 남은 chunk가 백엔드를 계속 쓰지 않게 취소
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        data: list[EmbeddingData] = []
+        prompt_tokens = total_tokens = 0
+        for (offset, _), result in zip(chunks, results):
+            for d in sorted(result.data, key=lambda d: d.index):
+                data.append(
+                    EmbeddingData.model_construct(embedding=d.embedding, index=offset + d.index)
+                )
+            prompt_tokens += result.usage.prompt_tokens
+            total_tokens += result.usage.total_tokens
+
+        return EmbeddingResponse.model_construct(
+            data=data,
+            model=model,
+            usage=UsageInfo(prompt_tokens=prompt_tokens, total_tokens=total_tokens),
+        )
+
+    def stats(self) -> dict:
+        return {
+            "chunk_size": self.chunk_size,
+            "max_chars": self.max_chars,
+            "concurrency": self.concurrency,
+            "split_requests": self.split_requests,
+            "chunks": self.chunks,
+            "chunk_retries": self.chunk_retries,
+            "chunk_failures": self.chunk_failures,
+        }
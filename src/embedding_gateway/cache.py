@@ -0,0 +1,89 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+# key(tuple) + OrderedDict 노드 + bytes 헤더의 대략적인 크기
+_ENTRY_OVERHEAD = 160
+
+CacheKey = tuple[str, int | None, bytes]
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """(모델, dimensions, 텍스트 해시) 단위의 in-memory 임베딩 캐시.
+
+    벡터는 float32 바이트로 보관하며, 메모리 예산(max_bytes)을 넘으면 LRU 순서로,
+    TTL이 지나면 조회 시점에 제거한다.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float = 0.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[CacheKey, tuple[bytes, float]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(model: str, dimensions: int | None, text: str) -> CacheKey:
+        return (model, dimensions, text_digest(text))
+
+    def get(self, key: CacheKey) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        vector, stored_at = entry
+        if self.ttl and time.monotonic() - stored_at > self.ttl:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return vector
+
+    def put(self, key: CacheKey, vector: bytes) -> None:
+        size = len(vector) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (vector, time.monotonic())
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def get_many(
+        self, model: str, dimensions: int | None, texts: list[str]
+    ) -> tuple[list[CacheKey], list[bytes | None]]:
+        keys = [self.make_key(model, dimensions, t) for t in texts]
+        return keys, [self.get(k) for k in keys]
+
+    def _remove(self, key: CacheKey) -> None:
+        vector, _ = self._entries.pop(key)
+        self._bytes -= len(vector) + _ENTRY_OVERHEAD
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+
+from embedding_gateway.models import ModelInfo
+from embedding_gateway.registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCatalog:
+    """백엔드별 모델 목록을 메모리에 보관하고 ttl마다 백그라운드에서 동시에 갱신.
+
+    갱신할 때 새로 보이는 모델은 registry에 등록하고, 발견으로 등록됐다가 사라진 모델은 제거한다.
+    목록 조회에 실패한 백엔드는 이전 목록을 그대로 유지한다.
+    """
+
+    def __init__(self, registry: ModelRegistry, ttl: float = 60.0, timeout: float = 10.0):
+        self.registry = registry
+        self.ttl = ttl
+        self.timeout = timeout
+        self._models: dict[str, list[str]] = {}
+        self.errors: dict[str, str] = {}
+        self.refreshed_at = 0.0
+        self.refreshes = 0
+        self._refresh_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def refresh(self) -> None:
+        async with self._refresh_lock:
+            backends = list(self.registry.backends.items())
+            results = await asyncio.gather(
+                *(asyncio.wait_for(b.list_models(), self.timeout) for _, b in backends),
+                return_exceptions=True,
+            )
+            for (name, backend), models in zip(backends, results):
+                if isinstance(models, BaseException):
+                    self.errors[name] = str(models) or type(models).__name__
+                    continue
+                self.errors.pop(name, None)
+                self._models[name] = list(models)
+                added, removed = self.registry.sync_models(backend, models)
+                if added or removed:
+                    logger.info(f"Models on {name}: +{added} -{removed}")
+            self.refreshed_at = time.monotonic()
+            self.refreshes += 1
+
+    async def models(self) -> list[ModelInfo]:
+        """캐시된 모델 목록. 아직 한 번도 갱신하지 않았거나 ttl이 지났으면 먼저 갱신."""
+        if not self.refreshes or (self._task is None and self.stale):
+            await self.refresh()
+        return [
+            ModelInfo(id=m, owned_by=name, backend=name)
+            for name, models in self._models.items()
+            for m in models
+        ]
+
+    @property
+    def stale(self) -> bool:
+        return time.monotonic() - self.refreshed_at >= self.ttl
+
+    async def start(self) -> None:
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Model catalog refresh failed: {e}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "backends": {name: len(models) for name, models in self._models.items()},
+            "errors": self.errors,
+            "refreshes": self.refreshes,
+            "age_s": round(time.monotonic() - self.refreshed_at, 1) if self.refreshes else None,
+        }
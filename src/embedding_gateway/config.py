@@ -1,12 +1,18 @@
+import shlex
+
 from pydantic_settings import BaseSettings
 
+from embedding_gateway.admission import LANES, AdmissionController, ConcurrencyLimiter
+from embedding_gateway.backends.transport import HTTPOptions
+from embedding_gateway.tenants import Tenant, TenantRegistry
+
 
 class Settings(BaseSettings):
     # Server
     gateway_host: str = "0.0.0.0"
     gateway_port: int = 8000
 
-    # Backend URLs
+    # Backend URLs (원격 모드는 쉼표로 여러 replica 지정 가능)
     ollama_base_url: str = "http://localhost:11434"
     tei_base_url: str = "http://localhost:8080"
 
@@ -21,6 +27,23 @@ class Settings(BaseSettings):
     tei_container_name: str = "tei-embeddings"
     tei_swap_timeout: float = 600.0
     tei_wsl_distro: str = "Ubuntu-24.04"
+    # 다른 모델이 대기 중일 때 로딩된 모델을 최소 이 시간(초)만큼 더 서비스한 뒤 스왑
+    tei_swap_min_hold: float = 5.0
+    # 스왑 예상 대기 시간이 이 값(초)을 넘으면 503 + Retry-After. 0이면 제한 없음
+    # 요청별로 X-Max-Swap-Wait 헤더로 덮어쓸 수 있음
+    tei_swap_max_wait: float = 0.0
+    # 스왑 방식: recreate (docker rm + run) | reuse (모델별 컨테이너를 docker stop/start로 재사용)
+    #          | bluegreen (새 모델을 다른 포트에 띄우고 준비되면 전환, 무중단)
+    tei_swap_strategy: str = "recreate"
+    tei_bluegreen_port: int = 0  # bluegreen 대체 포트, 0이면 base 포트 + 100
+    # docker 실행 명령 (비어있으면 "wsl -d <TEI_WSL_DISTRO> -- docker")
+    tei_docker_command: str = ""
+    # Pool 모드: 0보다 크면 최대 N개 모델 컨테이너를 포트 base, base+1, ...에 동시에 상주
+    tei_pool_size: int = 0
+    tei_pool_memory_mb: float = 0.0  # GPU 메모리 예산, 0이면 슬롯 수만 제한
+    tei_model_memory_mb: str = ""  # "model=MB,model=MB"
+    tei_default_model_memory_mb: float = 2048.0
+    tei_model_gpus: str = ""  # "model=GPU index,..." (지정 안 하면 --gpus all)
 
     # vLLM dynamic model swapping (TEI가 지원하지 못하는 모델용)
     # docker_image이 비어있으면 원격 모드 (Docker 관리 없이 HTTP 프록시만)
@@ -31,13 +54,145 @@ class Settings(BaseSettings):
     vllm_container_name: str = "vllm-embeddings"
     vllm_swap_timeout: float = 300.0
     vllm_wsl_distro: str = "Ubuntu-24.04"
+    vllm_swap_min_hold: float = 5.0
+    vllm_swap_max_wait: float = 0.0
+    vllm_swap_strategy: str = "recreate"
+    vllm_bluegreen_port: int = 0
+    vllm_docker_command: str = ""
+    vllm_pool_size: int = 0
+    vllm_pool_memory_mb: float = 0.0
+    vllm_model_memory_mb: str = ""
+    vllm_default_model_memory_mb: float = 4096.0
+    vllm_model_gpus: str = ""
+    # vLLM 컨테이너가 미리 잡는 GPU 메모리 비율. pool 모드에서는 POOL_MEMORY_MB를 이 비율로 보고
+    # 모델별 MODEL_MEMORY_MB 비중만큼 나눠 줌 (슬롯이 2개 이상이면 POOL_MEMORY_MB 필수)
+    vllm_gpu_memory_utilization: float = 0.8
 
     # HuggingFace token (gated 모델 접근용)
     hf_token: str = ""
 
+    # In-memory embedding cache (모델, dimensions, 텍스트 해시 단위)
+    cache_enabled: bool = True
+    cache_max_mb: float = 512.0
+    cache_ttl: float = 0.0  # 초, 0이면 만료 없음 (LRU만 적용)
+
+    # 같은 (모델, dimensions, 텍스트)의 동시 백엔드 호출을 하나로 합침 (single-flight)
+    singleflight_enabled: bool = True
+
+    # TEI/vLLM 응답 바이트를 그대로 전달하는 fast path (float, dimensions 없음, micro-batching 꺼짐,
+    # 한 chunk에 들어가는 요청만). cache/store가 켜져 있으면 전부 캐시 miss인 요청만 (응답으로 캐시를 채움)
+    passthrough_enabled: bool = True
+
+    # Micro-batching: 동시 요청을 모델별로 모아 한 번에 백엔드 호출
+    # max_wait_ms가 0이면 해당 백엔드는 비활성화
+    ollama_batch_max_size: int = 64
+    ollama_batch_max_wait_ms: float = 0.0
+    tei_batch_max_size: int = 64
+    tei_batch_max_wait_ms: float = 0.0
+    vllm_batch_max_size: int = 64
+    vllm_batch_max_wait_ms: float = 0.0
+
+    # 큰 input 리스트 분할: chunk_size 단위로 나눠 최대 concurrency개 동시 호출
+    # TEI는 기본 --max-client-batch-size가 32이므로 그 이하로 설정
+    ollama_chunk_size: int = 256
+    ollama_chunk_concurrency: int = 2
+    tei_chunk_size: int = 32
+    tei_chunk_concurrency: int = 8
+    vllm_chunk_size: int = 256
+    vllm_chunk_concurrency: int = 4
+    # chunk 하나의 글자 수 합 상한 (토큰 수 근사, 0이면 개수만). TEI 기본 --max-batch-tokens는 16384
+    ollama_chunk_max_chars: int = 0
+    tei_chunk_max_chars: int = 16384
+    vllm_chunk_max_chars: int = 0
+    chunk_retries: int = 2
+
+    # 백엔드 HTTP connection pool (백엔드별)
+    # TEI는 --max-concurrent-requests(managed 모드 64)를 넘는 요청을 429로 거절하므로 pool을 그에 맞춤
+    # HTTP2=true는 h2 패키지 필요 (uv sync --extra http2), 없으면 HTTP/1.1
+    # PREWARM_CONNECTIONS: 시작 시 미리 열어둘 연결 수
+    ollama_max_connections: int = 100
+    ollama_max_keepalive: int = 20
+    ollama_keepalive_expiry: float = 5.0
+    ollama_http2: bool = False
+    ollama_prewarm_connections: int = 0
+    tei_max_connections: int = 64
+    tei_max_keepalive: int = 64
+    tei_keepalive_expiry: float = 30.0
+    tei_http2: bool = False
+    tei_prewarm_connections: int = 0
+    vllm_max_connections: int = 100
+    vllm_max_keepalive: int = 20
+    vllm_keepalive_expiry: float = 5.0
+    vllm_http2: bool = False
+    vllm_prewarm_connections: int = 0
+
+    # Admission control: 백엔드별 동시 처리 요청 수(MAX_CONCURRENCY, 0이면 제한 없음)와 대기열 길이
+    # 대기열이 가득 차거나 예상 대기 시간이 ADMISSION_MAX_WAIT(초)를 넘으면 즉시 429 + Retry-After
+    # 대기열에서 ADMISSION_MAX_WAIT 이상 기다린 요청도 429. 0이면 대기 시간 제한 없음
+    # 실행 중에는 PUT /admission/{backend|model}/{name}으로 변경
+    ollama_max_concurrency: int = 0
+    ollama_max_queue: int = 256
+    tei_max_concurrency: int = 0
+    tei_max_queue: int = 256
+    vllm_max_concurrency: int = 0
+    vllm_max_queue: int = 256
+    # 모델별 제한 "model=동시 요청 수,..." (대기열 길이는 MODEL_MAX_QUEUE 공통)
+    model_max_concurrency: str = ""
+    model_max_queue: int = 64
+    admission_max_wait: float = 30.0
+    # 우선순위 lane: interactive(기본) | bulk. 대기열에서 interactive가 먼저 진행되고,
+    # 두 lane이 모두 대기 중이면 슬롯의 BULK_MIN_SHARE 비율은 bulk에 보장
+    # lane 지정: API key 매핑 "key=lane,..." (Authorization: Bearer) > X-Priority 헤더
+    # > input 개수가 PRIORITY_BULK_MIN_ITEMS 이상이면 bulk (0이면 끔)
+    priority_api_keys: str = ""
+    priority_bulk_min_items: int = 0
+    bulk_min_share: float = 0.1
+
+    # Tenant (호출 팀) 식별: "key=tenant,..." (X-API-Key 또는 Authorization: Bearer)
+    # 등록되지 않은 key나 key가 없는 요청은 "default" tenant
+    tenant_api_keys: str = ""
+    # 대기열에서 tenant 간 텍스트 처리량 비율 "tenant=weight,..." (기본 1, weighted fair queuing)
+    tenant_weights: str = ""
+    # tenant별 초당 텍스트/토큰 한도 "tenant=N,..." (없으면 무제한, 넘으면 429 + Retry-After)
+    # burst는 TENANT_BURST_SECONDS초 분량. 토큰은 응답 후 사후 차감
+    tenant_texts_per_second: str = ""
+    tenant_tokens_per_second: str = ""
+    tenant_burst_seconds: float = 1.0
+
+    # Persistent embedding store (SQLite). 비어있으면 비활성화
+    store_path: str = ""
+    store_max_mb: float = 4096.0
+
+    # 비동기 batch job (POST /v1/batches). 입력/진행 상황/결과를 저장할 디렉토리, 비어있으면 비활성화
+    batch_dir: str = ""
+    batch_window: int = 1024  # 한 번에 백엔드 경로로 보내는 텍스트 수 (chunk 분할 전)
+    batch_retries: int = 5  # window 하나의 백엔드 오류 재시도 횟수 (초과하면 job 실패)
+    batch_busy_timeout: float = 600.0  # 게이트웨이가 바쁠 때(429/503) window 하나가 기다리는 최대 시간(초)
+
+    # Replica 로드 밸런싱: least_outstanding | ewma
+    lb_policy: str = "least_outstanding"
+    replica_eject_failures: int = 3  # 연결 오류·5xx 연속 N번이면 replica 제외
+    replica_retry_interval: float = 10.0  # 제외된 replica에 다시 요청을 보내보는 간격(초)
+
+    # /v1/models 목록 캐시: TTL초마다 백그라운드에서 모든 백엔드 목록을 갱신하고
+    # 새 모델은 라우팅에 등록, 사라진 (발견으로 등록된) 모델은 제거. 0이면 요청마다 조회
+    model_catalog_ttl: float = 60.0
+
+    # GET /metrics (Prometheus). false면 요청별 지연/상태 기록을 건너뜀
+    # (cache/batching 등 stats 기반 gauge는 계속 노출)
+    metrics_enabled: bool = True
+
+    # 단계별 소요 시간(Server-Timing 헤더 + embedding_gateway.access JSON 로그)을 기록할 요청 비율
+    # 0.0이면 끔, 1.0이면 모든 요청. 운영에서는 0.01 등으로 낮춰 상시 사용
+    request_timing_sample_rate: float = 0.0
+
     # Timeouts (seconds)
-    backend_timeout: float = 120.0
+    backend_timeout: float = 120.0  # 응답 read/write (임베딩 계산 시간 포함)
+    backend_connect_timeout: float = 10.0
+    backend_pool_timeout: float = 10.0  # pool에 빈 연결이 생길 때까지 대기
     health_check_timeout: float = 5.0
+    # 백그라운드 health probe 간격(초). 0이면 /health 요청마다 직접 확인
+    health_check_interval: float = 10.0
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -47,5 +202,119 @@ class Settings(BaseSettings):
     def get_vllm_model_list(self) -> list[str]:
         return [m.strip() for m in self.vllm_models.split(",") if m.strip()]
 
+    @staticmethod
+    def parse_model_map(value: str) -> dict[str, str]:
+        """"model=value,model=value" 형식을 dict로 변환."""
+        result = {}
+        for item in value.split(","):
+            if "=" in item:
+                model, _, v = item.rpartition("=")
+                result[model.strip()] = v.strip()
+        return result
+
+    @staticmethod
+    def parse_command(value: str) -> list[str] | None:
+        return shlex.split(value) if value.strip() else None
+
+    def replica_options(self) -> dict:
+        """모든 백엔드 공통 replica 로드 밸런싱 옵션."""
+        return {
+            "lb_policy": self.lb_policy,
+            "eject_failures": self.replica_eject_failures,
+            "retry_interval": self.replica_retry_interval,
+        }
+
+    def http_options(self, prefix: str) -> HTTPOptions:
+        """백엔드별 HTTP client 옵션 (prefix: "ollama", "tei" 또는 "vllm")."""
+        def get(name: str):
+            return getattr(self, f"{prefix}_{name}")
+
+        return HTTPOptions(
+            max_connections=get("max_connections"),
+            max_keepalive_connections=get("max_keepalive"),
+            keepalive_expiry=get("keepalive_expiry"),
+            connect_timeout=self.backend_connect_timeout,
+            pool_timeout=self.backend_pool_timeout,
+            http2=get("http2"),
+            prewarm=get("prewarm_connections"),
+        )
+
+    def priority_key_map(self) -> dict[str, str]:
+        """PRIORITY_API_KEYS를 {API key: lane}으로 변환 (알 수 없는 lane이면 ValueError)."""
+        keys = self.parse_model_map(self.priority_api_keys)
+        unknown = sorted(set(keys.values()) - set(LANES))
+        if unknown:
+            raise ValueError(f"Unknown priority lane(s) in PRIORITY_API_KEYS: {', '.join(unknown)}")
+        return keys
+
+    def tenant_registry(self) -> TenantRegistry:
+        """TENANT_* 설정으로 만든 tenant 목록 (설정에 나온 모든 tenant + default)."""
+        weights = self.parse_model_map(self.tenant_weights)
+        texts = self.parse_model_map(self.tenant_texts_per_second)
+        tokens = self.parse_model_map(self.tenant_tokens_per_second)
+        keys = self.parse_model_map(self.tenant_api_keys)
+        names = set(weights) | set(texts) | set(tokens)
+        return TenantRegistry(keys, {
+            name: Tenant(
+                name,
+                weight=float(weights.get(name, 1.0)),
+                texts_per_second=float(texts.get(name, 0.0)),
+                tokens_per_second=float(tokens.get(name, 0.0)),
+                burst_seconds=self.tenant_burst_seconds,
+            )
+            for name in names
+        })
+
+    def admission_controller(
+        self, backends: list[str], weights: dict[str, float] | None = None
+    ) -> AdmissionController:
+        """백엔드 이름 목록에 대한 동시 요청 제한 (모델별 제한, tenant 가중치 포함)."""
+        return AdmissionController(
+            {
+                name: ConcurrencyLimiter(
+                    name,
+                    max_concurrency=getattr(self, f"{name}_max_concurrency"),
+                    max_queue=getattr(self, f"{name}_max_queue"),
+                    max_wait=self.admission_max_wait,
+                    bulk_share=self.bulk_min_share,
+                )
+                for name in backends
+            },
+            {
+                model: ConcurrencyLimiter(
+                    model,
+                    max_concurrency=int(limit),
+                    max_queue=self.model_max_queue,
+                    max_wait=self.admission_max_wait,
+                    bulk_share=self.bulk_min_share,
+                )
+                for model, limit in self.parse_model_map(self.model_max_concurrency).items()
+            },
+            model_max_queue=self.model_max_queue,
+            max_wait=self.admission_max_wait,
+            bulk_share=self.bulk_min_share,
+            weights=weights,
+        )
+
+    def managed_backend_options(self, prefix: str) -> dict:
+        """TEI/vLLM 공통 managed 옵션 (prefix: "tei" 또는 "vllm")."""
+        def get(name: str):
+            return getattr(self, f"{prefix}_{name}")
+
+        return {
+            "swap_min_hold": get("swap_min_hold"),
+            "swap_max_wait": get("swap_max_wait"),
+            "swap_strategy": get("swap_strategy"),
+            "bluegreen_port": get("bluegreen_port"),
+            "docker_command": self.parse_command(get("docker_command")),
+            "pool_size": get("pool_size"),
+            "pool_memory_mb": get("pool_memory_mb"),
+            "model_memory_mb": {
+                m: float(v) for m, v in self.parse_model_map(get("model_memory_mb")).items()
+            },
+            "default_model_memory_mb": get("default_model_memory_mb"),
+            "model_gpus": self.parse_model_map(get("model_gpus")),
+        }
+
 
 settings = Settings()
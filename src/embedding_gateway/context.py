@@ -0,0 +1,16 @@
+"""요청 단위 상태를 라우터에서 백엔드까지 전달하기 위한 ContextVar 모음.
+
+EmbeddingBackend.embed() 시그니처를 바꾸지 않고, 배처/분할기를 거쳐도 값이 유지된다.
+"""
+
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from embedding_gateway.timing import PhaseTimer
+
+# 모델 스왑을 기다릴 수 있는 최대 시간(초). None이면 백엔드 기본값 사용
+swap_max_wait: ContextVar[float | None] = ContextVar("swap_max_wait", default=None)
+
+# 샘플링된 요청의 단계별 소요 시간 (timing.PhaseTimer). None이면 기록하지 않음
+timer: ContextVar["PhaseTimer | None"] = ContextVar("timer", default=None)
@@ -0,0 +1,29 @@
+class GatewayBusyError(Exception):
+    """지금은 처리할 수 없어 즉시 거절하는 요청 (Retry-After와 함께 응답).
+
+    백엔드 오류(502)와 달리 클라이언트가 retry_after초 뒤 다시 시도하면 되는 상황.
+    """
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SwapWaitTooLongError(GatewayBusyError):
+    """모델 스왑 예상 대기 시간이 호출자의 허용치를 넘음."""
+
+
+class BackendUnavailableError(GatewayBusyError):
+    """백그라운드 health check에서 내려간 것으로 확인된 백엔드."""
+
+
+class AdmissionRejectedError(GatewayBusyError):
+    """동시 요청 제한의 대기열이 가득 찼거나 예상 대기 시간이 허용치를 넘음."""
+
+    status_code = 429
+
+
+class TenantRateLimitedError(AdmissionRejectedError):
+    """tenant의 초당 텍스트/토큰 한도 초과."""
@@ -1,11 +1,128 @@
+import asyncio
+import logging
+import time
+
 from fastapi import APIRouter
 
+from embedding_gateway.backends.base import EmbeddingBackend
 from embedding_gateway.registry import ModelRegistry
 
+logger = logging.getLogger(__name__)
+
 health_router = APIRouter(tags=["health"])
 
 # Set during app startup via lifespan
 registry: ModelRegistry | None = None
+monitor: "HealthMonitor | None" = None
+
+
+class BackendHealth:
+    """백엔드 하나의 마지막 health check 결과."""
+
+    __slots__ = ("result", "checked_at", "latency_ms", "consecutive_failures")
+
+    def __init__(self, result: dict, checked_at: float, latency_ms: float, failures: int):
+        self.result = result
+        self.checked_at = checked_at
+        self.latency_ms = latency_ms
+        self.consecutive_failures = failures
+
+    @property
+    def healthy(self) -> bool:
+        return self.result.get("status") == "healthy"
+
+    def info(self) -> dict:
+        return {
+            **self.result,
+            "checked_at": round(self.checked_at, 3),
+            "latency_ms": round(self.latency_ms, 2),
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+async def check_backend(backend: EmbeddingBackend, timeout: float) -> tuple[dict, float]:
+    """health_check()를 timeout 안에 실행해 (결과, 소요 ms)를 반환."""
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(backend.health_check(), timeout)
+    except asyncio.TimeoutError:
+        result = {"status": "unhealthy", "error": f"health check timed out after {timeout}s"}
+    except Exception as e:
+        result = {"status": "unhealthy", "error": str(e)}
+    return result, (time.perf_counter() - started) * 1000
+
+
+class HealthMonitor:
+    """모든 백엔드를 interval마다 동시에 probe하고 마지막 결과를 보관.
+
+    /health, /health/ready는 이 snapshot을 바로 반환하고, 라우터는 is_down()으로
+    내려간 것으로 알려진 백엔드 요청을 timeout 없이 거절한다.
+    """
+
+    def __init__(self, registry: ModelRegistry, interval: float = 10.0, timeout: float = 5.0):
+        self.registry = registry
+        self.interval = interval
+        self.timeout = timeout
+        self.snapshot: dict[str, BackendHealth] = {}
+        self._by_backend: dict[EmbeddingBackend, BackendHealth] = {}
+        self._task: asyncio.Task | None = None
+        self.probes = 0
+
+    async def probe_all(self) -> dict[str, BackendHealth]:
+        backends = list(self.registry.backends.items())
+        results = await asyncio.gather(
+            *(check_backend(backend, self.timeout) for _, backend in backends)
+        )
+        now = time.time()
+        for (name, backend), (result, latency_ms) in zip(backends, results):
+            previous = self.snapshot.get(name)
+            failures = 0 if result.get("status") == "healthy" else (
+                (previous.consecutive_failures if previous else 0) + 1
+            )
+            if previous is not None and previous.healthy != (failures == 0):
+                logger.info(f"Backend {name} is now {result.get('status')}")
+            state = BackendHealth(result, now, latency_ms, failures)
+            self.snapshot[name] = state
+            self._by_backend[backend] = state
+        self.probes += 1
+        return self.snapshot
+
+    def is_down(self, backend: EmbeddingBackend) -> bool:
+        """마지막 probe에서 unhealthy였고, 요청 시 스스로 띄울 수 없는 백엔드."""
+        state = self._by_backend.get(backend)
+        return state is not None and not state.healthy and not backend.starts_on_demand
+
+    async def start(self) -> None:
+        await self.probe_all()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.warning(f"Health probe failed: {e}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def _current() -> dict[str, dict]:
+    """백엔드별 health 결과 (monitor가 있으면 snapshot, 없으면 동시에 직접 확인)."""
+    if monitor is not None:
+        if not monitor.snapshot:
+            await monitor.probe_all()
+        return {name: state.info() for name, state in monitor.snapshot.items()}
+    backends = list(registry.backends.items())
+    results = await asyncio.gather(*(check_backend(b, 5.0) for _, b in backends))
+    return {name: result for (name, _), (result, _) in zip(backends, results)}
 
 
 @health_router.get("/health")
@@ -13,11 +130,9 @@ async def health() -> dict:
     if registry is None:
         return {"status": "unhealthy", "detail": "Not initialized"}
 
-    results = {}
+    results = await _current()
     overall = "healthy"
-    for name, backend in registry.backends.items():
-        check = await backend.health_check()
-        results[name] = check
+    for check in results.values():
         if check.get("status") != "healthy":
             overall = "degraded"
 
@@ -30,9 +145,5 @@ async def readiness() -> dict:
     if registry is None:
         return {"ready": False}
 
-    for _, backend in registry.backends.items():
-        check = await backend.health_check()
-        if check.get("status") == "healthy":
-            return {"ready": True}
-
-    return {"ready": False}
+    results = await _current()
+    return {"ready": any(r.get("status") == "healthy" for r in results.values())}
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -7,13 +8,21 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
 from embedding_gateway.backends.ollama import OllamaBackend
+from embedding_gateway.batches import BatchJobManager, batch_router
 from embedding_gateway.backends.tei import TEIBackend
 from embedding_gateway.backends.vllm import VLLMBackend
+from embedding_gateway.batching import MicroBatcher, SubBatcher
+from embedding_gateway.cache import EmbeddingCache
+from embedding_gateway.catalog import ModelCatalog
 from embedding_gateway.config import settings
-from embedding_gateway.health import health_router
+from embedding_gateway.health import HealthMonitor, health_router
 from embedding_gateway.registry import ModelRegistry
 from embedding_gateway.router import router
+from embedding_gateway.singleflight import SingleFlight
+from embedding_gateway.store import EmbeddingStore
+from embedding_gateway import batches as batches_module
 from embedding_gateway import health as health_module
+from embedding_gateway import metrics, timing
 from embedding_gateway import router as router_module
 
 
@@ -25,6 +34,8 @@ async def lifespan(app: FastAPI):
     ollama = OllamaBackend(
         base_url=settings.ollama_base_url,
         timeout=settings.backend_timeout,
+        http=settings.http_options("ollama"),
+        **settings.replica_options(),
     )
     reg.register_backend("ollama", ollama)
 
@@ -40,6 +51,9 @@ async def lifespan(app: FastAPI):
         swap_timeout=settings.tei_swap_timeout,
         timeout=settings.backend_timeout,
         hf_token=settings.hf_token,
+        **settings.managed_backend_options("tei"),
+        **settings.replica_options(),
+        http=settings.http_options("tei"),
     )
     await tei.initialize()
     reg.register_backend("tei", tei)
@@ -58,6 +72,10 @@ async def lifespan(app: FastAPI):
             swap_timeout=settings.vllm_swap_timeout,
             timeout=settings.backend_timeout,
             hf_token=settings.hf_token,
+            gpu_memory_utilization=settings.vllm_gpu_memory_utilization,
+            **settings.managed_backend_options("vllm"),
+            **settings.replica_options(),
+            http=settings.http_options("vllm"),
         )
         await vllm.initialize()
         reg.register_backend("vllm", vllm)
@@ -101,20 +119,109 @@ async def lifespan(app: FastAPI):
         for m in vllm_models:
             reg.register_model(m, vllm)
 
+    # 설정된 수만큼 백엔드 연결을 미리 열어 첫 요청의 연결 지연을 없앰
+    await asyncio.gather(*(b.prewarm() for b in reg.backends.values()))
+
     # Auto-discover additional models from running backends
-    await reg.discover_models()
+    # (catalog가 켜져 있으면 주기적으로 다시 확인해 새로 pull한 모델도 등록)
+    catalog = None
+    if settings.model_catalog_ttl > 0:
+        catalog = ModelCatalog(reg, ttl=settings.model_catalog_ttl)
+        await catalog.start()
+        router_module.catalog = catalog
+    else:
+        await reg.discover_models()
 
     # Wire registry into routers
     router_module.registry = reg
+    if settings.cache_enabled:
+        router_module.cache = EmbeddingCache(
+            max_bytes=int(settings.cache_max_mb * 1024 * 1024),
+            ttl=settings.cache_ttl,
+        )
+    router_module.passthrough = settings.passthrough_enabled
+    tenants = settings.tenant_registry()
+    router_module.tenants = tenants
+    router_module.admission = settings.admission_controller(list(reg.backends), tenants.weights)
+    router_module.priority_keys = settings.priority_key_map()
+    router_module.bulk_min_items = settings.priority_bulk_min_items
+    metrics.enabled = settings.metrics_enabled
+    timing.sample_rate = settings.request_timing_sample_rate
+    if settings.singleflight_enabled:
+        router_module.singleflight = SingleFlight()
+    for name, backend in reg.backends.items():
+        router_module.splitters[backend] = SubBatcher(
+            name,
+            chunk_size=getattr(settings, f"{name}_chunk_size"),
+            concurrency=getattr(settings, f"{name}_chunk_concurrency"),
+            retries=settings.chunk_retries,
+            max_chars=getattr(settings, f"{name}_chunk_max_chars"),
+        )
+        max_wait_ms = getattr(settings, f"{name}_batch_max_wait_ms")
+        if max_wait_ms > 0:
+            router_module.batchers[backend] = MicroBatcher(
+                name,
+                backend,
+                max_batch_size=getattr(settings, f"{name}_batch_max_size"),
+                max_wait_ms=max_wait_ms,
+            )
+    store = None
+    if settings.store_path:
+        store = EmbeddingStore(
+            settings.store_path,
+            max_bytes=int(settings.store_max_mb * 1024 * 1024),
+        )
+        router_module.store = store
     health_module.registry = reg
+    monitor = None
+    if settings.health_check_interval > 0:
+        monitor = HealthMonitor(
+            reg,
+            interval=settings.health_check_interval,
+            timeout=settings.health_check_timeout,
+        )
+        await monitor.start()
+        health_module.monitor = monitor
+        router_module.health_monitor = monitor
+
+    batch_manager = None
+    if settings.batch_dir:
+        batch_manager = BatchJobManager(
+            settings.batch_dir,
+            reg,
+            router_module.embed_vectors,
+            window=settings.batch_window,
+            retries=settings.batch_retries,
+            busy_timeout=settings.batch_busy_timeout,
+        )
+        await batch_manager.start()
+        batches_module.manager = batch_manager
 
     yield
 
     # Cleanup
+    if batch_manager:
+        await batch_manager.stop()
+        batches_module.manager = None
+    if catalog:
+        await catalog.stop()
+        router_module.catalog = None
+    if monitor:
+        await monitor.stop()
+        health_module.monitor = None
+        router_module.health_monitor = None
+    router_module.batchers.clear()
+    router_module.splitters.clear()
+    router_module.singleflight = None
+    router_module.request_metrics.clear()
+    router_module.admission = None
+    router_module.tenants = None
     await ollama.close()
     await tei.close()
     if vllm:
         await vllm.close()
+    if store:
+        store.close()
 
 
 app = FastAPI(
@@ -126,6 +233,7 @@ app = FastAPI(
 
 app.include_router(router)
 app.include_router(health_router)
+app.include_router(batch_router)
 
 # Static files & playground
 _static_dir = Path(__file__).parent / "static"
@@ -0,0 +1,367 @@
+"""Prometheus text format 메트릭 (GET /metrics).
+
+hot path 비용을 줄이기 위해 외부 라이브러리 없이 최소한으로 구현한다.
+- labels(...)는 라벨 값 tuple별 child를 한 번 만들어 재사용 (이후 dict 조회 1번)
+- Histogram.observe는 bucket 하나만 증가시키고, 누적 합은 scrape할 때 계산
+- cache/batching 등 기존 stats()는 scrape할 때 collector가 읽어서 변환
+이벤트 루프 스레드에서만 갱신한다고 가정하므로 lock을 쓰지 않는다.
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+Sample = tuple[str, dict[str, str], float]
+
+# 요청 지연 (초). 캐시 hit(~ms)부터 모델 스왑 대기(~분)까지
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+SWAP_BUCKETS = (0.01, 0.1, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+ITEM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new_child(self):
+        """라벨 값 tuple 하나에 대응하는 child."""
+
+    def labels(self, *values: str):
+        """라벨 값에 해당하는 child (처음 한 번만 생성)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def clear(self) -> None:
+        self._children.clear()
+
+    def samples(self) -> Iterable[Sample]:
+        for values, child in self._children.items():
+            yield self.name, dict(zip(self.labelnames, values)), child.value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def samples(self) -> Iterable[Sample]:
+        for values, child in self._children.items():
+            labels = dict(zip(self.labelnames, values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), child.counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricFamily:
+    """collector가 scrape 시점에 만들어 반환하는 메트릭."""
+
+    def __init__(self, name: str, type: str, help: str):
+        self.name = name
+        self.type = type
+        self.help = help
+        self._samples: list[Sample] = []
+
+    def add(self, labels: dict[str, str], value: float, suffix: str = "") -> "MetricFamily":
+        self._samples.append((self.name + suffix, labels, value))
+        return self
+
+    def samples(self) -> Iterable[Sample]:
+        return self._samples
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+def stats_families(
+    prefix: str, stats: dict, label: str | tuple[str, ...] | None = None
+) -> list[MetricFamily]:
+    """기존 stats() dict들의 숫자 값을 `{prefix}_{key}` gauge로 변환.
+
+    stats는 {라벨 값: stats dict}이며 label이 None이면 라벨 없이 하나만 쓴다.
+    label이 tuple이면 라벨 값도 같은 길이의 tuple.
+    문자열/중첩 dict 등 숫자가 아닌 값은 건너뛴다.
+    """
+    families: dict[str, MetricFamily] = {}
+    for value, component in stats.items():
+        if label is None:
+            labels = {}
+        elif isinstance(label, tuple):
+            labels = dict(zip(label, value))
+        else:
+            labels = {label: value}
+        for key, v in component.items():
+            if not isinstance(v, (int, float)):
+                continue
+            name = f"{prefix}_{key}"
+            family = families.get(name)
+            if family is None:
+                family = families[name] = MetricFamily(name, "gauge", f"{prefix} {key}")
+            family.add(labels, float(v))
+    return list(families.values())
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        families: list = list(self._metrics.values())
+        for collector in self._collectors:
+            families.extend(collector())
+        lines: list[str] = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for name, labels, value in family.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# False면 라우터의 요청별 기록을 건너뜀 (METRICS_ENABLED)
+enabled = True
+
+REQUESTS = REGISTRY.counter(
+    "embedding_gateway_requests_total",
+    "Embedding requests by resolved model, backend and HTTP status",
+    ("model", "backend", "status"),
+)
+REQUEST_DURATION = REGISTRY.histogram(
+    "embedding_gateway_request_duration_seconds",
+    "End-to-end /v1/embeddings latency",
+    ("model", "backend"),
+)
+REQUEST_ITEMS = REGISTRY.histogram(
+    "embedding_gateway_request_items",
+    "Input texts per request",
+    ("model", "backend"),
+    buckets=ITEM_BUCKETS,
+)
+REQUEST_TOKENS = REGISTRY.counter(
+    "embedding_gateway_tokens_total",
+    "Prompt tokens reported by backends",
+    ("model", "backend"),
+)
+INFLIGHT = REGISTRY.gauge(
+    "embedding_gateway_inflight_requests",
+    "Embedding requests currently being processed",
+    ("backend",),
+)
+BACKEND_RESPONSES = REGISTRY.counter(
+    "embedding_gateway_backend_responses_total",
+    "HTTP responses received from backends by status code",
+    ("backend", "status"),
+)
+SWAP_DURATION = REGISTRY.histogram(
+    "embedding_gateway_swap_duration_seconds",
+    "Managed backend model swap duration by strategy kind",
+    ("backend", "kind"),
+    buckets=SWAP_BUCKETS,
+)
+SWAP_LOCK_WAIT = REGISTRY.histogram(
+    "embedding_gateway_swap_lock_wait_seconds",
+    "Time spent waiting to acquire a managed backend's swap lock",
+    ("backend",),
+    buckets=SWAP_BUCKETS,
+)
+LANE_DURATION = REGISTRY.histogram(
+    "embedding_gateway_lane_request_duration_seconds",
+    "End-to-end /v1/embeddings latency by priority lane",
+    ("backend", "lane"),
+)
+ADMISSION_WAIT = REGISTRY.histogram(
+    "embedding_gateway_admission_wait_seconds",
+    "Time spent in an admission queue by limiter and priority lane",
+    ("name", "lane"),
+)
+
+TENANT_DURATION = REGISTRY.histogram(
+    "embedding_gateway_tenant_request_duration_seconds",
+    "End-to-end /v1/embeddings latency by tenant",
+    ("tenant",),
+)
+TENANT_TEXTS = REGISTRY.counter(
+    "embedding_gateway_tenant_texts_total",
+    "Input texts embedded successfully by tenant",
+    ("tenant",),
+)
+TENANT_TOKENS = REGISTRY.counter(
+    "embedding_gateway_tenant_tokens_total",
+    "Prompt tokens reported by backends by tenant",
+    ("tenant",),
+)
+TENANT_THROTTLED = REGISTRY.counter(
+    "embedding_gateway_tenant_throttled_total",
+    "Requests rejected by a tenant's texts/tokens per second limit",
+    ("tenant", "reason"),
+)
+
+
+class RequestMetrics:
+    """(model, backend)별로 미리 바인딩한 요청 메트릭 child."""
+
+    __slots__ = (
+        "model", "backend", "duration", "items", "tokens", "inflight", "_requests", "_lanes"
+    )
+
+    def __init__(self, model: str, backend: str):
+        self.model = model
+        self.backend = backend
+        self.duration = REQUEST_DURATION.labels(model, backend)
+        self.items = REQUEST_ITEMS.labels(model, backend)
+        self.tokens = REQUEST_TOKENS.labels(model, backend)
+        self.inflight = INFLIGHT.labels(backend)
+        self._requests: dict[int, _CounterChild] = {}
+        self._lanes: dict[str, _HistogramChild] = {}
+
+    def finish(self, status: int, items: int, elapsed: float, lane: str = "interactive") -> None:
+        self.inflight.dec()
+        self.duration.observe(elapsed)
+        lane_duration = self._lanes.get(lane)
+        if lane_duration is None:
+            lane_duration = self._lanes[lane] = LANE_DURATION.labels(self.backend, lane)
+        lane_duration.observe(elapsed)
+        self.items.observe(items)
+        child = self._requests.get(status)
+        if child is None:
+            child = self._requests[status] = REQUESTS.labels(
+                self.model, self.backend, str(status)
+            )
+        child.inc()
+
+
+POOL_TIMEOUTS = REGISTRY.counter(
+    "embedding_gateway_http_pool_timeouts_total",
+    "Backend requests that timed out waiting for a free pooled connection",
+    ("backend",),
+)
+
+
+def response_hook(backend: str) -> Callable:
+    """httpx response event hook: 백엔드 HTTP status 별 카운트."""
+    children: dict[int, _CounterChild] = {}
+
+    async def hook(response) -> None:
+        child = children.get(response.status_code)
+        if child is None:
+            child = children[response.status_code] = BACKEND_RESPONSES.labels(
+                backend, str(response.status_code)
+            )
+        child.inc()
+
+    return hook
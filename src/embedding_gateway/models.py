@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Literal
 
 
@@ -11,7 +11,8 @@ class EmbeddingRequest(BaseModel):
 
 class EmbeddingData(BaseModel):
     object: Literal["embedding"] = "embedding"
-    embedding: list[float]
+    # encoding_format="base64"이면 little-endian float32 바이트의 base64 문자열
+    embedding: list[float] | str
     index: int
 
 
@@ -37,3 +38,12 @@ class ModelInfo(BaseModel):
 class ModelListResponse(BaseModel):
     object: Literal["list"] = "list"
     data: list[ModelInfo]
+
+
+class AdmissionLimits(BaseModel):
+    """PUT /admission/{scope}/{name} 본문. 지정한 값만 바꾼다."""
+
+    max_concurrency: int | None = Field(default=None, ge=0)
+    max_queue: int | None = Field(default=None, ge=0)
+    max_wait: float | None = Field(default=None, ge=0)
+    bulk_share: float | None = Field(default=None, ge=0, le=1)
@@ -1,37 +1,187 @@
+import asyncio
+from collections import OrderedDict
+
 from embedding_gateway.backends.base import EmbeddingBackend
 
+# resolve_model 결과 memo 최대 항목 수
+RESOLVE_CACHE_SIZE = 4096
+
+
+def normalize_model_name(name: str) -> str:
+    """대소문자와 Ollama 기본 태그(:latest)를 무시한 비교용 이름."""
+    name = name.strip().lower()
+    return name.removesuffix(":latest")
+
+
+class _TrieNode:
+    __slots__ = ("children", "model", "best")
 
-class ModelRegistry:
     def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        # 이 노드에서 끝나는 등록 모델
+        self.model: str | None = None
+        # 이 노드 아래(자신 포함) 모델 중 가장 작은 (정규화 길이, 이름)
+        self.best: tuple[int, str] | None = None
+
+
+class ModelRegistry:
+    """모델 이름 → 백엔드 매핑.
+
+    요청된 이름은 다음 순서로 해석한다.
+    1. 정확히 일치하는 등록 이름
+    2. 정규화한 alias: 대소문자/`:latest` 무시, HF `org/name`의 `name`만 (겹치지 않을 때)
+    3. 등록 이름 중 요청 이름의 가장 긴 prefix (예: "bge-m3:q8" → "bge-m3")
+    4. 요청 이름으로 시작하는 등록 이름 중 가장 짧은 것, 길이가 같으면 사전순
+       (예: "qwen3-embedding" → "qwen3-embedding:4b")
+    2~4는 등록 시 만든 alias 표와 trie로 찾고, 결과는 크기 제한이 있는 memo에 저장한다.
+    """
+
+    def __init__(self, resolve_cache_size: int = RESOLVE_CACHE_SIZE) -> None:
         self._model_map: dict[str, EmbeddingBackend] = {}
         self.backends: dict[str, EmbeddingBackend] = {}
+        # 백엔드 목록에서 발견해 등록한 모델 (설정으로 등록한 모델과 달리 사라지면 제거)
+        self._discovered: set[str] = set()
+        self._aliases: dict[str, str] = {}
+        self._ambiguous: set[str] = set()
+        self._trie = _TrieNode()
+        self._resolved: OrderedDict[str, str | None] = OrderedDict()
+        self._resolve_cache_size = resolve_cache_size
+        self.resolve_hits = 0
+        self.resolve_misses = 0
 
     def register_backend(self, name: str, backend: EmbeddingBackend) -> None:
         self.backends[name] = backend
 
-    def register_model(self, model_name: str, backend: EmbeddingBackend) -> None:
+    def register_model(
+        self, model_name: str, backend: EmbeddingBackend, discovered: bool = False
+    ) -> None:
+        new = model_name not in self._model_map
         self._model_map[model_name] = backend
+        if discovered and new:
+            self._discovered.add(model_name)
+        elif not discovered:
+            self._discovered.discard(model_name)
+        if new:
+            self._index(model_name)
+            self._resolved.clear()
 
-    def get_backend(self, model_name: str) -> EmbeddingBackend | None:
-        # Exact match
+    def unregister_models(self, model_names: list[str]) -> None:
+        for name in model_names:
+            self._model_map.pop(name, None)
+            self._discovered.discard(name)
+        # trie에서 지우는 대신 남은 모델로 인덱스를 다시 만든다 (드문 작업)
+        self._aliases.clear()
+        self._ambiguous.clear()
+        self._trie = _TrieNode()
+        for name in self._model_map:
+            self._index(name)
+        self._resolved.clear()
+
+    def sync_models(
+        self, backend: EmbeddingBackend, models: list[str]
+    ) -> tuple[list[str], list[str]]:
+        """백엔드가 보고한 모델 목록으로 등록을 맞춘다. (추가된 모델, 제거된 모델) 반환.
+
+        설정으로 등록한 모델은 목록에 없어도 유지하고, 발견으로 등록한 모델만 제거한다.
+        """
+        added = [m for m in models if m not in self._model_map]
+        for model in added:
+            self.register_model(model, backend, discovered=True)
+        current = set(models)
+        removed = [
+            m for m in self._discovered
+            if self._model_map.get(m) is backend and m not in current
+        ]
+        if removed:
+            self.unregister_models(removed)
+        return added, removed
+
+    def _index(self, model_name: str) -> None:
+        normalized = normalize_model_name(model_name)
+        # 정규화한 전체 이름은 짧은 alias보다 우선
+        holder = self._aliases.get(normalized)
+        if holder is None or normalize_model_name(holder) != normalized:
+            self._aliases[normalized] = model_name
+            self._ambiguous.discard(normalized)
+        if "/" in normalized:
+            short = normalized.rsplit("/", 1)[1]
+            holder = self._aliases.get(short)
+            if holder is None and short not in self._ambiguous:
+                self._aliases[short] = model_name
+            elif holder is not None and normalize_model_name(holder) != short:
+                # 서로 다른 org의 같은 이름이면 짧은 alias로 쓰지 않음
+                del self._aliases[short]
+                self._ambiguous.add(short)
+
+        key = (len(normalized), model_name)
+        node = self._trie
+        for ch in normalized:
+            node = node.children.setdefault(ch, _TrieNode())
+            if node.best is None or key < node.best:
+                node.best = key
+        if node.model is None:
+            node.model = model_name
+
+    def resolve_model(self, model_name: str) -> str | None:
+        """요청된 모델 이름에 대응하는 등록된 모델 이름을 반환."""
         if model_name in self._model_map:
-            return self._model_map[model_name]
-        # Partial match (e.g. "bge-m3:latest" matches "bge-m3")
-        for registered, backend in self._model_map.items():
-            if model_name.startswith(registered) or registered.startswith(model_name):
-                return backend
-        return None
+            return model_name
+        if model_name in self._resolved:
+            self._resolved.move_to_end(model_name)
+            self.resolve_hits += 1
+            return self._resolved[model_name]
+
+        self.resolve_misses += 1
+        resolved = self._lookup(model_name)
+        self._resolved[model_name] = resolved
+        if len(self._resolved) > self._resolve_cache_size:
+            self._resolved.popitem(last=False)
+        return resolved
+
+    def _lookup(self, model_name: str) -> str | None:
+        normalized = normalize_model_name(model_name)
+        if not normalized:
+            return None
+        alias = self._aliases.get(normalized)
+        if alias is not None:
+            return alias
+
+        # 요청 이름을 따라 내려가며 가장 긴 등록 prefix를 기록
+        node, longest = self._trie, None
+        for ch in normalized:
+            node = node.children.get(ch)
+            if node is None:
+                return longest
+            if node.model is not None:
+                longest = node.model
+        return longest or node.best[1]
+
+    def get_backend(self, model_name: str) -> EmbeddingBackend | None:
+        resolved = self.resolve_model(model_name)
+        if resolved is None:
+            return None
+        return self._model_map[resolved]
 
     async def discover_models(self) -> None:
         """Auto-discover models from all backends and register them."""
-        for backend_name, backend in self.backends.items():
-            try:
-                models = await backend.list_models()
-                for model in models:
-                    if model not in self._model_map:
-                        self.register_model(model, backend)
-            except Exception:
-                pass  # Backend might be offline
+        backends = list(self.backends.values())
+        results = await asyncio.gather(
+            *(b.list_models() for b in backends), return_exceptions=True
+        )
+        for backend, models in zip(backends, results):
+            if isinstance(models, BaseException):
+                continue  # Backend might be offline
+            self.sync_models(backend, models)
 
     def all_model_names(self) -> list[str]:
         return list(self._model_map.keys())
+
+    def stats(self) -> dict:
+        return {
+            "models": len(self._model_map),
+            "discovered_models": len(self._discovered),
+            "aliases": len(self._aliases),
+            "resolve_cache_size": len(self._resolved),
+            "resolve_cache_hits": self.resolve_hits,
+            "resolve_cache_misses": self.resolve_misses,
+        }
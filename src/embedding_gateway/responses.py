@@ -0,0 +1,93 @@
+"""/v1/embeddings 응답 직렬화.
+
+벡터마다 pydantic 객체를 만들고 FastAPI가 response_model로 다시 검증하는 대신,
+plain dict를 한 번에 JSON 바이트로 인코딩한다. orjson이 설치되어 있으면 사용하고
+없으면 pydantic-core의 Rust 인코더를 쓴다 (표준 json은 float 변환이 느림).
+"""
+
+import re
+
+import anyio
+from fastapi.responses import Response, StreamingResponse
+from pydantic_core import from_json, to_json
+
+from embedding_gateway.models import UsageInfo
+from embedding_gateway.vectors import Embedding
+
+try:
+    import orjson
+except ImportError:  # optional: uv sync --extra fast
+    orjson = None
+
+# OpenAI 호환 응답의 최상위 "model" 값 (문자열 escape 포함)
+_MODEL_FIELD = re.compile(rb'"model"\s*:\s*"(?:[^"\\]|\\.)*"')
+# 최상위 "usage" 객체 (중첩 없는 작은 객체)
+_USAGE_FIELD = re.compile(rb'"usage"\s*:\s*(\{[^{}]*\})')
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return to_json(obj)
+
+
+def loads(data: bytes):
+    """백엔드 응답 JSON 파싱 (float 배열이 커서 표준 json보다 훨씬 빠름)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return from_json(data)
+
+
+def encode_embeddings(embeddings: list[Embedding], model: str, usage: UsageInfo) -> bytes:
+    """임베딩 목록을 OpenAI 호환 응답 JSON 바이트로 인코딩."""
+    return dumps({
+        "object": "list",
+        "data": [
+            {"object": "embedding", "embedding": embedding, "index": i}
+            for i, embedding in enumerate(embeddings)
+        ],
+        "model": model,
+        "usage": {
+            "prompt_tokens": usage.prompt_tokens,
+            "total_tokens": usage.total_tokens,
+        },
+    })
+
+
+def rewrite_model(body: bytes, model: str) -> bytes | None:
+    """백엔드 응답 바이트의 "model" 값만 바꾼다. 필드가 없으면 None."""
+    replacement = b'"model":' + dumps(model)
+    rewritten, count = _MODEL_FIELD.subn(lambda _: replacement, body, count=1)
+    return rewritten if count else None
+
+
+def raw_usage(body: bytes) -> UsageInfo | None:
+    """백엔드 응답 바이트에서 "usage"만 꺼낸다 (벡터는 파싱하지 않음). 없으면 None.
+
+    usage는 보통 응답 끝에 있으므로 뒤에서부터 찾는다 (벡터 배열에는 이 문자열이 없음).
+    """
+    start = body.rfind(b'"usage"')
+    match = _USAGE_FIELD.match(body, start) if start >= 0 else None
+    if match is None:
+        return None
+    usage = loads(match.group(1))
+    return UsageInfo(
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        total_tokens=usage.get("total_tokens", 0),
+    )
+
+
+def json_response(content: bytes) -> Response:
+    return Response(content=content, media_type="application/json")
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """요청 본문을 읽으면서 응답을 흘려보내는 StreamingResponse.
+
+    기본 StreamingResponse는 응답 중에 receive()로 disconnect를 기다리는데, 이 task가
+    아직 읽지 않은 요청 본문 메시지를 가로채 버린다. 본문은 생성기가 직접 읽으므로
+    (연결이 끊기면 request.stream()이 ClientDisconnect를 던짐) 여기서는 기다리기만 한다.
+    """
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await anyio.sleep_forever()
@@ -1,39 +1,682 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+from functools import partial
+from typing import Literal
 
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response
+
+from embedding_gateway import batches, context, metrics, timing
+from embedding_gateway.admission import AdmissionController
+from embedding_gateway.backends.base import EmbeddingBackend
+from embedding_gateway.backends.transport import pool_stats
+from embedding_gateway.batching import MicroBatcher, SubBatcher
+from embedding_gateway.cache import CacheKey, EmbeddingCache
+from embedding_gateway.catalog import ModelCatalog
+from embedding_gateway.errors import BackendUnavailableError, GatewayBusyError
+from embedding_gateway.health import HealthMonitor
 from embedding_gateway.models import (
+    AdmissionLimits,
     EmbeddingRequest,
     EmbeddingResponse,
     ModelInfo,
     ModelListResponse,
+    UsageInfo,
 )
 from embedding_gateway.registry import ModelRegistry
+from embedding_gateway.responses import (
+    DuplexStreamingResponse,
+    dumps,
+    encode_embeddings,
+    json_response,
+    loads,
+    raw_usage,
+    rewrite_model,
+)
+from embedding_gateway.singleflight import SingleFlight
+from embedding_gateway.store import EmbeddingStore
+from embedding_gateway.tenants import Tenant, TenantRegistry
+from embedding_gateway.vectors import Embedding, from_float32, pack_float32, to_float32
 
 router = APIRouter()
 
 # Set during app startup via lifespan
 registry: ModelRegistry | None = None
+cache: EmbeddingCache | None = None
+store: EmbeddingStore | None = None
+batchers: dict[EmbeddingBackend, MicroBatcher] = {}
+splitters: dict[EmbeddingBackend, SubBatcher] = {}
+singleflight: SingleFlight | None = None
+passthrough = False
+health_monitor: HealthMonitor | None = None
+catalog: ModelCatalog | None = None
+admission: AdmissionController | None = None
+tenants: TenantRegistry | None = None
+# API key(Authorization: Bearer) → 우선순위 lane
+priority_keys: dict[str, str] = {}
+# lane 지정이 없을 때 input 개수가 이 값 이상이면 bulk (0이면 끔)
+bulk_min_items = 0
+
+# NDJSON 스트리밍의 window 크기/동시 window 수 (백엔드에 SubBatcher가 없을 때)
+STREAM_WINDOW = 256
+STREAM_CONCURRENCY = 4
+# 게이트웨이가 계속 바쁠 때(429/503) window 하나가 재시도하며 기다리는 최대 시간(초)
+STREAM_BUSY_TIMEOUT = 60.0
+# (resolved model, backend)별 미리 바인딩한 메트릭
+request_metrics: dict[tuple[str, EmbeddingBackend], metrics.RequestMetrics] = {}
+
+
+def _backend_name(backend: EmbeddingBackend) -> str:
+    return next((n for n, b in registry.backends.items() if b is backend), "unknown")
+
+
+def _request_metrics(resolved: str, backend: EmbeddingBackend) -> metrics.RequestMetrics:
+    observed = request_metrics.get((resolved, backend))
+    if observed is None:
+        observed = request_metrics[(resolved, backend)] = metrics.RequestMetrics(
+            resolved, _backend_name(backend)
+        )
+    return observed
+
+
+async def _backend_embed(
+    backend: EmbeddingBackend,
+    texts: list[str],
+    model: str,
+    dimensions: int | None,
+    encoding_format: str,
+) -> EmbeddingResponse:
+    """백엔드 호출.
+
+    큰 요청은 SubBatcher가 chunk로 나누고, 작은 요청(또는 각 chunk)은
+    micro-batching이 설정된 백엔드라면 MicroBatcher를 거친다.
+    """
+    batcher = batchers.get(backend)
+    embed_fn = batcher.embed if batcher is not None else backend.embed
+    splitter = splitters.get(backend)
+    if splitter is not None:
+        return await splitter.embed(embed_fn, texts, model, dimensions, encoding_format)
+    return await embed_fn(texts, model, dimensions, encoding_format)
+
+
+async def _embed_texts(
+    backend: EmbeddingBackend,
+    resolved_model: str,
+    texts: list[str],
+    model: str,
+    dimensions: int | None,
+    encoding_format: str,
+) -> tuple[list[Embedding], UsageInfo]:
+    """texts를 백엔드로 보내 순서대로 임베딩을 반환 (single-flight가 켜져 있으면 중복 호출 합침)."""
+    if singleflight is not None:
+        return await singleflight.embed(
+            lambda t: _backend_embed(backend, t, model, dimensions, encoding_format),
+            resolved_model,
+            dimensions,
+            texts,
+            encoding_format,
+        )
+    result = await _backend_embed(backend, texts, model, dimensions, encoding_format)
+    embeddings: list[Embedding] = [None] * len(texts)  # type: ignore[list-item]
+    for d in result.data:
+        embeddings[d.index] = d.embedding
+    return embeddings, result.usage
+
+
+async def _lookup_cached(
+    resolved_model: str, dimensions: int | None, texts: list[str]
+) -> tuple[list[CacheKey], list[bytes | None]]:
+    """texts의 캐시 key와 캐시(메모리 → 디스크)에 있는 float32 벡터 (없으면 None)."""
+    keys = [EmbeddingCache.make_key(resolved_model, dimensions, t) for t in texts]
+    vectors: list[bytes | None] = [None] * len(texts)
+    if cache is not None:
+        with timing.phase("cache"):
+            vectors = [cache.get(k) for k in keys]
+
+    if store is not None:
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            with timing.phase("store"):
+                found = await asyncio.to_thread(
+                    store.get_many, resolved_model, dimensions, [keys[i][2] for i in missing]
+                )
+            for i, vector in zip(missing, found):
+                if vector is not None:
+                    vectors[i] = vector
+                    if cache is not None:
+                        cache.put(keys[i], vector)
+    return keys, vectors
+
+
+async def _save_cached(
+    resolved_model: str,
+    dimensions: int | None,
+    keys: list[CacheKey],
+    vectors: list[bytes],
+) -> None:
+    """백엔드에서 받은 벡터를 캐시와 영구 저장소에 넣는다."""
+    if cache is not None:
+        for key, vector in zip(keys, vectors):
+            cache.put(key, vector)
+    if store is not None:
+        with timing.phase("store"):
+            await asyncio.to_thread(
+                store.put_many,
+                resolved_model,
+                dimensions,
+                [(key[2], vector) for key, vector in zip(keys, vectors)],
+            )
+
+
+async def _embed_cached(
+    backend: EmbeddingBackend,
+    resolved_model: str,
+    texts: list[str],
+    model: str,
+    dimensions: int | None,
+    encoding_format: str,
+    lookup: tuple[list[CacheKey], list[bytes | None]] | None = None,
+) -> tuple[list[Embedding], UsageInfo]:
+    """캐시(메모리 → 디스크)에 없는 텍스트만 백엔드로 보내고, 결과를 원래 index 순서로 합친다.
+
+    cache/store가 없으면 모든 텍스트를 single-flight 경로로 보낸다.
+    lookup은 호출자가 이미 조회한 _lookup_cached() 결과.
+    """
+    keys, vectors = lookup or await _lookup_cached(resolved_model, dimensions, texts)
+    embeddings: list[Embedding | None] = [
+        from_float32(v, encoding_format) if v is not None else None for v in vectors
+    ]
+    missing = [i for i, v in enumerate(vectors) if v is None]
+
+    usage = UsageInfo(prompt_tokens=0, total_tokens=0)
+    if missing:
+        fetched, usage = await _embed_texts(
+            backend,
+            resolved_model,
+            [texts[i] for i in missing],
+            model,
+            dimensions,
+            encoding_format,
+        )
+        for i, embedding in zip(missing, fetched):
+            embeddings[i] = embedding
+        if cache is not None or store is not None:
+            await _save_cached(
+                resolved_model,
+                dimensions,
+                [keys[i] for i in missing],
+                [to_float32(e) for e in fetched],
+            )
+
+    return embeddings, usage
+
+
+async def embed_vectors(
+    resolved: str, texts: list[str], dimensions: int | None = None
+) -> tuple[list[bytes], int]:
+    """batch job용: 등록된 모델로 texts를 임베딩해 float32 벡터와 prompt token 수를 반환.
+
+    /v1/embeddings와 같은 캐시/single-flight/분할 경로를 admission bulk lane으로 거친다.
+    """
+    backend = registry.get_backend(resolved)
+    if backend is None:
+        raise ValueError(f"Model '{resolved}' is no longer registered")
+    if health_monitor is not None and health_monitor.is_down(backend):
+        raise BackendUnavailableError(
+            f"Backend for model '{resolved}' is down (last health check failed)",
+            retry_after=health_monitor.interval,
+        )
+    async with _admit(resolved, backend, "bulk", None, len(texts)):
+        embeddings, usage = await _embed_cached(
+            backend, resolved, texts, resolved, dimensions, "base64"
+        )
+    return [to_float32(e) for e in embeddings], usage.prompt_tokens
+
+
+def _can_passthrough(
+    backend: EmbeddingBackend, texts: list[str], request: EmbeddingRequest
+) -> bool:
+    """백엔드 응답 바이트를 그대로 돌려줘도 되는 요청인지.
+
+    벡터를 다시 가공하거나(dimensions, base64, 배치 분배) 합쳐야 하면 불가.
+    캐시와 single-flight는 _passthrough()에서 요청별로 확인한다.
+    """
+    if not passthrough or request.dimensions is not None:
+        return False
+    if request.encoding_format != "float" or backend in batchers:
+        return False
+    splitter = splitters.get(backend)
+    return splitter is None or splitter.fits(texts)
+
+
+def _raw_vectors(raw: bytes, count: int) -> tuple[list[bytes], UsageInfo] | None:
+    """passthrough 응답 바이트 → index 순서의 float32 벡터와 usage (스레드에서 실행)."""
+    data = loads(raw)
+    vectors: list[bytes | None] = [None] * count
+    for d in data.get("data", []):
+        if 0 <= d["index"] < count:
+            vectors[d["index"]] = pack_float32(d["embedding"])
+    if any(v is None for v in vectors):
+        return None
+    usage = data.get("usage") or {}
+    return vectors, UsageInfo(
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        total_tokens=usage.get("total_tokens", 0),
+    )
+
+
+async def _passthrough(
+    backend: EmbeddingBackend, resolved: str, texts: list[str], model: str
+) -> tuple[bytes | None, UsageInfo | None, tuple | None]:
+    """캐시에 하나도 없는 요청이면 백엔드 응답 바이트를 그대로 받아 (raw, usage, None).
+
+    일부라도 캐시에 있거나 다른 요청이 같은 텍스트를 처리 중이면(single-flight) 백엔드를 호출하지 않고
+    (None, None, lookup)을 반환한다. 호출자는 lookup을 _embed_cached()에 넘겨 일반 경로로 처리한다.
+    캐시/저장소가 켜져 있으면 응답을 한 번 파싱해 채운다. 꺼져 있으면 토큰 메트릭과 tenant 한도에
+    쓸 usage만 응답 끝에서 꺼낸다 (어느 쪽이든 응답 바이트는 그대로).
+    """
+    lookup = None
+    if cache is not None or store is not None:
+        lookup = await _lookup_cached(resolved, None, texts)
+        if any(v is not None for v in lookup[1]):
+            return None, None, lookup
+    if singleflight is not None:
+        keys = lookup[0] if lookup is not None else [
+            EmbeddingCache.make_key(resolved, None, t) for t in texts
+        ]
+        if singleflight.inflight(keys):
+            return None, None, lookup
+    raw = await backend.embed_raw(texts, resolved)
+    if raw is None:
+        return None, None, lookup
+    usage = None
+    if lookup is not None:
+        with timing.phase("parse"):
+            parsed = await asyncio.to_thread(_raw_vectors, raw, len(texts))
+        if parsed is not None:
+            vectors, usage = parsed
+            await _save_cached(resolved, None, lookup[0], vectors)
+    if usage is None:
+        usage = raw_usage(raw)
+    if model != resolved:
+        raw = rewrite_model(raw, model) or raw
+    return raw, usage, None
+
+
+@asynccontextmanager
+async def _admit(
+    resolved: str, backend: EmbeddingBackend, lane: str, tenant: Tenant | None, items: int
+) -> AsyncIterator[None]:
+    """tenant rate limit 확인 후 백엔드/모델 동시 요청 제한 슬롯.
+
+    슬롯을 받지 못하면(429/503, 대기 중 취소) tenant에서 차감한 텍스트 수를 돌려준다.
+    """
+    if tenant is not None:
+        tenant.admit(items)
+    if admission is None:
+        yield
+        return
+    name = _backend_name(backend)
+    slot = (
+        admission.admit(name, resolved, lane)
+        if tenant is None
+        else admission.admit(name, resolved, lane, tenant.name, items)
+    )
+    async with AsyncExitStack() as stack:
+        try:
+            await stack.enter_async_context(slot)
+        except (GatewayBusyError, asyncio.CancelledError):
+            if tenant is not None:
+                tenant.refund(items)
+            raise
+        yield
+
+
+def _api_key(authorization: str | None, x_api_key: str | None) -> str | None:
+    """X-API-Key 또는 Authorization: Bearer <key>."""
+    if x_api_key:
+        return x_api_key.strip()
+    if authorization:
+        scheme, _, key = authorization.partition(" ")
+        if scheme.lower() == "bearer" and key.strip():
+            return key.strip()
+    return None
+
+
+def _lane(
+    priority: str | None, api_key: str | None, items: int, default: str = "interactive"
+) -> str:
+    """요청의 우선순위 lane: API key 매핑 > X-Priority 헤더 > input 개수 기준 > default."""
+    if api_key is not None:
+        lane = priority_keys.get(api_key)
+        if lane is not None:
+            return lane
+    if priority is not None:
+        return priority
+    if bulk_min_items and items >= bulk_min_items:
+        return "bulk"
+    return default
 
 
 @router.post("/v1/embeddings", response_model=EmbeddingResponse)
-async def create_embeddings(request: EmbeddingRequest) -> EmbeddingResponse:
+async def create_embeddings(
+    request: EmbeddingRequest,
+    x_max_swap_wait: float | None = Header(default=None),
+    x_priority: Literal["interactive", "bulk"] | None = Header(default=None),
+    authorization: str | None = Header(default=None),
+    x_api_key: str | None = Header(default=None),
+) -> Response:
     if registry is None:
         raise HTTPException(status_code=503, detail="Service not initialized")
 
-    backend = registry.get_backend(request.model)
-    if backend is None:
+    started = time.perf_counter()
+    timer = timing.start()
+    resolved = registry.resolve_model(request.model)
+    if resolved is None:
         available = ", ".join(registry.all_model_names()) or "(none)"
         raise HTTPException(
             status_code=404,
             detail=f"Model '{request.model}' not found. Available: {available}",
         )
+    backend = registry.get_backend(resolved)
+    if timer is not None:
+        timer.add("resolve", time.perf_counter() - started)
 
     texts = request.input if isinstance(request.input, list) else [request.input]
+    if x_max_swap_wait is not None:
+        context.swap_max_wait.set(x_max_swap_wait)
+    api_key = _api_key(authorization, x_api_key)
+    lane = _lane(x_priority, api_key, len(texts))
+    tenant = tenants.identify(api_key) if tenants is not None else None
 
+    observed = _request_metrics(resolved, backend) if metrics.enabled else None
+    if observed is not None:
+        observed.inflight.inc()
+    status = 200
+    usage: UsageInfo | None = None
+    response: Response | None = None
+    error: HTTPException | None = None
     try:
-        return await backend.embed(texts, request.model, request.dimensions)
+        if health_monitor is not None and health_monitor.is_down(backend):
+            # 매 요청마다 연결 timeout을 기다리지 않고 다음 probe까지 바로 거절
+            raise BackendUnavailableError(
+                f"Backend for model '{resolved}' is down (last health check failed)",
+                retry_after=health_monitor.interval,
+            )
+        async with _admit(resolved, backend, lane, tenant, len(texts)):
+            lookup = None
+            if _can_passthrough(backend, texts, request):
+                raw, usage, lookup = await _passthrough(backend, resolved, texts, request.model)
+                if raw is not None:
+                    if observed is not None and usage is not None:
+                        observed.tokens.inc(usage.prompt_tokens)
+                    response = json_response(raw)
+                    return response
+            embed = (
+                partial(_embed_cached, lookup=lookup)
+                if cache is not None or store is not None or singleflight is not None
+                else _embed_texts
+            )
+            embeddings, usage = await embed(
+                backend,
+                resolved,
+                texts,
+                # 캐시/저장소 key와 같은 모델로 호출 (alias가 백엔드에서 다른 모델로 해석되지 않게)
+                resolved,
+                request.dimensions,
+                request.encoding_format,
+            )
+            if observed is not None:
+                observed.tokens.inc(usage.prompt_tokens)
+            with timing.phase("encode"):
+                response = json_response(encode_embeddings(embeddings, request.model, usage))
+            return response
+    except GatewayBusyError as e:
+        status = e.status_code
+        error = HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+        raise error
     except Exception as e:
+        status = 502
         msg = str(e) or f"{type(e).__name__} (no message)"
-        raise HTTPException(status_code=502, detail=f"Backend error: {msg}")
+        error = HTTPException(status_code=502, detail=f"Backend error: {msg}")
+        raise error
+    finally:
+        elapsed = time.perf_counter() - started
+        if observed is not None:
+            observed.finish(status, len(texts), elapsed, lane)
+        if tenant is not None:
+            tenant.finish(
+                status, len(texts), usage.prompt_tokens if usage is not None else 0, elapsed
+            )
+        if timer is not None:
+            timer.add("total", elapsed)
+            if response is not None:
+                response.headers["Server-Timing"] = timer.server_timing()
+            elif error is not None:
+                error.headers = {**(error.headers or {}), "Server-Timing": timer.server_timing()}
+            timing.log_access(
+                timer,
+                model=request.model,
+                resolved_model=resolved,
+                backend=_backend_name(backend),
+                lane=lane,
+                tenant=tenant.name if tenant is not None else None,
+                status=status,
+                items=len(texts),
+                prompt_tokens=usage.prompt_tokens if usage is not None else None,
+                total_tokens=usage.total_tokens if usage is not None else None,
+                duration_ms=round(elapsed * 1000, 3),
+            )
+
+
+async def _ndjson_inputs(body: AsyncIterator[bytes]) -> AsyncIterator[tuple[str, object]]:
+    """요청 본문을 읽는 대로 줄 단위로 나눠 (text, custom_id)를 낸다.
+
+    줄은 JSON 문자열("text") 또는 {"input": "text", "custom_id": ...}. 빈 줄은 건너뛴다.
+    """
+    buffer = bytearray()
+    lineno = 0
+
+    def parse(line: bytes) -> tuple[str, object]:
+        try:
+            item = loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {lineno}: invalid JSON ({e})") from None
+        if isinstance(item, str):
+            return item, None
+        if isinstance(item, dict) and isinstance(item.get("input"), str):
+            return item["input"], item.get("custom_id")
+        raise ValueError(f"line {lineno}: expected a string or an object with a string 'input'")
+
+    async for chunk in body:
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            line = bytes(buffer[start:end])
+            start = end + 1
+            lineno += 1
+            if line.strip():
+                yield parse(line)
+        del buffer[:start]
+    if buffer.strip():
+        lineno += 1
+        yield parse(bytes(buffer))
+
+
+async def _stream_embeddings(
+    inputs: AsyncIterator[tuple[str, object]],
+    backend: EmbeddingBackend,
+    resolved: str,
+    model: str,
+    dimensions: int | None,
+    encoding_format: str,
+    lane: str,
+    tenant: Tenant | None,
+    observed: metrics.RequestMetrics | None,
+) -> AsyncIterator[bytes]:
+    """window 단위로 백엔드에 보내고, 끝난 window부터 입력 순서대로 한 줄씩 돌려준다.
+
+    동시에 처리 중인 window는 최대 depth개이고 그 이상은 입력을 더 읽지 않으므로
+    (응답을 늦게 읽는 클라이언트도 마찬가지) 메모리 사용량은 입력 크기와 무관하다.
+    게이트웨이가 바쁘면(429/503) 실패시키지 않고 Retry-After만큼 기다렸다가 다시 보낸다.
+    """
+    splitter = splitters.get(backend)
+    size = splitter.chunk_size if splitter is not None else STREAM_WINDOW
+    depth = splitter.concurrency if splitter is not None else STREAM_CONCURRENCY
+    embed = (
+        _embed_cached
+        if cache is not None or store is not None or singleflight is not None
+        else _embed_texts
+    )
+
+    async def embed_window(texts: list[str]) -> tuple[list[Embedding], UsageInfo]:
+        waited = 0.0
+        while True:
+            try:
+                async with _admit(resolved, backend, lane, tenant, len(texts)):
+                    return await embed(
+                        backend, resolved, texts, resolved, dimensions, encoding_format
+                    )
+            except GatewayBusyError as e:
+                # 백엔드 down이나 tenant 한도 초과가 계속되면 STREAM_BUSY_TIMEOUT 뒤 오류 줄로 끝냄
+                waited += e.retry_after
+                if waited > STREAM_BUSY_TIMEOUT:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    pending: deque[tuple[int, list[object], asyncio.Task]] = deque()
+    submitted = 0
+    prompt_tokens = total_tokens = 0
+    started = time.perf_counter()
+    status = 200
+
+    def submit(texts: list[str], ids: list[object]) -> None:
+        nonlocal submitted
+        pending.append((submitted, ids, asyncio.create_task(embed_window(texts))))
+        submitted += len(texts)
+
+    async def drain() -> bytes:
+        nonlocal prompt_tokens, total_tokens
+        offset, ids, task = pending.popleft()
+        embeddings, usage = await task
+        prompt_tokens += usage.prompt_tokens
+        total_tokens += usage.total_tokens
+        if observed is not None:
+            observed.tokens.inc(usage.prompt_tokens)
+        lines = []
+        for i, (embedding, custom_id) in enumerate(zip(embeddings, ids)):
+            item = {"index": offset + i, "embedding": embedding}
+            if custom_id is not None:
+                item["custom_id"] = custom_id
+            lines.append(dumps(item))
+        return b"\n".join(lines) + b"\n"
+
+    if observed is not None:
+        observed.inflight.inc()
+    try:
+        texts: list[str] = []
+        ids: list[object] = []
+        invalid: ValueError | None = None
+        try:
+            async for text, custom_id in inputs:
+                texts.append(text)
+                ids.append(custom_id)
+                if len(texts) >= size:
+                    submit(texts, ids)
+                    texts, ids = [], []
+                    if len(pending) >= depth:
+                        yield await drain()
+        except ValueError as e:
+            # 잘못된 줄 이전까지의 입력은 끝까지 처리해서 돌려준 뒤 오류 줄로 끝낸다
+            invalid = e
+        if texts:
+            submit(texts, ids)
+        while pending:
+            yield await drain()
+        if invalid is not None:
+            status = 400
+            yield dumps(
+                {"error": {"type": "invalid_request_error", "message": str(invalid)}}
+            ) + b"\n"
+            return
+        yield dumps({
+            "object": "summary",
+            "model": model,
+            "count": submitted,
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": total_tokens},
+        }) + b"\n"
+    except GatewayBusyError as e:
+        status = e.status_code
+        yield dumps({"error": {"type": "gateway_busy", "message": str(e)}}) + b"\n"
+    except Exception as e:
+        status = 502
+        msg = str(e) or f"{type(e).__name__} (no message)"
+        yield dumps({"error": {"type": "backend_error", "message": f"Backend error: {msg}"}}) + b"\n"
+    finally:
+        for _, _, task in pending:
+            task.cancel()
+        elapsed = time.perf_counter() - started
+        if observed is not None:
+            observed.finish(status, submitted, elapsed, lane)
+        if tenant is not None:
+            tenant.finish(status, submitted, prompt_tokens, elapsed)
+
+
+@router.post("/v1/embeddings/stream")
+async def stream_embeddings(
+    request: Request,
+    model: str = Query(),
+    dimensions: int | None = Query(default=None),
+    encoding_format: Literal["float", "base64"] = Query(default="float"),
+    x_priority: Literal["interactive", "bulk"] | None = Header(default=None),
+    authorization: str | None = Header(default=None),
+    x_api_key: str | None = Header(default=None),
+) -> DuplexStreamingResponse:
+    """NDJSON 입력(한 줄에 텍스트 하나)을 읽는 대로 임베딩해 NDJSON으로 흘려보낸다.
+
+    응답 줄: {"index", "embedding"[, "custom_id"]} ... 마지막에 {"object": "summary", "usage"}.
+    스트리밍 도중 오류는 {"error": {...}} 줄로 알리고 끝낸다. lane 지정이 없으면 bulk.
+    """
+    if registry is None:
+        raise HTTPException(status_code=503, detail="Service not initialized")
+    resolved = registry.resolve_model(model)
+    if resolved is None:
+        available = ", ".join(registry.all_model_names()) or "(none)"
+        raise HTTPException(
+            status_code=404, detail=f"Model '{model}' not found. Available: {available}"
+        )
+    backend = registry.get_backend(resolved)
+    if health_monitor is not None and health_monitor.is_down(backend):
+        raise HTTPException(
+            status_code=503,
+            detail=f"Backend for model '{resolved}' is down (last health check failed)",
+            headers={"Retry-After": str(math.ceil(health_monitor.interval))},
+        )
+    api_key = _api_key(authorization, x_api_key)
+    # 입력 크기를 미리 알 수 없으므로 lane 지정이 없으면 bulk
+    lane = _lane(x_priority, api_key, 0, default="bulk")
+    return DuplexStreamingResponse(
+        _stream_embeddings(
+            _ndjson_inputs(request.stream()),
+            backend,
+            resolved,
+            model,
+            dimensions,
+            encoding_format,
+            lane,
+            tenants.identify(api_key) if tenants is not None else None,
+            _request_metrics(resolved, backend) if metrics.enabled else None,
+        ),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.get("/v1/models", response_model=ModelListResponse)
@@ -41,15 +684,162 @@ async def list_models() -> ModelListResponse:
     if registry is None:
         raise HTTPException(status_code=503, detail="Service not initialized")
 
+    if catalog is not None:
+        return ModelListResponse(data=await catalog.models())
+
+    backends = list(registry.backends.items())
+    results = await asyncio.gather(
+        *(b.list_models() for _, b in backends), return_exceptions=True
+    )
     models: list[ModelInfo] = []
-    for backend_name, backend in registry.backends.items():
-        try:
-            backend_models = await backend.list_models()
-            for m in backend_models:
-                models.append(
-                    ModelInfo(id=m, owned_by=backend_name, backend=backend_name)
-                )
-        except Exception:
-            pass
+    for (backend_name, _), backend_models in zip(backends, results):
+        if isinstance(backend_models, BaseException):
+            continue
+        for m in backend_models:
+            models.append(ModelInfo(id=m, owned_by=backend_name, backend=backend_name))
 
     return ModelListResponse(data=models)
+
+
+@router.get("/stats")
+async def stats() -> dict:
+    """게이트웨이 내부 통계 (캐시 hit/miss 등)."""
+    return {
+        "backends": (
+            {name: b.stats() for name, b in registry.backends.items()}
+            if registry is not None else {}
+        ),
+        "registry": registry.stats() if registry is not None else None,
+        "catalog": catalog.stats() if catalog is not None else None,
+        "cache": cache.stats() if cache is not None else None,
+        "store": store.stats() if store is not None else None,
+        "batching": {b.name: b.stats() for b in batchers.values()},
+        "splitting": {s.name: s.stats() for s in splitters.values()},
+        "singleflight": singleflight.stats() if singleflight is not None else None,
+        "admission": admission.stats() if admission is not None else None,
+        "tenants": tenants.stats() if tenants is not None else None,
+        "batches": batches.manager.stats() if batches.manager is not None else None,
+    }
+
+
+@router.get("/admission")
+async def admission_limits() -> dict:
+    """백엔드/모델별 동시 요청 제한과 현재 대기열 상태."""
+    if admission is None:
+        raise HTTPException(status_code=503, detail="Admission control not initialized")
+    return admission.stats()
+
+
+@router.put("/admission/{scope}/{name:path}")
+async def update_admission_limits(
+    scope: Literal["backend", "model"], name: str, limits: AdmissionLimits
+) -> dict:
+    """재시작 없이 동시 요청 제한 변경 (지정한 값만). 모델 이름은 alias도 받는다."""
+    if admission is None or registry is None:
+        raise HTTPException(status_code=503, detail="Admission control not initialized")
+    if scope == "model":
+        resolved = registry.resolve_model(name)
+        if resolved is None:
+            raise HTTPException(status_code=404, detail=f"Model '{name}' not found")
+        name = resolved
+    limiter = admission.limiter(scope, name, create=True)
+    if limiter is None:
+        raise HTTPException(status_code=404, detail=f"Backend '{name}' not found")
+    limiter.set_limits(**limits.model_dump(exclude_none=True))
+    return limiter.stats()
+
+
+def _collect() -> list[metrics.MetricFamily]:
+    """scrape 시점에 cache/batching/백엔드 등의 stats()를 gauge로 변환."""
+    families = metrics.stats_families(
+        "embedding_gateway_cache", {"": cache.stats()} if cache is not None else {}
+    )
+    families += metrics.stats_families(
+        "embedding_gateway_store", {"": store.stats()} if store is not None else {}
+    )
+    families += metrics.stats_families(
+        "embedding_gateway_singleflight",
+        {"": singleflight.stats()} if singleflight is not None else {},
+    )
+    families += metrics.stats_families(
+        "embedding_gateway_batching",
+        {b.name: b.stats() for b in batchers.values()},
+        "backend",
+    )
+    families += metrics.stats_families(
+        "embedding_gateway_splitting",
+        {s.name: s.stats() for s in splitters.values()},
+        "backend",
+    )
+    if registry is not None:
+        backends = {name: b.stats() for name, b in registry.backends.items()}
+        families += metrics.stats_families(
+            "embedding_gateway_scheduler",
+            {n: s["scheduler"] for n, s in backends.items() if "scheduler" in s},
+            "backend",
+        )
+        families += metrics.stats_families(
+            "embedding_gateway_pool",
+            {n: s["pool"] for n, s in backends.items() if "pool" in s},
+            "backend",
+        )
+        replicas = metrics.MetricFamily(
+            "embedding_gateway_replica_inflight", "gauge", "In-flight requests per replica"
+        )
+        healthy = metrics.MetricFamily(
+            "embedding_gateway_replica_healthy", "gauge", "1 if the replica is not ejected"
+        )
+        for name, s in backends.items():
+            for url, info in s.get("replicas", {}).get("replicas", {}).items():
+                labels = {"backend": name, "url": url}
+                replicas.add(labels, info["inflight"])
+                healthy.add(labels, info["healthy"])
+        families += [replicas, healthy]
+        families += metrics.stats_families(
+            "embedding_gateway_http_pool",
+            {
+                (name, url): pool_stats(client)
+                for name, b in registry.backends.items()
+                for url, client in b.http_clients().items()
+            },
+            ("backend", "url"),
+        )
+    if admission is not None:
+        families += metrics.stats_families(
+            "embedding_gateway_admission",
+            {
+                (scope, name): limiter.stats()
+                for scope, limiters in (("backend", admission.backends), ("model", admission.models))
+                for name, limiter in limiters.items()
+            },
+            ("scope", "name"),
+        )
+    if tenants is not None:
+        families += metrics.stats_families(
+            "embedding_gateway_tenant", tenants.stats(), "tenant"
+        )
+    if health_monitor is not None:
+        families += metrics.stats_families(
+            "embedding_gateway_backend_health",
+            {
+                name: {
+                    "up": state.healthy,
+                    "latency_ms": state.latency_ms,
+                    "consecutive_failures": state.consecutive_failures,
+                }
+                for name, state in health_monitor.snapshot.items()
+            },
+            "backend",
+        )
+    return families
+
+
+metrics.REGISTRY.register_collector(_collect)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Prometheus text format 메트릭."""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
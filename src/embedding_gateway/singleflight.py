@@ -0,0 +1,143 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from embedding_gateway.cache import text_digest
+from embedding_gateway.models import EmbeddingResponse, UsageInfo
+from embedding_gateway.vectors import Embedding, from_float32, to_float32
+
+FlightKey = tuple[str, int | None, bytes]
+
+
+def _consume(future: asyncio.Future) -> None:
+    # 기다리는 요청이 모두 취소된 경우 "exception was never retrieved" 경고 방지
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """같은 (model, dimensions, 텍스트)의 백엔드 호출을 하나로 합친다.
+
+    - 한 요청의 input에 같은 문자열이 여러 번 있으면 한 번만 보내고 모든 index에 채운다.
+    - 다른 요청이 이미 같은 텍스트를 백엔드에 보내고 있으면 그 결과를 기다려 공유한다.
+    - 나머지 텍스트만 한 번의 호출로 보낸다. 호출은 별도 task로 실행되므로
+      먼저 보낸 요청이 취소되어도 결과를 기다리는 다른 요청에는 영향이 없다.
+
+    공유받은 텍스트는 usage에 포함하지 않는다 (캐시 hit과 동일).
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[FlightKey, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.requests = 0
+        self.texts = 0
+        self.duplicates = 0
+        self.coalesced = 0
+        self.backend_calls = 0
+        self.saved_calls = 0
+
+    def inflight(self, keys: list[FlightKey]) -> bool:
+        """keys 중 하나라도 지금 백엔드 호출 중인지 (passthrough 대신 결과를 공유받을 수 있음)."""
+        return any(key in self._inflight for key in keys)
+
+    async def embed(
+        self,
+        call: Callable[[list[str]], Awaitable[EmbeddingResponse]],
+        model: str,
+        dimensions: int | None,
+        texts: list[str],
+        encoding_format: str,
+    ) -> tuple[list[Embedding], UsageInfo]:
+        """call(texts)로 백엔드를 호출해 texts 순서대로 임베딩과 이번 호출의 usage를 반환."""
+        self.requests += 1
+        self.texts += len(texts)
+        keys = [(model, dimensions, text_digest(t)) for t in texts]
+
+        futures: dict[FlightKey, asyncio.Future] = {}
+        owned: dict[FlightKey, asyncio.Future] = {}
+        owned_texts: list[str] = []
+        for key, text in zip(keys, texts):
+            if key in futures:
+                self.duplicates += 1
+                continue
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future = asyncio.get_running_loop().create_future()
+                future.add_done_callback(_consume)
+                self._inflight[key] = future
+                owned[key] = future
+                owned_texts.append(text)
+            futures[key] = future
+
+        usage = UsageInfo(prompt_tokens=0, total_tokens=0)
+        call_task = None
+        if owned:
+            self.backend_calls += 1
+            call_task = asyncio.create_task(
+                self._run(call, owned, owned_texts, encoding_format)
+            )
+            self._tasks.add(call_task)
+            call_task.add_done_callback(self._tasks.discard)
+            call_task.add_done_callback(_consume)
+        else:
+            self.saved_calls += 1
+
+        # shield: 이 요청이 취소되어도 공유 future는 다른 요청을 위해 유지
+        values = {
+            key: await asyncio.shield(future) for key, future in futures.items()
+        }
+        if call_task is not None:
+            usage = await asyncio.shield(call_task)
+
+        embeddings: list[Embedding] = []
+        for key in keys:
+            value, fmt = values[key]
+            if fmt != encoding_format:
+                value = from_float32(to_float32(value), encoding_format)
+            embeddings.append(value)
+        return embeddings, usage
+
+    async def _run(
+        self,
+        call: Callable[[list[str]], Awaitable[EmbeddingResponse]],
+        owned: dict[FlightKey, asyncio.Future],
+        texts: list[str],
+        encoding_format: str,
+    ) -> UsageInfo:
+        futures = list(owned.values())
+        try:
+            result = await call(texts)
+            for d in result.data:
+                futures[d.index].set_result((d.embedding, encoding_format))
+            missing = [f for f in futures if not f.done()]
+            if missing:
+                raise RuntimeError(
+                    f"Backend returned {len(result.data)} embeddings for {len(texts)} inputs"
+                )
+            return result.usage
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            for key, future in owned.items():
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "texts": self.texts,
+            "inflight": len(self._inflight),
+            "duplicate_texts": self.duplicates,
+            "coalesced_texts": self.coalesced,
+            "backend_calls": self.backend_calls,
+            "saved_backend_calls": self.saved_calls,
+            "saved_texts": self.duplicates + self.coalesced,
+        }
@@ -0,0 +1,235 @@
+"""SQLite 기반 영구 임베딩 저장소.
+
+게이트웨이 재시작이나 TEI/vLLM 모델 스왑 후에도 계산된 벡터를 재사용하기 위한 2차 캐시.
+벡터는 float32 바이트(BLOB)로 저장하고, mmap 읽기를 켜서 조회가 백엔드 호출 대신
+페이지 폴트 수준의 비용으로 끝나도록 한다. 모델 이름이 네임스페이스 역할을 한다.
+
+CLI:
+    embedding-gateway-store list
+    embedding-gateway-store purge <model>
+    embedding-gateway-store compact
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    namespace TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    key BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (namespace, dimensions, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_stored_at ON embeddings (stored_at);
+"""
+
+# SQLite IN (...) 바인딩 변수 제한 이하로 나눠서 조회
+_LOOKUP_CHUNK = 500
+
+
+class EmbeddingStore:
+    """모델별 네임스페이스를 가진 디스크 임베딩 저장소.
+
+    크기 상한(max_bytes)을 넘으면 가장 오래 저장된 벡터부터 제거한다.
+    조회는 별도의 읽기 전용 연결을 쓰므로(WAL) 쓰기/eviction 중에도 기다리지 않는다.
+    """
+
+    def __init__(self, path: str, max_bytes: int, mmap_bytes: int = 1 << 30):
+        self.path = path
+        self.max_bytes = max_bytes
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._reader = sqlite3.connect(
+            f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+        )
+        self._reader.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self._read_lock = threading.Lock()
+        self._bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(
+        self, namespace: str, dimensions: int | None, keys: list[bytes]
+    ) -> list[bytes | None]:
+        dims = dimensions or 0
+        found: dict[bytes, bytes] = {}
+        with self._read_lock:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._reader.execute(
+                    "SELECT key, vector FROM embeddings "
+                    f"WHERE namespace = ? AND dimensions = ? AND key IN ({placeholders})",
+                    (namespace, dims, *chunk),
+                ).fetchall()
+                found.update(rows)
+        result = [found.get(k) for k in keys]
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return result
+
+    def put_many(
+        self,
+        namespace: str,
+        dimensions: int | None,
+        items: list[tuple[bytes, bytes]],
+    ) -> None:
+        if not items:
+            return
+        dims = dimensions or 0
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for key, vector in items:
+                    old = self._conn.execute(
+                        "SELECT LENGTH(vector) FROM embeddings "
+                        "WHERE namespace = ? AND dimensions = ? AND key = ?",
+                        (namespace, dims, key),
+                    ).fetchone()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)",
+                        (namespace, dims, key, vector, now),
+                    )
+                    self._bytes += len(vector) - (old[0] if old else 0)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if self._bytes > self.max_bytes:
+                self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """오래된 벡터부터 상한의 90%까지 제거."""
+        target = int(self.max_bytes * 0.9)
+        while self._bytes > target:
+            rows = self._conn.execute(
+                "SELECT namespace, dimensions, key, LENGTH(vector) FROM embeddings "
+                "ORDER BY stored_at LIMIT 256"
+            ).fetchall()
+            if not rows:
+                self._bytes = 0
+                return
+            self._conn.execute("BEGIN")
+            for namespace, dims, key, size in rows:
+                self._conn.execute(
+                    "DELETE FROM embeddings "
+                    "WHERE namespace = ? AND dimensions = ? AND key = ?",
+                    (namespace, dims, key),
+                )
+                self._bytes -= size
+                self.evictions += 1
+                if self._bytes <= target:
+                    break
+            self._conn.execute("COMMIT")
+
+    def namespaces(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT namespace, dimensions, COUNT(*), SUM(LENGTH(vector)) "
+                "FROM embeddings GROUP BY namespace, dimensions ORDER BY namespace"
+            ).fetchall()
+        return [
+            {
+                "model": namespace,
+                "dimensions": dims or None,
+                "vectors": count,
+                "bytes": size,
+            }
+            for namespace, dims, count, size in rows
+        ]
+
+    def purge(self, namespace: str) -> int:
+        """모델 네임스페이스의 벡터를 모두 삭제하고 삭제 건수를 반환."""
+        with self._lock:
+            size = self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE namespace = ?",
+                (namespace,),
+            ).fetchone()[0]
+            deleted = self._conn.execute(
+                "DELETE FROM embeddings WHERE namespace = ?", (namespace,)
+            ).rowcount
+            self._bytes -= size
+        return deleted
+
+    def compact(self) -> None:
+        """크기 상한을 적용한 뒤 VACUUM으로 빈 페이지를 회수."""
+        with self._lock:
+            if self._bytes > self.max_bytes:
+                self._evict_locked()
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._read_lock:
+            self._reader.close()
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    from embedding_gateway.config import settings
+
+    parser = argparse.ArgumentParser(
+        prog="embedding-gateway-store",
+        description="Inspect or purge the persistent embedding store",
+    )
+    parser.add_argument(
+        "--path", default=settings.store_path, help="SQLite file (default: STORE_PATH)"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="show vector counts and size per model")
+    purge = sub.add_parser("purge", help="delete every vector of a model")
+    purge.add_argument("model")
+    sub.add_parser("compact", help="apply the size cap and VACUUM the file")
+    args = parser.parse_args(argv)
+
+    if not args.path:
+        parser.error("STORE_PATH is not set; pass --path")
+
+    store = EmbeddingStore(args.path, max_bytes=int(settings.store_max_mb * 1024 * 1024))
+    try:
+        if args.command == "list":
+            print(json.dumps(
+                {"stats": store.stats(), "models": store.namespaces()},
+                ensure_ascii=False, indent=2,
+            ))
+        elif args.command == "purge":
+            print(f"Deleted {store.purge(args.model)} vectors for {args.model}")
+        elif args.command == "compact":
+            before = Path(args.path).stat().st_size
+            store.compact()
+            after = Path(args.path).stat().st_size
+            print(f"Compacted {args.path}: {before} -> {after} bytes")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""GPU/모델 서버 없이 게이트웨이를 벤치마크/회귀 테스트하기 위한 stub 백엔드.
+
+- serve: Ollama(/api/embed, /api/tags), TEI(/v1/embeddings, /info, /health),
+  vLLM(/v1/embeddings, /v1/models, /health)를 흉내내는 HTTP 서버.
+  텍스트별로 결정적인(같은 입력 → 같은 벡터) 정규화 벡터를 돌려주고,
+  지연 분포, 오류 주입, 동시 처리 한도, 모델 로딩 시간을 설정할 수 있다.
+- docker: TEI/vLLM managed 모드용 가짜 docker 명령. `run`은 컨테이너 대신 stub 서버
+  프로세스를 호스트 포트에 띄우고, start/stop/rm/ps를 상태 파일로 흉내낸다.
+  STUB_DOCKER_LOG를 주면 받은 인자를 JSON 한 줄씩 기록하고, STUB_DOCKER_SPAWN=0이면
+  서버 프로세스 없이 컨테이너 상태만 바꾼다 (테스트용).
+
+    embedding-gateway-stub serve --kind ollama --port 11434 --dims 1024 --latency lognormal:8,0.5
+    TEI_DOCKER_IMAGE=stub TEI_DOCKER_COMMAND="embedding-gateway-stub docker" embedding-gateway
+
+serve 옵션의 기본값은 STUB_* 환경변수로도 줄 수 있다 (docker run으로 띄운 서버에 전달할 때 사용).
+"""
+
+import argparse
+import asyncio
+import base64
+import fcntl
+import hashlib
+import json
+import math
+import os
+import random
+import signal
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+STUB_KINDS = ("ollama", "tei", "vllm")
+
+
+def deterministic_vector(model: str, text: str, dims: int) -> list[float]:
+    """(model, text)로 정해지는 L2 정규화 벡터."""
+    raw = b""
+    counter = 0
+    seed = f"{model}\0{text}".encode()
+    while len(raw) < dims * 4:
+        raw += hashlib.blake2b(seed + counter.to_bytes(4, "little"), digest_size=64).digest()
+        counter += 1
+    # uint32 → [-1, 1)
+    values = [v / 2147483648.0 - 1.0 for v in struct.unpack(f"<{dims}I", raw[: dims * 4])]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+def latency_sampler(spec: str, rng: random.Random):
+    """지연(ms) 분포: "fixed:5" | "uniform:2-10" | "lognormal:8,0.5" (중앙값, sigma)."""
+    kind, _, args = spec.partition(":")
+    if kind == "fixed":
+        value = float(args or 0)
+        return lambda: value
+    if kind == "uniform":
+        lo, hi = (float(x) for x in args.split("-"))
+        return lambda: rng.uniform(lo, hi)
+    if kind == "lognormal":
+        median, sigma = (float(x) for x in args.split(","))
+        return lambda: rng.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+def _env(name: str, default):
+    value = os.environ.get(f"STUB_{name.upper()}")
+    return type(default)(value) if value is not None else default
+
+
+@dataclass
+class StubConfig:
+    kind: str = "tei"
+    models: list[str] = field(default_factory=lambda: ["stub-model"])
+    dims: int = 1024
+    latency: str = "fixed:0"  # 요청당 지연(ms) 분포
+    per_item_ms: float = 0.0  # input 하나당 추가 지연(ms)
+    error_rate: float = 0.0  # 이 비율의 요청에 error_status 반환
+    error_status: int = 500
+    max_concurrency: int = 0  # 동시에 처리하는 요청 수 (0 = 무제한)
+    reject_overload: bool = False  # 한도 초과 시 대기 대신 429 (TEI --max-concurrent-requests)
+    load_time: float = 0.0  # 시작 후 /health가 200이 될 때까지 걸리는 시간(초)
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.kind not in STUB_KINDS:
+            raise ValueError(f"Unknown stub kind '{self.kind}' (expected one of {STUB_KINDS})")
+
+
+def create_app(config: StubConfig) -> "FastAPI":
+    # docker 명령은 호출마다 새 프로세스라 웹 스택 import를 여기로 미룬다
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, Response
+
+    from embedding_gateway.responses import dumps
+
+    app = FastAPI(title=f"{config.kind} stub")
+    rng = random.Random(config.seed)
+    sample_latency = latency_sampler(config.latency, rng)
+    limit = asyncio.Semaphore(config.max_concurrency) if config.max_concurrency else None
+    started = time.monotonic()
+    stats = {"requests": 0, "errors": 0, "rejected": 0, "inflight": 0, "max_inflight": 0}
+
+    async def compute(texts: list[str], model: str) -> list[list[float]] | Response:
+        stats["requests"] += 1
+        if limit is not None and config.reject_overload and limit.locked():
+            stats["rejected"] += 1
+            return JSONResponse({"error": "Model is overloaded"}, status_code=429)
+        if limit is not None:
+            await limit.acquire()
+        stats["inflight"] += 1
+        stats["max_inflight"] = max(stats["max_inflight"], stats["inflight"])
+        try:
+            delay = sample_latency() + config.per_item_ms * len(texts)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+            if config.error_rate and rng.random() < config.error_rate:
+                stats["errors"] += 1
+                return JSONResponse({"error": "injected error"}, status_code=config.error_status)
+            return [deterministic_vector(model, t, config.dims) for t in texts]
+        finally:
+            stats["inflight"] -= 1
+            if limit is not None:
+                limit.release()
+
+    def tokens(texts: list[str]) -> int:
+        return sum(len(t.split()) + 1 for t in texts)
+
+    def model_of(body: dict) -> str:
+        return body.get("model") or config.models[0]
+
+    @app.get("/stub/stats")
+    async def stub_stats() -> dict:
+        return stats
+
+    if config.kind == "ollama":
+        @app.post("/api/embed")
+        async def ollama_embed(request: Request) -> Response:
+            body = json.loads(await request.body())
+            texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+            result = await compute(texts, model_of(body))
+            if isinstance(result, Response):
+                return result
+            return Response(dumps({
+                "model": model_of(body),
+                "embeddings": result,
+                "prompt_eval_count": tokens(texts),
+            }), media_type="application/json")
+
+        @app.get("/api/version")
+        async def ollama_version() -> dict:
+            return {"version": "0.0.0-stub"}
+
+        @app.get("/api/tags")
+        async def ollama_tags() -> dict:
+            return {"models": [{"name": m, "model": m} for m in config.models]}
+
+        return app
+
+    @app.get("/health")
+    async def health() -> Response:
+        if time.monotonic() - started < config.load_time:
+            return Response(status_code=503)
+        return Response(status_code=200)
+
+    @app.post("/v1/embeddings")
+    async def openai_embed(request: Request) -> Response:
+        body = json.loads(await request.body())
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        model = config.models[0] if config.kind == "tei" else model_of(body)
+        result = await compute(texts, model)
+        if isinstance(result, Response):
+            return result
+        encoding = body.get("encoding_format", "float")
+        data = [
+            {
+                "object": "embedding",
+                "embedding": (
+                    base64.b64encode(struct.pack(f"<{len(v)}f", *v)).decode()
+                    if encoding == "base64" else v
+                ),
+                "index": i,
+            }
+            for i, v in enumerate(result)
+        ]
+        n = tokens(texts)
+        return Response(dumps({
+            "object": "list",
+            "data": data,
+            "model": model,
+            "usage": {"prompt_tokens": n, "total_tokens": n},
+        }), media_type="application/json")
+
+    if config.kind == "tei":
+        @app.get("/info")
+        async def tei_info() -> dict:
+            return {"model_id": config.models[0], "max_concurrent_requests": config.max_concurrency}
+    else:
+        @app.get("/v1/models")
+        async def vllm_models() -> dict:
+            return {"object": "list", "data": [{"id": m, "object": "model"} for m in config.models]}
+
+    return app
+
+
+# --- fake docker -------------------------------------------------------------
+
+def _state_path() -> Path:
+    directory = Path(
+        os.environ.get("STUB_DOCKER_STATE")
+        or Path(tempfile.gettempdir()) / "embedding-gateway-stub-docker"
+    )
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / "containers.json"
+
+
+def _spawn_enabled() -> bool:
+    return os.environ.get("STUB_DOCKER_SPAWN", "1") != "0"
+
+
+def _alive(pid: int | None) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    # 부모가 없는 zombie (init이 reap하지 않는 컨테이너 환경)
+    status = Path(f"/proc/{pid}/status")
+    if status.exists() and "\nState:\tZ" in status.read_text():
+        return False
+    return True
+
+
+def _kill(pid: int | None) -> None:
+    """stub 서버를 종료하고 포트가 풀리도록 프로세스가 끝날 때까지 대기."""
+    if not _alive(pid):
+        return
+    try:
+        os.killpg(pid, signal.SIGTERM)
+    except OSError:
+        os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + 5.0
+    while _alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if _alive(pid):
+        os.kill(pid, signal.SIGKILL)
+
+
+def _spawn(container: dict, log_dir: Path) -> int:
+    cmd = [
+        sys.executable, "-m", "embedding_gateway.stub", "serve",
+        "--kind", container["kind"],
+        "--host", "127.0.0.1",
+        "--port", str(container["port"]),
+        "--models", container["model"],
+    ]
+    log = open(log_dir / f"{container['name']}.log", "ab")
+    process = subprocess.Popen(
+        cmd, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    return process.pid
+
+
+def _parse_run(args: list[str]) -> dict:
+    """`docker run -d --name N --gpus G -p H:C -v V [-e E] IMAGE MODEL_ARGS...` 해석."""
+    name, port, rest = "", 0, []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in ("-d", "--rm", "--trust-remote-code"):
+            i += 1
+        elif arg in ("--name", "-p", "-v", "-e", "--gpus"):
+            value = args[i + 1]
+            if arg == "--name":
+                name = value
+            elif arg == "-p":
+                port = int(value.split(":")[0])
+            i += 2
+        else:
+            rest = args[i:]
+            break
+    # rest = [image, ...]. TEI: --model-id M, vLLM: 첫 위치 인자가 모델
+    model_args = rest[1:]
+    if "--model-id" in model_args:
+        kind, model = "tei", model_args[model_args.index("--model-id") + 1]
+    else:
+        kind, model = "vllm", model_args[0]
+    return {"name": name, "port": port, "kind": kind, "model": model}
+
+
+def fake_docker(args: list[str]) -> int:
+    path = _state_path()
+    # pool 로딩, bluegreen 교체 등으로 docker 명령이 동시에 실행되어도
+    # 서로의 상태 변경을 덮어쓰지 않도록 read-modify-write 전체를 잠근다
+    with open(path.with_name("containers.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        log = os.environ.get("STUB_DOCKER_LOG")
+        if log:
+            with open(log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(args) + "\n")
+        return _docker(args, path)
+
+
+def _docker(args: list[str], path: Path) -> int:
+    spawn = _spawn_enabled()
+    containers: dict[str, dict] = json.loads(path.read_text()) if path.exists() else {}
+    command = args[0] if args else ""
+    rc = 0
+
+    if command == "run":
+        container = _parse_run(args[1:])
+        existing = containers.get(container["name"])
+        if existing is not None:
+            print(
+                f'Conflict. The container name "/{container["name"]}" is already in use',
+                file=sys.stderr,
+            )
+            rc = 125
+        else:
+            container["pid"] = _spawn(container, path.parent) if spawn else None
+            containers[container["name"]] = container
+            print(f"stub-{container['pid'] or container['name']}")
+    elif command == "start":
+        container = containers.get(args[1])
+        if container is None:
+            print(f"Error: No such container: {args[1]}", file=sys.stderr)
+            rc = 1
+        elif spawn and not _alive(container.get("pid")):
+            container["pid"] = _spawn(container, path.parent)
+    elif command == "stop":
+        container = containers.get(args[1])
+        if container is None:
+            rc = 1
+        else:
+            _kill(container.get("pid"))
+            container["pid"] = None
+    elif command == "rm":
+        name = args[-1]
+        container = containers.pop(name, None)
+        if container is not None:
+            _kill(container.get("pid"))
+        elif "-f" not in args:
+            print(f"Error: No such container: {name}", file=sys.stderr)
+            rc = 1
+    elif command == "ps":
+        name_filter = ""
+        if "--filter" in args:
+            name_filter = args[args.index("--filter") + 1].removeprefix("name=")
+        show_all = "-a" in args
+        print("\n".join(
+            name for name, c in containers.items()
+            if name_filter in name and (show_all or _alive(c.get("pid")))
+        ))
+    else:
+        print(f"stub docker: unsupported command {command!r}", file=sys.stderr)
+        rc = 1
+
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(containers))
+    os.replace(tmp, path)
+    return rc
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "docker":
+        # docker 인자는 그대로 해석 (argparse가 -d, -p 등을 옵션으로 잡지 않도록)
+        sys.exit(fake_docker(argv[1:]))
+
+    parser = argparse.ArgumentParser(
+        prog="embedding-gateway-stub",
+        description="Stub Ollama/TEI/vLLM servers and fake docker for CPU-only benchmarking",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Run a stub backend server")
+    serve.add_argument("--kind", choices=STUB_KINDS, default=_env("kind", "tei"))
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=_env("port", 8080))
+    serve.add_argument(
+        "--models", default=_env("models", "stub-model"),
+        help="Comma-separated model names (TEI/vLLM containers serve the first)",
+    )
+    serve.add_argument("--dims", type=int, default=_env("dims", 1024))
+    serve.add_argument("--latency", default=_env("latency", "fixed:0"))
+    serve.add_argument("--per-item-ms", type=float, default=_env("per_item_ms", 0.0))
+    serve.add_argument("--error-rate", type=float, default=_env("error_rate", 0.0))
+    serve.add_argument("--error-status", type=int, default=_env("error_status", 500))
+    serve.add_argument("--max-concurrency", type=int, default=_env("max_concurrency", 0))
+    serve.add_argument(
+        "--reject-overload", action="store_true",
+        default=_env("reject_overload", "") not in ("", "0", "false"),
+    )
+    serve.add_argument("--load-time", type=float, default=_env("load_time", 0.0))
+    serve.add_argument("--seed", type=int, default=_env("seed", 0))
+    sub.add_parser("docker", help="Fake docker command (run/start/stop/rm/ps)")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    config = StubConfig(
+        kind=args.kind,
+        models=[m.strip() for m in args.models.split(",") if m.strip()],
+        dims=args.dims,
+        latency=args.latency,
+        per_item_ms=args.per_item_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        max_concurrency=args.max_concurrency,
+        reject_overload=args.reject_overload,
+        load_time=args.load_time,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
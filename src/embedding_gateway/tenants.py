@@ -0,0 +1,147 @@
+import time
+
+from embedding_gateway import metrics
+from embedding_gateway.admission import DEFAULT_TENANT
+from embedding_gateway.errors import TenantRateLimitedError
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 token bucket.
+
+    take()는 요청 전에 차감하고, charge()는 처리 후에 알게 된 양(토큰 수)을 사후 차감한다.
+    refund()는 take()로 차감했지만 처리되지 않은 양을 돌려준다.
+    잔량이 음수가 되면 다시 채워질 때까지 take()가 거절된다.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount: float) -> float:
+        """amount만큼 차감하고 0을 반환. 부족하면 차감하지 않고 다시 시도할 때까지의 시간(초).
+
+        capacity보다 큰 요청은 bucket이 가득 찼을 때 통과시킨다 (잔량은 음수가 됨).
+        """
+        self._refill()
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            self.tokens -= amount
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def charge(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class Tenant:
+    """API key로 식별한 호출자 (팀). WFQ 가중치, 텍스트/토큰 rate limit, 메트릭."""
+
+    def __init__(
+        self,
+        name: str,
+        weight: float = 1.0,
+        texts_per_second: float = 0.0,
+        tokens_per_second: float = 0.0,
+        burst_seconds: float = 1.0,
+    ):
+        self.name = name
+        self.weight = weight
+        self.texts = (
+            TokenBucket(texts_per_second, texts_per_second * burst_seconds)
+            if texts_per_second > 0 else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_second, tokens_per_second * burst_seconds)
+            if tokens_per_second > 0 else None
+        )
+        self.requests = 0
+        self.throttled = {"texts": 0, "tokens": 0}
+        self._duration = metrics.TENANT_DURATION.labels(name)
+        self._texts = metrics.TENANT_TEXTS.labels(name)
+        self._tokens = metrics.TENANT_TOKENS.labels(name)
+        self._throttled = {
+            reason: metrics.TENANT_THROTTLED.labels(name, reason) for reason in self.throttled
+        }
+
+    def _throttle(self, reason: str, retry_after: float) -> TenantRateLimitedError:
+        self.throttled[reason] += 1
+        self._throttled[reason].inc()
+        return TenantRateLimitedError(
+            f"Tenant '{self.name}' exceeded its {reason} per second limit",
+            retry_after=retry_after,
+        )
+
+    def admit(self, texts: int) -> None:
+        """요청 시작 전 rate limit 확인. 넘으면 TenantRateLimitedError (429)."""
+        if self.tokens is not None:
+            # 토큰 수는 응답을 받아야 알 수 있으므로 사후 차감한 잔량이 음수면 거절
+            wait = self.tokens.take(0)
+            if wait > 0:
+                raise self._throttle("tokens", wait)
+        if self.texts is not None:
+            wait = self.texts.take(texts)
+            if wait > 0:
+                raise self._throttle("texts", wait)
+
+    def refund(self, texts: int) -> None:
+        """admit() 후 admission control에서 거절된 요청의 텍스트 수를 돌려준다."""
+        if self.texts is not None:
+            self.texts.refund(texts)
+
+    def finish(self, status: int, texts: int, tokens: int, elapsed: float) -> None:
+        self.requests += 1
+        if tokens and self.tokens is not None:
+            self.tokens.charge(tokens)
+        if not metrics.enabled:
+            return
+        self._duration.observe(elapsed)
+        if status == 200:
+            self._texts.inc(texts)
+            self._tokens.inc(tokens)
+
+    def stats(self) -> dict:
+        return {
+            "weight": self.weight,
+            "requests": self.requests,
+            "throttled_texts": self.throttled["texts"],
+            "throttled_tokens": self.throttled["tokens"],
+            "texts_available": (
+                round(self.texts.tokens, 3) if self.texts is not None else None
+            ),
+            "tokens_available": (
+                round(self.tokens.tokens, 3) if self.tokens is not None else None
+            ),
+        }
+
+
+class TenantRegistry:
+    """API key → Tenant. 등록되지 않은 key나 key 없는 요청은 default tenant."""
+
+    def __init__(self, keys: dict[str, str], tenants: dict[str, Tenant]):
+        self.keys = keys
+        self.tenants = tenants
+        for name in set(keys.values()) | {DEFAULT_TENANT}:
+            self.tenants.setdefault(name, Tenant(name))
+
+    @property
+    def weights(self) -> dict[str, float]:
+        return {name: t.weight for name, t in self.tenants.items()}
+
+    def identify(self, api_key: str | None) -> Tenant:
+        name = self.keys.get(api_key, DEFAULT_TENANT) if api_key else DEFAULT_TENANT
+        return self.tenants[name]
+
+    def stats(self) -> dict:
+        return {name: t.stats() for name, t in self.tenants.items()}
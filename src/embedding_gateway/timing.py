@@ -0,0 +1,79 @@
+"""요청 단계별 소요 시간 (Server-Timing 헤더 + JSON access log).
+
+라우터가 샘플링된 요청에만 PhaseTimer를 context.timer에 넣고, 라우터/백엔드는
+`with timing.phase("backend"):`로 구간을 기록한다. 샘플링되지 않은 요청은
+phase()가 공유 no-op context를 돌려주므로 ContextVar 조회 한 번만 추가된다.
+
+같은 이름의 구간은 합산된다. chunk를 동시에 보내는 요청은 backend 합이 total보다 클 수 있다.
+"""
+
+import logging
+import random
+import time
+from contextlib import nullcontext
+
+from embedding_gateway import context
+from embedding_gateway.responses import dumps
+
+access_logger = logging.getLogger("embedding_gateway.access")
+
+# 0.0~1.0. 이 비율의 요청만 단계별 시간을 기록 (REQUEST_TIMING_SAMPLE_RATE)
+sample_rate = 0.0
+
+_NOOP = nullcontext()
+
+
+class PhaseTimer:
+    __slots__ = ("phases",)
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+
+    def add(self, name: str, elapsed: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def server_timing(self) -> str:
+        """`resolve;dur=0.02, backend;dur=12.5` 형식 (ms)."""
+        return ", ".join(
+            f"{name};dur={elapsed * 1000:.2f}" for name, elapsed in self.phases.items()
+        )
+
+    def phases_ms(self) -> dict[str, float]:
+        return {name: round(elapsed * 1000, 3) for name, elapsed in self.phases.items()}
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "started")
+
+    def __init__(self, timer: PhaseTimer, name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.timer.add(self.name, time.perf_counter() - self.started)
+
+
+def phase(name: str):
+    """현재 요청이 샘플링되었으면 구간 시간을 기록하는 context manager."""
+    timer = context.timer.get()
+    if timer is None:
+        return _NOOP
+    return _Phase(timer, name)
+
+
+def start() -> PhaseTimer | None:
+    """sample_rate 확률로 이 요청의 PhaseTimer를 만들어 context에 설정."""
+    if sample_rate <= 0.0 or (sample_rate < 1.0 and random.random() >= sample_rate):
+        return None
+    timer = PhaseTimer()
+    context.timer.set(timer)
+    return timer
+
+
+def log_access(timer: PhaseTimer, **fields) -> None:
+    """샘플링된 요청 하나를 JSON 한 줄로 기록."""
+    if access_logger.isEnabledFor(logging.INFO):
+        access_logger.info(dumps({**fields, "phases_ms": timer.phases_ms()}).decode())
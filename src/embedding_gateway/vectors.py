@@ -0,0 +1,69 @@
+"""float32 벡터 패킹 헬퍼.
+
+캐시/스토어는 Python float 리스트 대신 little-endian float32 바이트로 벡터를 보관한다.
+encoding_format="base64" 응답도 같은 바이트 배열을 base64로 인코딩한 것 (OpenAI 규격).
+"""
+
+import base64
+import sys
+from array import array
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+Embedding = list[float] | str
+
+
+def pack_float32(embedding: list[float]) -> bytes:
+    """float 리스트를 little-endian float32 바이트로 변환."""
+    buf = array("f", embedding)
+    if _BIG_ENDIAN:
+        buf.byteswap()
+    return buf.tobytes()
+
+
+def unpack_float32(buf: bytes) -> list[float]:
+    """little-endian float32 바이트를 float 리스트로 변환."""
+    arr = array("f")
+    arr.frombytes(buf)
+    if _BIG_ENDIAN:
+        arr.byteswap()
+    return arr.tolist()
+
+
+def to_float32(embedding: Embedding) -> bytes:
+    """float 리스트 또는 base64 문자열 임베딩을 float32 바이트로 변환."""
+    if isinstance(embedding, str):
+        return base64.b64decode(embedding)
+    return pack_float32(embedding)
+
+
+def from_float32(buf: bytes, encoding_format: str = "float") -> Embedding:
+    """float32 바이트를 요청된 encoding_format의 임베딩으로 변환."""
+    if encoding_format == "base64":
+        return base64.b64encode(buf).decode("ascii")
+    return unpack_float32(buf)
+
+
+def format_embedding(
+    embedding: Embedding,
+    encoding_format: str = "float",
+    dimensions: int | None = None,
+) -> Embedding:
+    """백엔드 응답 임베딩을 dimensions로 자르고 encoding_format에 맞춘다.
+
+    base64 입력은 디코딩한 바이트를 그대로 잘라 다시 인코딩하므로 float 객체를 만들지 않는다.
+    """
+    if isinstance(embedding, str):
+        if dimensions:
+            embedding = base64.b64encode(
+                base64.b64decode(embedding)[: dimensions * 4]
+            ).decode("ascii")
+        if encoding_format == "base64":
+            return embedding
+        return from_float32(base64.b64decode(embedding))
+
+    if dimensions:
+        embedding = embedding[:dimensions]
+    if encoding_format == "base64":
+        return from_float32(pack_float32(embedding), "base64")
+    return embedding
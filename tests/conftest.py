@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import pytest
@@ -88,3 +89,13 @@ async def client():
     await vllm.close()
     router_module.registry = None
     health_module.registry = None
+
+
+@pytest.fixture
+def docker_log(tmp_path, monkeypatch):
+    log = tmp_path / "docker.log"
+    log.touch()
+    monkeypatch.setenv("STUB_DOCKER_LOG", str(log))
+    monkeypatch.setenv("STUB_DOCKER_STATE", str(tmp_path / "docker"))
+    monkeypatch.setenv("STUB_DOCKER_SPAWN", "0")
+    return lambda: [json.loads(line) for line in log.read_text().splitlines()]
@@ -0,0 +1,32 @@
+"""managed 백엔드 테스트용 가짜 docker 명령(stub docker)과 포트별 stub TEI 서버."""
+
+import json
+import sys
+
+import httpx
+
+from embedding_gateway.backends.tei import TEIBackend
+
+# 배포되는 stub docker (conftest의 docker_log fixture가 서버 프로세스 없이 실행되게 설정)
+FAKE_DOCKER = [sys.executable, "-m", "embedding_gateway.stub", "docker"]
+
+
+def stub_tei(request: httpx.Request) -> httpx.Response:
+    """포트별 TEI 서버 흉내: 임베딩 값으로 자신의 포트를 돌려준다."""
+    if request.url.path == "/health":
+        return httpx.Response(200)
+    body = json.loads(request.content)
+    return httpx.Response(200, json={
+        "data": [
+            {"embedding": [float(request.url.port)], "index": i}
+            for i in range(len(body["input"]))
+        ],
+        "usage": {"prompt_tokens": 1, "total_tokens": 1},
+    })
+
+
+class StubTEIBackend(TEIBackend):
+    def _make_client(self, base_url: str) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url, transport=httpx.MockTransport(stub_tei)
+        )
@@ -0,0 +1,219 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from embedding_gateway import metrics
+from embedding_gateway import router as router_module
+from embedding_gateway.admission import AdmissionController, ConcurrencyLimiter
+from embedding_gateway.errors import AdmissionRejectedError
+
+
+@pytest.mark.asyncio
+async def test_limiter_queues_then_rejects_when_queue_is_full():
+    limiter = ConcurrencyLimiter("tei", max_concurrency=1, max_queue=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.stats()["queued"] == 1
+
+    with pytest.raises(AdmissionRejectedError) as exc:
+        await limiter.acquire()
+    assert exc.value.status_code == 429
+    assert exc.value.retry_after >= 1.0
+
+    limiter.release(0.5)
+    await waiter
+    assert limiter.active == 1
+    assert limiter.queued == 0
+    assert limiter.stats()["rejected_queue_full"] == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_on_projected_and_actual_wait():
+    limiter = ConcurrencyLimiter("tei", max_concurrency=2, max_queue=10, max_wait=0.05)
+    limiter.service_time = 0.04
+    await limiter.acquire()
+    await limiter.acquire()
+    # (0 + 1) / 2 × 40ms = 20ms → 대기열에 들어가지만 50ms 안에 슬롯이 안 나면 거절
+    with pytest.raises(AdmissionRejectedError, match="in queue"):
+        await limiter.acquire()
+    assert limiter.queued == 0
+
+    # 예상 대기 (0 + 1) / 2 × 200ms = 100ms > 50ms → 바로 거절
+    limiter.service_time = 0.2
+    with pytest.raises(AdmissionRejectedError, match="estimated wait") as exc:
+        await limiter.acquire()
+    assert exc.value.retry_after == pytest.approx(1.0)
+    assert limiter.stats()["rejected_wait"] == 2
+
+
+@pytest.mark.asyncio
+async def test_raising_limit_at_runtime_wakes_waiters():
+    limiter = ConcurrencyLimiter("tei", max_concurrency=1, max_queue=5)
+    await limiter.acquire()
+    waiters = [asyncio.create_task(limiter.acquire()) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert limiter.queued == 2
+
+    limiter.set_limits(max_concurrency=3)
+    await asyncio.gather(*waiters)
+    assert limiter.active == 3
+
+    cancelled = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert limiter.queued == 0
+    assert limiter.active == 3
+
+
+@pytest.mark.asyncio
+async def test_gateway_returns_429_and_limits_are_adjustable(client, monkeypatch):
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await release.wait()
+        return httpx.Response(200, json={
+            "data": [{"embedding": [0.1, 0.2], "index": 0}],
+            "usage": {"prompt_tokens": 1, "total_tokens": 1},
+        })
+
+    tei = router_module.registry.get_backend("nlpai-lab/KURE-v1")
+    monkeypatch.setattr(tei, "docker_image", "")
+    tei.client = httpx.AsyncClient(base_url="http://tei", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(router_module, "admission", AdmissionController(
+        {"tei": ConcurrencyLimiter("tei", max_concurrency=1, max_queue=0)}
+    ))
+    body = {"model": "nlpai-lab/KURE-v1", "input": "hi"}
+
+    first = asyncio.create_task(client.post("/v1/embeddings", json=body))
+    while router_module.admission.backends["tei"].active == 0:
+        await asyncio.sleep(0.001)
+    rejected = await client.post("/v1/embeddings", json=body)
+    assert rejected.status_code == 429
+    assert int(rejected.headers["retry-after"]) >= 1
+
+    r = await client.put("/admission/backend/tei", json={"max_queue": 4})
+    assert r.status_code == 200
+    assert r.json()["max_queue"] == 4
+    queued = asyncio.create_task(client.post("/v1/embeddings", json=body))
+    while router_module.admission.backends["tei"].queued == 0:
+        await asyncio.sleep(0.001)
+    text = (await client.get("/metrics")).text
+    assert 'embedding_gateway_admission_queued{scope="backend",name="tei"} 1' in text
+
+    release.set()
+    assert (await first).status_code == 200
+    assert (await queued).status_code == 200
+
+    r = await client.put("/admission/model/nlpai-lab/KURE-v1", json={"max_concurrency": 2})
+    assert r.status_code == 200
+    assert router_module.admission.models["nlpai-lab/KURE-v1"].max_concurrency == 2
+    assert (await client.put("/admission/backend/nope", json={})).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_interactive_goes_first_but_bulk_keeps_min_share():
+    limiter = ConcurrencyLimiter("tei", max_concurrency=1, max_queue=10, bulk_share=0.5)
+    await limiter.acquire()
+    order = []
+
+    async def request(lane, i):
+        await limiter.acquire(lane)
+        order.append(f"{lane[0]}{i}")
+
+    tasks = [asyncio.create_task(request("bulk", i)) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(request("interactive", i)) for i in range(3)]
+    await asyncio.sleep(0)
+    assert limiter.stats()["queued_bulk"] == 3
+    assert limiter.stats()["queued_interactive"] == 3
+
+    for _ in range(6):
+        limiter.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    # 두 lane이 모두 대기 중일 때 슬롯 절반은 bulk, 나머지는 도착 순서와 무관하게 interactive 우선
+    assert order == ["i0", "b0", "i1", "b1", "i2", "b2"]
+
+
+@pytest.mark.asyncio
+async def test_interactive_preempts_newest_queued_bulk_when_full():
+    limiter = ConcurrencyLimiter("tei", max_concurrency=1, max_queue=2)
+    await limiter.acquire()
+    bulk = [asyncio.create_task(limiter.acquire("bulk")) for _ in range(2)]
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(limiter.acquire("interactive"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejectedError, match="preempted"):
+        await bulk[1]
+    limiter.release()
+    await interactive
+    assert not bulk[0].done()
+    assert limiter.stats()["preempted"] == 1
+    limiter.release()
+    await bulk[0]
+
+
+@pytest.mark.asyncio
+async def test_rejected_interactive_does_not_preempt_bulk():
+    limiter = ConcurrencyLimiter("tei", max_concurrency=1, max_queue=3, max_wait=0.5)
+    limiter.service_time = 0.2
+    await limiter.acquire()
+    bulk = asyncio.create_task(limiter.acquire("bulk"))
+    await asyncio.sleep(0)
+    queued = [asyncio.create_task(limiter.acquire("interactive")) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert limiter.queued == 3
+
+    # 대기열이 가득 찼지만 예상 대기 (2 + 1) × 0.2s > 0.5s라 거절 → bulk를 밀어내지 않음
+    with pytest.raises(AdmissionRejectedError, match="estimated wait"):
+        await limiter.acquire("interactive")
+    assert not bulk.done()
+    assert limiter.stats()["preempted"] == 0
+    for task in (bulk, *queued):
+        task.cancel()
+    await asyncio.gather(bulk, *queued, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_lane_from_header_api_key_and_size(client, monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        n = len(json.loads(request.content)["input"])
+        return httpx.Response(200, json={
+            "data": [{"embedding": [0.1], "index": i} for i in range(n)],
+            "usage": {"prompt_tokens": n, "total_tokens": n},
+        })
+
+    tei = router_module.registry.get_backend("nlpai-lab/KURE-v1")
+    monkeypatch.setattr(tei, "docker_image", "")
+    tei.client = httpx.AsyncClient(base_url="http://tei", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(router_module, "priority_keys", {"nightly": "bulk"})
+    monkeypatch.setattr(router_module, "bulk_min_items", 3)
+    bulk = metrics.LANE_DURATION.labels("tei", "bulk")
+    interactive = metrics.LANE_DURATION.labels("tei", "interactive")
+    before = (sum(bulk.counts), sum(interactive.counts))
+
+    async def post(texts, **headers):
+        r = await client.post(
+            "/v1/embeddings", json={"model": "nlpai-lab/KURE-v1", "input": texts}, headers=headers
+        )
+        assert r.status_code == 200
+
+    await post(["a"], **{"X-Priority": "bulk"})
+    await post(["a"], Authorization="Bearer nightly", **{"X-Priority": "interactive"})
+    await post(["a", "b", "c"])
+    await post(["a", "b", "c"], **{"X-Priority": "interactive"})
+    await post(["a"], Authorization="Bearer other")
+    assert (sum(bulk.counts) - before[0], sum(interactive.counts) - before[1]) == (3, 2)
+
+    r = await client.post(
+        "/v1/embeddings",
+        json={"model": "nlpai-lab/KURE-v1", "input": "a"},
+        headers={"X-Priority": "urgent"},
+    )
+    assert r.status_code == 422
@@ -0,0 +1,235 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from embedding_gateway import batches as batches_module
+from embedding_gateway import router as router_module
+from embedding_gateway.backends.ollama import OllamaBackend
+from embedding_gateway.backends.tei import TEIBackend
+from embedding_gateway.batches import BatchJobManager, batch_router
+from embedding_gateway.errors import GatewayBusyError
+from embedding_gateway.registry import ModelRegistry
+from embedding_gateway.stub import StubConfig, create_app, deterministic_vector
+from embedding_gateway.vectors import pack_float32, unpack_float32
+
+
+def _jsonl(lines: list[dict]) -> bytes:
+    return b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+
+
+async def _chunks(data: bytes):
+    yield data
+
+
+@pytest.fixture
+async def stub_registry(monkeypatch):
+    """stub Ollama(bge-m3)와 stub TEI(org/A, 현재 로딩됨)를 붙인 registry."""
+    ollama = OllamaBackend(base_url="http://ollama")
+    ollama.client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(create_app(StubConfig(kind="ollama", models=["bge-m3"], dims=8))),
+        base_url="http://ollama",
+    )
+    tei = TEIBackend(
+        base_url="http://tei", default_model="org/A", available_models=["org/A", "org/B"]
+    )
+    tei.client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(create_app(StubConfig(kind="tei", models=["org/A"], dims=8))),
+        base_url="http://tei",
+    )
+    tei.current_model = "org/A"
+    reg = ModelRegistry()
+    reg.register_backend("ollama", ollama)
+    reg.register_backend("tei", tei)
+    reg.register_model("bge-m3", ollama)
+    reg.register_model("org/A", tei)
+    reg.register_model("org/B", tei)
+    monkeypatch.setattr(router_module, "registry", reg)
+    yield reg
+    await ollama.close()
+    await tei.close()
+
+
+async def _wait(manager: BatchJobManager, job_id: str, status: str = "completed"):
+    for _ in range(500):
+        if manager.get(job_id).status == status:
+            return manager.get(job_id)
+        await asyncio.sleep(0.01)
+    raise AssertionError(manager.get(job_id).to_dict())
+
+
+@pytest.mark.asyncio
+async def test_batch_api_end_to_end_with_stub_backends(stub_registry, tmp_path, monkeypatch):
+    manager = BatchJobManager(tmp_path, stub_registry, router_module.embed_vectors, window=2)
+    await manager.start()
+    monkeypatch.setattr(batches_module, "manager", manager)
+    app = FastAPI()
+    app.include_router(batch_router)
+    lines = [
+        {"custom_id": "d1", "model": "bge-m3", "input": "hello"},
+        {"custom_id": "d2", "input": "world"},
+        {"custom_id": "d3", "body": {"model": "bge-m3", "input": "a much longer text"}},
+        {"custom_id": "d4", "input": "x"},
+        {"custom_id": "d5", "model": "bge-m3", "input": "bye"},
+    ]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://gw") as client:
+        r = await client.post("/v1/batches", params={"model": "org/A"}, content=_jsonl(lines))
+        assert r.status_code == 200
+        job_id = r.json()["id"]
+        assert r.json()["request_counts"] == {"total": 5, "completed": 0}
+        job = await _wait(manager, job_id)
+        assert job.completed == 5
+        assert (await client.get(f"/v1/batches/{job_id}")).json()["status"] == "completed"
+
+        r = await client.get(f"/v1/batches/{job_id}/results")
+        results = [json.loads(line) for line in r.text.splitlines()]
+        assert [x["custom_id"] for x in results] == ["d1", "d2", "d3", "d4", "d5"]
+        expected = [
+            deterministic_vector("org/A" if line.get("model") is None and "body" not in line
+                                 else "bge-m3", (line.get("body") or line)["input"], 8)
+            for line in lines
+        ]
+        for result, vector in zip(results, expected):
+            assert result["embedding"] == pytest.approx(vector, rel=1e-6)
+
+        r = await client.get(f"/v1/batches/{job_id}/results", params={"format": "float32"})
+        assert r.headers["x-embedding-dimensions"] == "8"
+        assert r.content == b"".join(pack_float32(v) for v in expected)
+
+        assert len((await client.get("/v1/batches")).json()["data"]) == 1
+        assert (await client.delete(f"/v1/batches/{job_id}")).status_code == 200
+        assert (await client.get(f"/v1/batches/{job_id}")).status_code == 404
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_invalid_input(stub_registry, tmp_path, monkeypatch):
+    manager = BatchJobManager(tmp_path, stub_registry, router_module.embed_vectors)
+    monkeypatch.setattr(batches_module, "manager", manager)
+    app = FastAPI()
+    app.include_router(batch_router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://gw") as client:
+        bad = b'{"model": "bge-m3", "input": "ok"}\n{not json\n'
+        r = await client.post("/v1/batches", content=bad)
+        assert r.status_code == 400
+        assert "line 2" in r.json()["detail"]
+        r = await client.post("/v1/batches", content=_jsonl([{"model": "nope", "input": "x"}]))
+        assert r.status_code == 400
+        r = await client.post("/v1/batches", content=_jsonl([{"input": ["a", "b"]}]))
+        assert r.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_groups_run_loaded_model_first_and_resume_from_checkpoint(stub_registry, tmp_path):
+    calls: list[tuple[str, list[str]]] = []
+    blocked = asyncio.Event()
+    block = True
+
+    async def embed(model, texts, dimensions):
+        calls.append((model, list(texts)))
+        if block and len(calls) == 2:
+            blocked.set()
+            await asyncio.Event().wait()  # 두 번째 window 처리 중 "재시작"
+        return [pack_float32(deterministic_vector(model, t, 4)) for t in texts], len(texts)
+
+    manager = BatchJobManager(tmp_path, stub_registry, embed, window=2)
+    await manager.start()
+    texts = ["b1", "a1", "b2", "a2", "a3", "a4"]
+    lines = [{"model": f"org/{t[0].upper()}", "input": t} for t in texts]
+    job = await manager.create(_chunks(_jsonl(lines)))
+    # org/A가 로딩되어 있으므로 입력 순서와 무관하게 org/A 그룹 먼저
+    assert [g.model for g in job.groups] == ["org/A", "org/B"]
+    await asyncio.wait_for(blocked.wait(), 5)
+    await manager.stop()
+    # 쓰다 만 결과가 있어도 checkpoint 기준으로 잘라낸다
+    with open(tmp_path / job.id / "0.f32", "ab") as f:
+        f.write(b"partial")
+
+    calls.clear()
+    block = False
+    resumed = BatchJobManager(tmp_path, stub_registry, embed, window=2)
+    await resumed.start()
+    await _wait(resumed, job.id)
+    await resumed.stop()
+    assert calls == [("org/A", ["a3", "a4"]), ("org/B", ["b1", "b2"])]
+    rows = b"".join(resumed.results_float32(resumed.get(job.id)))
+    vectors = [unpack_float32(rows[i * 16:(i + 1) * 16]) for i in range(len(texts))]
+    for vector, line in zip(vectors, lines):
+        assert vector == pytest.approx(deterministic_vector(line["model"], line["input"], 4), rel=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_busy_job_can_be_cancelled_and_times_out(stub_registry, tmp_path):
+    busy = True
+
+    async def embed(model, texts, dimensions):
+        if busy:
+            raise GatewayBusyError("backend down", retry_after=0.01)
+        return [pack_float32([1.0])] * len(texts), len(texts)
+
+    manager = BatchJobManager(tmp_path, stub_registry, embed, busy_timeout=0.2)
+    await manager.start()
+    stuck = await manager.create(_chunks(_jsonl([{"model": "bge-m3", "input": "a"}])))
+    await _wait(manager, stuck.id, "in_progress")
+    manager.cancel(stuck.id)
+    # 취소된 job이 worker를 붙잡고 있지 않아야 다음 job이 처리됨
+    busy = False
+    job = await manager.create(_chunks(_jsonl([{"model": "bge-m3", "input": "b"}])))
+    await _wait(manager, job.id)
+    assert manager.get(stuck.id).status == "cancelled"
+
+    busy = True
+    job = await manager.create(_chunks(_jsonl([{"model": "bge-m3", "input": "c"}])))
+    job = await _wait(manager, job.id, "failed")
+    assert "backend down" in job.error
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_results_use_resolution_from_upload_time(stub_registry, tmp_path):
+    async def embed(model, texts, dimensions):
+        return [pack_float32(deterministic_vector(model, t, 4)) for t in texts], len(texts)
+
+    manager = BatchJobManager(tmp_path, stub_registry, embed)
+    await manager.start()
+    lines = [{"model": "A", "input": "x"}, {"model": "bge-m3", "input": "y"}]
+    job = await manager.create(_chunks(_jsonl(lines)))
+    await _wait(manager, job.id)
+    await manager.stop()
+
+    # catalog 갱신으로 모델이 빠져도 결과 다운로드는 업로드 시점의 해석을 사용
+    stub_registry.unregister_models(["org/A"])
+    assert stub_registry.resolve_model("A") is None
+    results = [json.loads(line) for line in b"".join(manager.results_jsonl(job)).splitlines()]
+    assert [r["model"] for r in results] == ["A", "bge-m3"]
+    assert results[0]["embedding"] == pytest.approx(deterministic_vector("org/A", "x", 4), rel=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_groups_with_other_dimensions_stay_next_to_their_model(stub_registry, tmp_path):
+    tei = stub_registry.get_backend("org/A")
+    tei.current_model = None
+    loaded: list[str] = []
+
+    async def embed(model, texts, dimensions):
+        if not loaded or loaded[-1] != model:
+            loaded.append(model)  # managed 백엔드라면 모델 스왑
+        return [pack_float32([1.0] * (dimensions or 4)) for _ in texts], len(texts)
+
+    manager = BatchJobManager(tmp_path, stub_registry, embed)
+    await manager.start()
+    lines = [
+        {"model": "org/B", "input": "x"},
+        {"model": "org/A", "input": "y"},
+        {"model": "org/B", "input": "z", "dimensions": 2},
+    ]
+    job = await manager.create(_chunks(_jsonl(lines)))
+    assert [(g.model, g.dimensions) for g in job.groups] == [
+        ("org/B", None), ("org/B", 2), ("org/A", None),
+    ]
+    await _wait(manager, job.id)
+    await manager.stop()
+    assert loaded == ["org/B", "org/A"]
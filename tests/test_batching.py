@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+
+from embedding_gateway import router as router_module
+from embedding_gateway.batching import MicroBatcher, SubBatcher
+from embedding_gateway.models import EmbeddingData, EmbeddingResponse, UsageInfo
+
+
+class FakeBackend:
+    def __init__(self, fail: bool = False):
+        self.calls: list[list[str]] = []
+        self.fail = fail
+
+    async def embed(self, texts, model, dimensions=None, encoding_format="float"):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("backend down")
+        return EmbeddingResponse(
+            data=[
+                EmbeddingData(embedding=[float(len(t))], index=i)
+                for i, t in enumerate(texts)
+            ],
+            model=model,
+            usage=UsageInfo(prompt_tokens=10, total_tokens=10),
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced():
+    backend = FakeBackend()
+    batcher = MicroBatcher("fake", backend, max_batch_size=8, max_wait_ms=20)
+
+    results = await asyncio.gather(
+        batcher.embed(["a"], "m"),
+        batcher.embed(["bb", "ccc"], "m"),
+        batcher.embed(["dddd"], "m"),
+    )
+
+    assert backend.calls == [["a", "bb", "ccc", "dddd"]]
+    assert [d.embedding for d in results[1].data] == [[2.0], [3.0]]
+    assert [d.index for d in results[1].data] == [0, 1]
+    assert sum(r.usage.prompt_tokens for r in results) == 10
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["avg_fill_ratio"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting():
+    backend = FakeBackend()
+    batcher = MicroBatcher("fake", backend, max_batch_size=2, max_wait_ms=10_000)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.embed(["a"], "m"), batcher.embed(["b"], "m")),
+        timeout=1.0,
+    )
+    assert len(results) == 2
+    assert backend.calls == [["a", "b"]]
+
+
+@pytest.mark.asyncio
+async def test_models_are_batched_separately_and_errors_propagate():
+    backend = FakeBackend(fail=True)
+    batcher = MicroBatcher("fake", backend, max_batch_size=8, max_wait_ms=5)
+
+    results = await asyncio.gather(
+        batcher.embed(["a"], "m1"),
+        batcher.embed(["b"], "m2"),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert sorted(backend.calls) == [["a"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_router_uses_batcher(client, monkeypatch):
+    backend = router_module.registry.get_backend("bge-m3")
+    fake = FakeBackend()
+    monkeypatch.setitem(
+        router_module.batchers, backend, MicroBatcher("ollama", fake, 8, 5)
+    )
+
+    responses = await asyncio.gather(*[
+        client.post("/v1/embeddings", json={"input": t, "model": "bge-m3"})
+        for t in ("x", "yy")
+    ])
+    assert [r.status_code for r in responses] == [200, 200]
+    assert len(fake.calls) == 1
+
+    stats = (await client.get("/stats")).json()["batching"]
+    assert stats["ollama"]["items"] == 2
+
+
+class FlakyBackend(FakeBackend):
+    def __init__(self, fail_first: str):
+        super().__init__()
+        self.fail_first = fail_first
+        self.failed = False
+
+    async def embed(self, texts, model, dimensions=None, encoding_format="float"):
+        if self.fail_first in texts and not self.failed:
+            self.failed = True
+            self.calls.append(list(texts))
+            raise RuntimeError("transient")
+        return await super().embed(texts, model, dimensions, encoding_format)
+
+
+@pytest.mark.asyncio
+async def test_large_input_is_split_and_reassembled():
+    backend = FakeBackend()
+    splitter = SubBatcher("fake", chunk_size=3, concurrency=2)
+    texts = ["a" * n for n in range(1, 9)]
+
+    result = await splitter.embed(backend.embed, texts, "m")
+
+    assert [len(c) for c in backend.calls] == [3, 3, 2]
+    assert [d.index for d in result.data] == list(range(8))
+    assert [d.embedding for d in result.data] == [[float(n)] for n in range(1, 9)]
+    assert result.usage.prompt_tokens == 30
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_is_retried_alone():
+    backend = FlakyBackend(fail_first="e")
+    splitter = SubBatcher("fake", chunk_size=2, concurrency=4, retry_backoff=0)
+
+    result = await splitter.embed(backend.embed, list("abcdef"), "m")
+
+    assert len(result.data) == 6
+    assert backend.calls.count(["e", "f"]) == 2
+    assert backend.calls.count(["a", "b"]) == 1
+    assert splitter.stats()["chunk_retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_chunks_respect_char_budget():
+    backend = FakeBackend()
+    splitter = SubBatcher("fake", chunk_size=10, concurrency=2, max_chars=6)
+    texts = ["aaa", "bb", "c", "dddddddd", "ee", "f"]
+
+    result = await splitter.embed(backend.embed, texts, "m")
+
+    # 긴 텍스트는 혼자 한 chunk
+    assert backend.calls == [["aaa", "bb", "c"], ["dddddddd"], ["ee", "f"]]
+    assert [d.embedding for d in result.data] == [[float(len(t))] for t in texts]
+    assert not splitter.fits(["aaaa", "bbb"])
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_cancels_remaining_chunks():
+    started = []
+    cancelled = []
+
+    async def embed(texts, model, dimensions=None, encoding_format="float"):
+        started.append(texts[0])
+        if texts[0] == "a":
+            raise ValueError("bad request")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(texts[0])
+            raise
+
+    splitter = SubBatcher("fake", chunk_size=1, concurrency=4)
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(splitter.embed(embed, list("abc"), "m"), 5)
+    assert sorted(cancelled) == ["b", "c"]
@@ -0,0 +1,112 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from embedding_gateway import router as router_module
+from embedding_gateway.cache import EmbeddingCache
+from embedding_gateway.models import EmbeddingData, EmbeddingResponse, UsageInfo
+from embedding_gateway.vectors import pack_float32, unpack_float32
+
+
+def test_pack_roundtrip():
+    assert unpack_float32(pack_float32([0.5, -1.25, 2.0])) == [0.5, -1.25, 2.0]
+
+
+def test_cache_lru_eviction():
+    vec = pack_float32([0.5] * 4)
+    cache = EmbeddingCache(max_bytes=2 * (len(vec) + 160))
+    keys = [EmbeddingCache.make_key("m", None, t) for t in ("a", "b", "c")]
+    cache.put(keys[0], vec)
+    cache.put(keys[1], vec)
+    assert cache.get(keys[0]) == vec  # "a"를 최근 사용으로 갱신
+    cache.put(keys[2], vec)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == vec
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_ttl_expiry(monkeypatch):
+    cache = EmbeddingCache(max_bytes=1 << 20, ttl=10.0)
+    key = EmbeddingCache.make_key("m", None, "a")
+    now = [100.0]
+    monkeypatch.setattr("embedding_gateway.cache.time.monotonic", lambda: now[0])
+    cache.put(key, pack_float32([0.5]))
+    now[0] = 105.0
+    assert cache.get(key) is not None
+    now[0] = 111.0
+    assert cache.get(key) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cache_key_includes_dimensions():
+    assert EmbeddingCache.make_key("m", None, "a") != EmbeddingCache.make_key("m", 8, "a")
+
+
+@pytest.mark.asyncio
+async def test_embeddings_partial_cache_hit(client, monkeypatch):
+    monkeypatch.setattr(router_module, "cache", EmbeddingCache(max_bytes=1 << 20))
+
+    first = EmbeddingResponse(
+        data=[EmbeddingData(embedding=[0.5, 0.25], index=0)],
+        model="bge-m3",
+        usage=UsageInfo(prompt_tokens=3, total_tokens=3),
+    )
+    second = EmbeddingResponse(
+        data=[EmbeddingData(embedding=[1.0, 2.0], index=0)],
+        model="bge-m3",
+        usage=UsageInfo(prompt_tokens=4, total_tokens=4),
+    )
+
+    with patch(
+        "embedding_gateway.backends.ollama.OllamaBackend.embed",
+        new_callable=AsyncMock,
+        side_effect=[first, second],
+    ) as mock_embed:
+        await client.post(
+            "/v1/embeddings", json={"input": "Hello", "model": "bge-m3"}
+        )
+        response = await client.post(
+            "/v1/embeddings",
+            json={"input": ["World", "Hello"], "model": "bge-m3"},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [d["index"] for d in data["data"]] == [0, 1]
+    assert data["data"][0]["embedding"] == [1.0, 2.0]
+    assert data["data"][1]["embedding"] == [0.5, 0.25]
+    assert data["usage"]["prompt_tokens"] == 4
+    # 두 번째 요청은 캐시에 없는 "World"만 백엔드로 전송
+    assert mock_embed.call_args_list[1].args[0] == ["World"]
+
+    stats = (await client.get("/stats")).json()["cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_alias_is_embedded_and_cached_as_resolved_model(client, monkeypatch):
+    monkeypatch.setattr(router_module, "cache", EmbeddingCache(max_bytes=1 << 20))
+
+    async def embed(texts, model, dimensions=None, encoding_format="float"):
+        # 백엔드는 받은 이름 그대로 모델을 고름 (Ollama: "qwen3-embedding" → :latest)
+        vector = [4.0] if model == "qwen3-embedding:4b" else [-1.0]
+        return EmbeddingResponse(
+            data=[EmbeddingData(embedding=vector, index=i) for i in range(len(texts))],
+            model=model,
+            usage=UsageInfo(prompt_tokens=1, total_tokens=1),
+        )
+
+    with patch(
+        "embedding_gateway.backends.ollama.OllamaBackend.embed", side_effect=embed
+    ) as mock_embed:
+        alias = await client.post(
+            "/v1/embeddings", json={"input": "Hello", "model": "qwen3-embedding"}
+        )
+        exact = await client.post(
+            "/v1/embeddings", json={"input": "Hello", "model": "qwen3-embedding:4b"}
+        )
+
+    assert mock_embed.call_args.args[1] == "qwen3-embedding:4b"
+    assert alias.json()["model"] == "qwen3-embedding"
+    assert alias.json()["data"][0]["embedding"] == [4.0]
+    assert exact.json()["data"][0]["embedding"] == [4.0]
@@ -0,0 +1,64 @@
+import pytest
+
+from embedding_gateway import router as router_module
+from embedding_gateway.catalog import ModelCatalog
+from embedding_gateway.registry import ModelRegistry
+
+
+class ListingBackend:
+    def __init__(self, models: list[str]):
+        self.models = models
+        self.calls = 0
+
+    async def list_models(self) -> list[str]:
+        self.calls += 1
+        if self.models is None:
+            raise ConnectionError("offline")
+        return list(self.models)
+
+
+@pytest.mark.asyncio
+async def test_refresh_registers_new_and_drops_vanished_models():
+    reg = ModelRegistry()
+    ollama = ListingBackend(["bge-m3", "custom:1b"])
+    reg.register_backend("ollama", ollama)
+    reg.register_model("bge-m3", ollama)  # 설정으로 등록한 모델
+    catalog = ModelCatalog(reg, ttl=60.0)
+
+    await catalog.refresh()
+    assert reg.get_backend("custom:1b") is ollama
+
+    ollama.models = ["new-model"]
+    await catalog.refresh()
+    assert reg.get_backend("new-model") is ollama
+    assert reg.resolve_model("custom:1b") is None
+    assert reg.resolve_model("bge-m3") == "bge-m3"  # 설정 모델은 유지
+
+
+@pytest.mark.asyncio
+async def test_offline_backend_keeps_previous_listing():
+    reg = ModelRegistry()
+    ollama = ListingBackend(["a"])
+    reg.register_backend("ollama", ollama)
+    catalog = ModelCatalog(reg, ttl=60.0)
+    await catalog.refresh()
+
+    ollama.models = None
+    await catalog.refresh()
+    assert [m.id for m in await catalog.models()] == ["a"]
+    assert reg.get_backend("a") is ollama
+    assert catalog.stats()["errors"] == {"ollama": "offline"}
+
+
+@pytest.mark.asyncio
+async def test_models_endpoint_served_from_catalog(client, monkeypatch):
+    reg = router_module.registry
+    backend = ListingBackend(["listed-model"])
+    monkeypatch.setattr(reg, "backends", {"stub": backend})
+    catalog = ModelCatalog(reg, ttl=60.0)
+    monkeypatch.setattr(router_module, "catalog", catalog)
+
+    for _ in range(3):
+        data = (await client.get("/v1/models")).json()["data"]
+        assert [m["id"] for m in data] == ["listed-model"]
+    assert backend.calls == 1
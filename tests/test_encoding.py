@@ -0,0 +1,172 @@
+import base64
+import json
+
+import httpx
+import pytest
+
+from embedding_gateway import metrics
+from embedding_gateway import router as router_module
+from embedding_gateway.backends.ollama import OllamaBackend
+from embedding_gateway.backends.tei import TEIBackend
+from embedding_gateway.cache import EmbeddingCache
+from embedding_gateway.models import UsageInfo
+from embedding_gateway.responses import raw_usage, rewrite_model
+from embedding_gateway.singleflight import SingleFlight
+from embedding_gateway.stub import StubConfig, create_app, deterministic_vector
+from embedding_gateway.vectors import format_embedding, pack_float32
+
+
+def _b64(values: list[float]) -> str:
+    return base64.b64encode(pack_float32(values)).decode("ascii")
+
+
+def test_format_embedding_float_to_base64():
+    assert format_embedding([0.5, 0.25, 1.0], "base64", 2) == _b64([0.5, 0.25])
+
+
+def test_format_embedding_base64_truncates_bytes():
+    assert format_embedding(_b64([0.5, 0.25, 1.0]), "base64", 1) == _b64([0.5])
+    assert format_embedding(_b64([0.5, 0.25]), "float") == [0.5, 0.25]
+
+
+@pytest.mark.asyncio
+async def test_tei_forwards_base64_encoding_format():
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["payload"] = json.loads(request.content)
+        return httpx.Response(200, json={
+            "data": [{"embedding": _b64([0.5, 0.25, 1.0]), "index": 0}],
+            "usage": {"prompt_tokens": 2, "total_tokens": 2},
+        })
+
+    tei = TEIBackend(
+        base_url="http://tei", default_model="m", available_models=["m"]
+    )
+    tei.client = httpx.AsyncClient(
+        base_url="http://tei", transport=httpx.MockTransport(handler)
+    )
+    result = await tei.embed(["hi"], "m", dimensions=2, encoding_format="base64")
+    await tei.close()
+
+    assert seen["payload"]["encoding_format"] == "base64"
+    assert result.data[0].embedding == _b64([0.5, 0.25])
+
+
+@pytest.mark.asyncio
+async def test_ollama_packs_base64_locally():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"embeddings": [[0.5, 0.25]]})
+
+    ollama = OllamaBackend(base_url="http://ollama")
+    ollama.client = httpx.AsyncClient(
+        base_url="http://ollama", transport=httpx.MockTransport(handler)
+    )
+    result = await ollama.embed(["hi"], "bge-m3", encoding_format="base64")
+    await ollama.close()
+
+    assert result.data[0].embedding == _b64([0.5, 0.25])
+
+
+def test_rewrite_model_replaces_only_model_field():
+    body = b'{"data":[{"embedding":[0.5],"index":0}],"model" : "org/m\\"x","usage":{}}'
+    assert rewrite_model(body, "alias") == (
+        b'{"data":[{"embedding":[0.5],"index":0}],"model":"alias","usage":{}}'
+    )
+    assert rewrite_model(b'{"data":[]}', "alias") is None
+
+
+def test_raw_usage_reads_only_usage_field():
+    body = b'{"data":[{"embedding":[0.5],"index":0}],"usage":{"prompt_tokens":7,"total_tokens":7}}'
+    assert raw_usage(body) == UsageInfo(prompt_tokens=7, total_tokens=7)
+    assert raw_usage(b'{"data":[]}') is None
+
+
+@pytest.mark.asyncio
+async def test_passthrough_returns_backend_bytes(client, monkeypatch):
+    body = (
+        b'{"object":"list","data":[{"object":"embedding","embedding":[0.1,0.2],'
+        b'"index":0}],"model":"backend-name","usage":{"prompt_tokens":1,"total_tokens":1}}'
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body)
+
+    tei = router_module.registry.get_backend("nlpai-lab/KURE-v1")
+    monkeypatch.setattr(tei, "docker_image", "")
+    monkeypatch.setattr(router_module, "passthrough", True)
+    tei.client = httpx.AsyncClient(
+        base_url="http://tei", transport=httpx.MockTransport(handler)
+    )
+
+    tokens = metrics.REQUEST_TOKENS.labels("nlpai-lab/KURE-v1", "tei")
+    before = tokens.value
+    r = await client.post(
+        "/v1/embeddings", json={"model": "nlpai-lab/KURE-v1", "input": "hi"}
+    )
+    assert r.content == body.replace(b'"backend-name"', b'"nlpai-lab/KURE-v1"')
+    # 캐시가 꺼져 있어도 usage는 집계
+    assert tokens.value == before + 1
+
+    # dimensions가 있으면 파싱 경로로 처리
+    r = await client.post(
+        "/v1/embeddings",
+        json={"model": "nlpai-lab/KURE-v1", "input": "hi", "dimensions": 1},
+    )
+    assert r.json()["data"][0]["embedding"] == [0.1]
+    assert r.json()["model"] == "nlpai-lab/KURE-v1"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fast_path", [True, False])
+async def test_alias_is_forwarded_as_resolved_model(client, monkeypatch, fast_path):
+    vllm = router_module.registry.get_backend("jinaai/jina-embeddings-v3")
+    stub = create_app(StubConfig(kind="vllm", models=["jinaai/jina-embeddings-v3"], dims=4))
+    monkeypatch.setattr(
+        vllm, "client", httpx.AsyncClient(transport=httpx.ASGITransport(stub), base_url="http://vllm")
+    )
+    monkeypatch.setattr(router_module, "passthrough", fast_path)
+
+    # HF short name + 대소문자 다른 이름: managed 백엔드는 등록 이름만 받음
+    r = await client.post(
+        "/v1/embeddings", json={"model": "Jina-Embeddings-V3", "input": "hi"}
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["model"] == "Jina-Embeddings-V3"
+    expected = deterministic_vector("jinaai/jina-embeddings-v3", "hi", 4)
+    assert r.json()["data"][0]["embedding"] == pytest.approx(expected, rel=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_passthrough_fills_cache_on_full_miss(client, monkeypatch):
+    body = (
+        b'{"object":"list","data":[{"object":"embedding","embedding":[0.5,0.25],'
+        b'"index":0}],"model":"backend-name","usage":{"prompt_tokens":3,"total_tokens":3}}'
+    )
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content))
+        return httpx.Response(200, content=body)
+
+    tei = router_module.registry.get_backend("nlpai-lab/KURE-v1")
+    monkeypatch.setattr(tei, "docker_image", "")
+    monkeypatch.setattr(router_module, "passthrough", True)
+    monkeypatch.setattr(router_module, "cache", EmbeddingCache(max_bytes=1 << 20))
+    monkeypatch.setattr(router_module, "singleflight", SingleFlight())
+    tei.client = httpx.AsyncClient(
+        base_url="http://tei", transport=httpx.MockTransport(handler)
+    )
+
+    r = await client.post(
+        "/v1/embeddings", json={"model": "nlpai-lab/KURE-v1", "input": "hi"}
+    )
+    assert r.content == body.replace(b'"backend-name"', b'"nlpai-lab/KURE-v1"')
+
+    # 캐시 hit은 백엔드를 호출하지 않고 일반 경로로 응답
+    r = await client.post(
+        "/v1/embeddings", json={"model": "nlpai-lab/KURE-v1", "input": ["hi"]}
+    )
+    assert r.json()["data"][0]["embedding"] == [0.5, 0.25]
+    assert r.json()["usage"]["prompt_tokens"] == 0
+    assert len(calls) == 1
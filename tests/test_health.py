@@ -1,5 +1,13 @@
+import asyncio
+import time
+
 import pytest
 
+from embedding_gateway import health as health_module
+from embedding_gateway import router as router_module
+from embedding_gateway.health import BackendHealth, HealthMonitor
+from embedding_gateway.registry import ModelRegistry
+
 
 @pytest.mark.asyncio
 async def test_health_reports_backend_status(client):
@@ -11,3 +19,66 @@ async def test_health_reports_backend_status(client):
     assert "vllm" in data["backends"]
     for backend_info in data["backends"].values():
         assert "status" in backend_info
+
+
+class SlowBackend:
+    starts_on_demand = False
+
+    def __init__(self, status: str, delay: float):
+        self.status = status
+        self.delay = delay
+        self.calls = 0
+
+    async def health_check(self) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"status": self.status}
+
+
+@pytest.mark.asyncio
+async def test_monitor_probes_concurrently_with_timeout():
+    reg = ModelRegistry()
+    reg.register_backend("a", SlowBackend("healthy", 0.2))
+    reg.register_backend("b", SlowBackend("healthy", 0.2))
+    reg.register_backend("dead", SlowBackend("healthy", 10.0))
+    monitor = HealthMonitor(reg, interval=60.0, timeout=0.3)
+
+    started = time.perf_counter()
+    snapshot = await monitor.probe_all()
+    assert time.perf_counter() - started < 1.0
+    assert snapshot["a"].healthy
+    assert "timed out" in snapshot["dead"].result["error"]
+    assert snapshot["dead"].consecutive_failures == 1
+
+
+@pytest.mark.asyncio
+async def test_health_served_from_snapshot(client, monkeypatch):
+    reg = health_module.registry
+    monitor = HealthMonitor(reg, interval=60.0, timeout=0.5)
+    monitor.snapshot = {
+        name: BackendHealth({"status": "healthy"}, time.time(), 1.0, 0)
+        for name in reg.backends
+    }
+    monkeypatch.setattr(health_module, "monitor", monitor)
+
+    data = (await client.get("/health")).json()
+    assert data["status"] == "healthy"
+    assert data["backends"]["ollama"]["latency_ms"] == 1.0
+    assert monitor.probes == 0
+    assert (await client.get("/health/ready")).json() == {"ready": True}
+
+
+@pytest.mark.asyncio
+async def test_router_fails_fast_for_backend_known_down(client, monkeypatch):
+    reg = health_module.registry
+    monitor = HealthMonitor(reg, interval=15.0)
+    ollama, tei = reg.backends["ollama"], reg.backends["tei"]
+    down = BackendHealth({"status": "unhealthy"}, time.time(), 1.0, 3)
+    monitor._by_backend = {ollama: down, tei: down}
+    monkeypatch.setattr(router_module, "health_monitor", monitor)
+
+    r = await client.post("/v1/embeddings", json={"model": "bge-m3", "input": "hi"})
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "15"
+    # managed 백엔드는 요청 시 컨테이너를 띄울 수 있으므로 거절하지 않음
+    assert not monitor.is_down(tei)
@@ -0,0 +1,90 @@
+import httpx
+import pytest
+
+from embedding_gateway import metrics
+from embedding_gateway import router as router_module
+from tests.helpers import FAKE_DOCKER, StubTEIBackend
+
+
+def test_histogram_renders_cumulative_buckets_and_escapes_labels():
+    reg = metrics.MetricsRegistry()
+    latency = reg.histogram("lat_seconds", "latency", ("model",), buckets=(0.1, 1.0))
+    child = latency.labels('a"b')
+    assert latency.labels('a"b') is child
+    for value in (0.05, 0.5, 5.0):
+        child.observe(value)
+    reg.counter("hits_total", "hits").labels().inc(3)
+
+    text = reg.render()
+    assert '# TYPE lat_seconds histogram' in text
+    assert 'lat_seconds_bucket{model="a\\"b",le="0.1"} 1' in text
+    assert 'lat_seconds_bucket{model="a\\"b",le="1"} 2' in text
+    assert 'lat_seconds_bucket{model="a\\"b",le="+Inf"} 3' in text
+    assert 'lat_seconds_count{model="a\\"b"} 3' in text
+    assert 'hits_total 3' in text
+    with pytest.raises(ValueError):
+        latency.labels("a", "b")
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_records_requests(client, monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={
+            "data": [{"embedding": [0.1, 0.2], "index": 0}],
+            "usage": {"prompt_tokens": 4, "total_tokens": 4},
+        })
+
+    tei = router_module.registry.get_backend("nlpai-lab/KURE-v1")
+    monkeypatch.setattr(tei, "docker_image", "")
+    tei.client = httpx.AsyncClient(
+        base_url="http://tei",
+        transport=httpx.MockTransport(handler),
+        event_hooks={"response": [metrics.response_hook("tei")]},
+    )
+    responses = metrics.BACKEND_RESPONSES.labels("tei", "200")
+    requests = metrics.REQUESTS.labels("nlpai-lab/KURE-v1", "tei", "200")
+    tokens = metrics.REQUEST_TOKENS.labels("nlpai-lab/KURE-v1", "tei")
+    duration = metrics.REQUEST_DURATION.labels("nlpai-lab/KURE-v1", "tei")
+    before = (responses.value, requests.value, tokens.value, sum(duration.counts))
+
+    r = await client.post(
+        "/v1/embeddings", json={"model": "nlpai-lab/KURE-v1", "input": ["a", "b"]}
+    )
+    assert r.status_code == 200
+    after = (responses.value, requests.value, tokens.value, sum(duration.counts))
+    assert after == (before[0] + 1, before[1] + 1, before[2] + 4, before[3] + 1)
+    assert metrics.INFLIGHT.labels("tei").value == 0
+
+    r = await client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    labels = 'model="nlpai-lab/KURE-v1",backend="tei"'
+    assert (
+        f'embedding_gateway_requests_total{{{labels},status="200"}} '
+        f"{int(requests.value)}"
+    ) in r.text
+    assert 'embedding_gateway_replica_healthy{backend="tei",url="http://localhost:8080"} 1' in r.text
+    router_module.request_metrics.clear()
+
+
+@pytest.mark.asyncio
+async def test_swap_metrics(docker_log):
+    tei = StubTEIBackend(
+        base_url="http://localhost:8080",
+        default_model="A",
+        available_models=["org/A", "org/B"],
+        docker_image="tei:test",
+        docker_command=FAKE_DOCKER,
+        swap_min_hold=0.0,
+    )
+    tei.health_poll_interval = 0.0
+    swaps = metrics.SWAP_DURATION.labels("tei", "recreate")
+    lock_waits = metrics.SWAP_LOCK_WAIT.labels("tei")
+    before = (sum(swaps.counts), sum(lock_waits.counts))
+
+    await tei.embed(["x"], "org/A")
+    await tei.embed(["x"], "org/B")
+
+    assert sum(swaps.counts) == before[0] + 2
+    assert sum(lock_waits.counts) == before[1] + 2
+    await tei.close()
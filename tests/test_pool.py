@@ -0,0 +1,110 @@
+import pytest
+
+from embedding_gateway.backends.vllm import VLLMBackend
+from tests.helpers import FAKE_DOCKER, StubTEIBackend
+
+
+def make_pool_backend(**kwargs) -> StubTEIBackend:
+    return StubTEIBackend(
+        base_url="http://localhost:8080",
+        default_model="A",
+        available_models=["A", "B", "C"],
+        docker_image="tei:test",
+        docker_command=FAKE_DOCKER,
+        pool_size=3,
+        pool_memory_mb=5000,
+        model_memory_mb={"A": 2000, "B": 2000, "C": 2000},
+        model_gpus={"B": "1"},
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_keeps_models_resident_on_distinct_ports(docker_log):
+    tei = make_pool_backend()
+
+    a = await tei.embed(["x"], "A")
+    b = await tei.embed(["x"], "B")
+    again = await tei.embed(["x"], "A")
+
+    assert a.data[0].embedding == [8080.0]
+    assert b.data[0].embedding == [8081.0]
+    assert again.data[0].embedding == [8080.0]
+    runs = [cmd for cmd in docker_log() if cmd[0] == "run"]
+    assert len(runs) == 2  # A 재요청은 컨테이너를 다시 띄우지 않음
+    assert "device=1" in runs[1]
+    assert tei.stats()["pool"]["memory_used_mb"] == 4000
+    await tei.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_removes_legacy_single_container_before_first_load(docker_log):
+    tei = make_pool_backend()
+    # recreate 모드로 띄운 단일 컨테이너가 기본 포트(slot 0)를 잡고 있음
+    rc, _, _ = await tei._run_cmd(tei._docker_cmd(
+        "run", "-d", "--name", "tei-embeddings", "-p", "8080:80", "tei:test", "--model-id", "A",
+    ))
+    assert rc == 0
+
+    await tei.embed(["x"], "A")
+    await tei.embed(["x"], "B")
+
+    commands = docker_log()[1:]
+    assert commands.count(["rm", "-f", "tei-embeddings"]) == 1
+    assert commands.index(["rm", "-f", "tei-embeddings"]) < next(
+        i for i, cmd in enumerate(commands) if cmd[0] == "run"
+    )
+    await tei.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_evicts_lru_model_over_budget(docker_log):
+    tei = make_pool_backend()
+
+    await tei.embed(["x"], "A")
+    await tei.embed(["x"], "B")
+    await tei.embed(["x"], "B")
+    c = await tei.embed(["x"], "C")
+
+    assert c.data[0].embedding == [8080.0]  # A가 내려가고 슬롯 0 재사용
+    assert sorted(tei.pool.slots) == ["B", "C"]
+    assert ["rm", "-f", "tei-embeddings-0"] in docker_log()[2:]
+    assert tei.stats()["pool"]["evictions"] == 1
+    health = await tei.health_check()
+    assert health["mode"] == "pool"
+    assert health["resident"] == {"B": "healthy", "C": "healthy"}
+    await tei.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_model_larger_than_budget(docker_log):
+    tei = make_pool_backend()
+    tei.pool.model_memory_mb["C"] = 9000
+
+    with pytest.raises(RuntimeError, match="pool budget"):
+        await tei.embed(["x"], "C")
+    await tei.close()
+
+
+def test_vllm_pool_slots_split_gpu_memory_utilization():
+    vllm = VLLMBackend(
+        base_url="http://localhost:8081",
+        default_model="A",
+        available_models=["A", "B"],
+        docker_image="vllm:test",
+        pool_size=2,
+        pool_memory_mb=8000,
+        model_memory_mb={"A": 2000, "B": 6000},
+    )
+    for model, expected in (("A", "0.2"), ("B", "0.6")):
+        args = vllm._run_args(model, "vllm-embeddings-0", 8081, None)
+        assert args[args.index("--gpu-memory-utilization") + 1] == expected
+
+    with pytest.raises(ValueError, match="VLLM_POOL_MEMORY_MB"):
+        VLLMBackend(
+            base_url="http://localhost:8081",
+            default_model="A",
+            available_models=["A", "B"],
+            docker_image="vllm:test",
+            pool_size=2,
+        )
@@ -0,0 +1,56 @@
+from embedding_gateway.registry import ModelRegistry
+
+
+class DummyBackend:
+    def __init__(self, models: list[str] | None = None):
+        self.models = models or []
+
+    async def list_models(self) -> list[str]:
+        return self.models
+
+
+def make_registry(*names: str) -> ModelRegistry:
+    reg = ModelRegistry()
+    backend = DummyBackend()
+    for name in names:
+        reg.register_model(name, backend)
+    return reg
+
+
+def test_aliases_ignore_latest_tag_case_and_org():
+    reg = make_registry("bge-m3", "nlpai-lab/KURE-v1", "org-a/e5", "org-b/e5")
+    assert reg.resolve_model("bge-m3:latest") == "bge-m3"
+    assert reg.resolve_model("BGE-M3") == "bge-m3"
+    assert reg.resolve_model("kure-v1") == "nlpai-lab/KURE-v1"
+    # 다른 org에 같은 이름이 있으면 짧은 alias는 쓰지 않음
+    assert reg.resolve_model("e5") is None
+
+
+def test_prefix_matching_is_deterministic():
+    names = ["qwen3-embedding:8b", "qwen3-embedding:0.6b", "qwen3-embedding:4b", "bge"]
+    forward = make_registry(*names)
+    backward = make_registry(*reversed(names))
+    for reg in (forward, backward):
+        assert reg.resolve_model("qwen3-embedding") == "qwen3-embedding:4b"
+        assert reg.resolve_model("qwen3-embedding:0.6b-q8") == "qwen3-embedding:0.6b"
+        assert reg.resolve_model("bge-m3") == "bge"
+        assert reg.resolve_model("unknown") is None
+
+
+async def test_memo_is_invalidated_when_models_are_discovered():
+    reg = make_registry("bge")
+    reg.register_backend("ollama", DummyBackend(["bge-m3"]))
+    assert reg.resolve_model("bge-m3:latest") == "bge"
+    assert reg.resolve_model("bge-m3:latest") == "bge"
+    assert reg.stats()["resolve_cache_hits"] == 1
+
+    await reg.discover_models()
+    assert reg.resolve_model("bge-m3:latest") == "bge-m3"
+
+
+def test_resolve_cache_is_bounded():
+    reg = ModelRegistry(resolve_cache_size=2)
+    reg.register_model("m", DummyBackend())
+    for name in ("a", "b", "c"):
+        reg.resolve_model(name)
+    assert reg.stats()["resolve_cache_size"] == 2
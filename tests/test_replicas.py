@@ -0,0 +1,122 @@
+import asyncio
+
+import httpx
+import pytest
+
+from embedding_gateway.backends.ollama import OllamaBackend
+from embedding_gateway.backends.replicas import ReplicaSet
+
+
+def make_replicas(handlers: dict, **kwargs) -> ReplicaSet:
+    return ReplicaSet(
+        list(handlers),
+        lambda url: httpx.AsyncClient(
+            base_url=url, transport=httpx.MockTransport(handlers[url])
+        ),
+        **kwargs,
+    )
+
+
+def ok(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"embeddings": [[float(request.url.port)]]})
+
+
+def down(request: httpx.Request) -> httpx.Response:
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+@pytest.mark.asyncio
+async def test_least_outstanding_prefers_idle_replica():
+    replicas = make_replicas({"http://a:1": ok, "http://b:2": ok})
+    a, b = replicas.replicas
+
+    async with replicas.use() as first:
+        async with replicas.use() as second:
+            assert {first, second} == {a, b}
+            assert (a.inflight, b.inflight) == (1, 1)
+    a.latency_ewma, b.latency_ewma = 0.5, 0.1
+    assert replicas.pick() is b
+    await replicas.close()
+
+
+@pytest.mark.asyncio
+async def test_ewma_policy_weighs_latency_by_load():
+    replicas = make_replicas({"http://a:1": ok, "http://b:2": ok}, policy="ewma")
+    a, b = replicas.replicas
+    a.latency_ewma, b.latency_ewma = 0.1, 0.3
+    assert replicas.pick() is a
+    a.inflight = 3  # 0.1 * 4 > 0.3 * 1
+    assert replicas.pick() is b
+    await replicas.close()
+
+
+@pytest.mark.asyncio
+async def test_ollama_ejects_failing_replica_and_readds_on_health():
+    state = {"b_up": False}
+
+    def flaky(request: httpx.Request) -> httpx.Response:
+        if not state["b_up"]:
+            return down(request)
+        return ok(request)
+
+    ollama = OllamaBackend(
+        base_url="http://a:1,http://b:2", eject_failures=1, retry_interval=60.0
+    )
+    for replica, handler in zip(ollama.replicas.replicas, (ok, flaky)):
+        replica.client = httpx.AsyncClient(
+            base_url=replica.url, transport=httpx.MockTransport(handler)
+        )
+    a, b = ollama.replicas.replicas
+    a.inflight = 1  # 첫 요청을 b로 보냄
+
+    with pytest.raises(httpx.ConnectError):
+        await ollama.embed(["x"], "bge-m3")
+    a.inflight = 0
+    assert not b.healthy
+
+    results = await asyncio.gather(*(ollama.embed(["x"], "bge-m3") for _ in range(3)))
+    assert all(r.data[0].embedding == [1.0] for r in results)
+
+    state["b_up"] = True
+    health = await ollama.health_check()
+    assert health["status"] == "healthy"
+    assert b.healthy
+    stats = ollama.stats()["replicas"]["replicas"]
+    assert stats["http://b:2"]["ejections"] == 1
+    assert stats["http://a:1"]["requests"] == 3
+    await ollama.close()
+
+
+@pytest.mark.asyncio
+async def test_5xx_responses_eject_replica():
+    from embedding_gateway.backends.tei import TEIBackend
+
+    def error(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503, text="overloaded")
+
+    ollama = OllamaBackend(base_url="http://a:1,http://b:2", eject_failures=2)
+    tei = TEIBackend(base_url="http://a:1,http://b:2", default_model="m",
+                     available_models=["m"], eject_failures=2)
+    for backend, errors in ((ollama, httpx.HTTPStatusError), (tei, RuntimeError)):
+        a, b = backend.replicas.replicas
+        a.client = httpx.AsyncClient(base_url=a.url, transport=httpx.MockTransport(ok))
+        b.client = httpx.AsyncClient(base_url=b.url, transport=httpx.MockTransport(error))
+        a.inflight = 1  # b로 보냄
+        for _ in range(2):
+            with pytest.raises(errors):
+                await backend.embed(["x"], "m")
+        assert not b.healthy
+        assert b.info()["failures"] == 2
+        await backend.close()
+
+
+def test_managed_mode_rejects_multiple_urls():
+    from embedding_gateway.backends.tei import TEIBackend
+
+    with pytest.raises(ValueError, match="single base URL"):
+        TEIBackend(
+            base_url="http://a:8080,http://b:8080",
+            default_model="m",
+            available_models=["m"],
+            docker_image="tei:test",
+        )
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from embedding_gateway import router as router_module
+from embedding_gateway.models import EmbeddingData, EmbeddingResponse, UsageInfo
+from embedding_gateway.singleflight import SingleFlight
+from embedding_gateway.vectors import to_float32
+
+
+class SlowBackend:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, texts: list[str]) -> EmbeddingResponse:
+        self.calls.append(texts)
+        await self.release.wait()
+        return EmbeddingResponse(
+            data=[
+                EmbeddingData(embedding=[float(len(t))], index=i)
+                for i, t in enumerate(texts)
+            ],
+            model="m",
+            usage=UsageInfo(prompt_tokens=len(texts), total_tokens=len(texts)),
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_call():
+    flight, backend = SingleFlight(), SlowBackend()
+
+    tasks = [
+        asyncio.create_task(flight.embed(backend, "m", None, ["hello", "hi"], "float"))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    backend.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert backend.calls == [["hello", "hi"]]
+    assert all(emb == [[5.0], [2.0]] for emb, _ in results)
+    assert results[0][1].prompt_tokens == 2
+    assert results[1][1].prompt_tokens == 0
+    stats = flight.stats()
+    assert stats["saved_backend_calls"] == 4
+    assert stats["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_overlapping_batches_send_only_new_texts():
+    flight, backend = SingleFlight(), SlowBackend()
+
+    first = asyncio.create_task(flight.embed(backend, "m", None, ["a", "bb"], "float"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(
+        flight.embed(backend, "m", None, ["bb", "ccc", "ccc"], "base64")
+    )
+    await asyncio.sleep(0)
+    backend.release.set()
+    (a, _), (b, _) = await asyncio.gather(first, second)
+
+    assert backend.calls == [["a", "bb"], ["ccc"]]
+    assert a == [[1.0], [2.0]]
+    assert [to_float32(v) for v in b] == [to_float32(x) for x in ([2.0], [3.0], [3.0])]
+    assert flight.stats()["duplicate_texts"] == 1
+    assert flight.stats()["coalesced_texts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_backend_error_reaches_every_waiter_and_clears_inflight():
+    flight = SingleFlight()
+    gate = asyncio.Event()
+
+    async def failing(texts):
+        await gate.wait()
+        raise RuntimeError("backend down")
+
+    tasks = [
+        asyncio.create_task(flight.embed(failing, "m", None, ["x"], "float"))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_inputs_fan_out_through_endpoint(client, monkeypatch):
+    monkeypatch.setattr(router_module, "singleflight", SingleFlight())
+    seen = []
+
+    async def fake_embed(texts, model, dimensions=None, encoding_format="float"):
+        seen.append(texts)
+        return EmbeddingResponse(
+            data=[EmbeddingData(embedding=[0.5], index=i) for i in range(len(texts))],
+            model=model,
+            usage=UsageInfo(prompt_tokens=1, total_tokens=1),
+        )
+
+    backend = router_module.registry.get_backend("bge-m3")
+    monkeypatch.setattr(backend, "embed", fake_embed)
+    r = await client.post(
+        "/v1/embeddings", json={"model": "bge-m3", "input": ["q", "q", "r", "q"]}
+    )
+
+    assert r.status_code == 200
+    assert seen == [["q", "r"]]
+    assert [d["index"] for d in r.json()["data"]] == [0, 1, 2, 3]
@@ -0,0 +1,89 @@
+import json
+import threading
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from embedding_gateway import router as router_module
+from embedding_gateway.cache import text_digest
+from embedding_gateway.store import EmbeddingStore, main as store_main
+from embedding_gateway.vectors import pack_float32
+
+
+def test_store_persists_across_reopen(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    store = EmbeddingStore(path, max_bytes=1 << 20)
+    store.put_many("bge-m3", None, [(text_digest("a"), pack_float32([0.5, 0.25]))])
+    store.close()
+
+    store = EmbeddingStore(path, max_bytes=1 << 20)
+    found = store.get_many("bge-m3", None, [text_digest("a"), text_digest("b")])
+    assert found == [pack_float32([0.5, 0.25]), None]
+    # 네임스페이스/dimensions가 다르면 조회되지 않음
+    assert store.get_many("KURE-v1", None, [text_digest("a")]) == [None]
+    assert store.get_many("bge-m3", 1, [text_digest("a")]) == [None]
+    store.close()
+
+
+def test_store_reads_do_not_wait_for_writer(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "emb.sqlite"), max_bytes=1 << 20)
+    store.put_many("m", None, [(text_digest("a"), pack_float32([0.5]))])
+    found = []
+    with store._lock:  # 큰 put_many/eviction이 진행 중인 상태
+        reader = threading.Thread(
+            target=lambda: found.extend(store.get_many("m", None, [text_digest("a")]))
+        )
+        reader.start()
+        reader.join(timeout=5)
+    assert found == [pack_float32([0.5])]
+    store.close()
+
+
+def test_store_size_cap_and_purge(tmp_path):
+    vec = pack_float32([0.5] * 64)  # 256 bytes
+    store = EmbeddingStore(str(tmp_path / "emb.sqlite"), max_bytes=len(vec) * 4)
+    store.put_many("m", None, [(text_digest(str(i)), vec) for i in range(8)])
+    assert store.stats()["bytes"] <= len(vec) * 4
+    assert store.stats()["evictions"] >= 4
+
+    store.put_many("other", None, [(text_digest("x"), vec)])
+    deleted = store.purge("m")
+    assert deleted > 0
+    assert [ns["model"] for ns in store.namespaces()] == ["other"]
+    store.compact()
+    store.close()
+
+
+def test_store_cli_list_and_purge(tmp_path, capsys):
+    path = str(tmp_path / "emb.sqlite")
+    store = EmbeddingStore(path, max_bytes=1 << 20)
+    store.put_many("bge-m3", None, [(text_digest("a"), pack_float32([0.5]))])
+    store.close()
+
+    store_main(["--path", path, "list"])
+    listed = json.loads(capsys.readouterr().out)
+    assert listed["models"][0]["model"] == "bge-m3"
+    assert listed["models"][0]["vectors"] == 1
+
+    store_main(["--path", path, "purge", "bge-m3"])
+    assert "Deleted 1" in capsys.readouterr().out
+
+
+@pytest.mark.asyncio
+async def test_embeddings_served_from_store(client, monkeypatch, tmp_path):
+    store = EmbeddingStore(str(tmp_path / "emb.sqlite"), max_bytes=1 << 20)
+    store.put_many("bge-m3", None, [(text_digest("Hello"), pack_float32([0.5, 0.25]))])
+    monkeypatch.setattr(router_module, "store", store)
+
+    with patch(
+        "embedding_gateway.backends.ollama.OllamaBackend.embed",
+        new_callable=AsyncMock,
+    ) as mock_embed:
+        response = await client.post(
+            "/v1/embeddings", json={"input": "Hello", "model": "bge-m3"}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["data"][0]["embedding"] == [0.5, 0.25]
+    mock_embed.assert_not_called()
+    store.close()
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from embedding_gateway import router as router_module
+from embedding_gateway.errors import BackendUnavailableError
+from embedding_gateway.models import EmbeddingData, EmbeddingResponse, UsageInfo
+
+
+class FakeBackend:
+    def __init__(self, fail_on: str | None = None):
+        self.calls: list[list[str]] = []
+        self.fail_on = fail_on
+
+    async def embed(self, texts, model, dimensions=None, encoding_format="float"):
+        self.calls.append(list(texts))
+        if self.fail_on == "busy":
+            raise BackendUnavailableError("backend down", retry_after=0.01)
+        if self.fail_on in texts:
+            raise RuntimeError("backend down")
+        return EmbeddingResponse(
+            data=[
+                EmbeddingData(embedding=[float(len(t))], index=i)
+                for i, t in enumerate(texts)
+            ],
+            model=model,
+            usage=UsageInfo(prompt_tokens=len(texts), total_tokens=len(texts)),
+        )
+
+
+@pytest.fixture
+def fake(client, monkeypatch):
+    fake = FakeBackend()
+    backend = router_module.registry.get_backend("bge-m3")
+    monkeypatch.setattr(backend, "embed", fake.embed)
+    monkeypatch.setattr(router_module, "STREAM_WINDOW", 3)
+    monkeypatch.setattr(router_module, "STREAM_CONCURRENCY", 2)
+    return fake
+
+
+def _ndjson(body: bytes) -> list[dict]:
+    return [json.loads(line) for line in body.splitlines()]
+
+
+async def _body(lines: list):
+    # 요청 본문이 줄 경계와 무관한 조각으로 나뉘어 들어와도 파싱되어야 함
+    data = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+    for i in range(0, len(data), 7):
+        yield data[i:i + 7]
+
+
+@pytest.mark.asyncio
+async def test_stream_returns_embeddings_in_order(client, fake):
+    inputs = ["a", {"input": "bb", "custom_id": "x"}, "ccc", "dddd", "e", "ff", "ggg"]
+    resp = await client.post("/v1/embeddings/stream?model=bge-m3", content=_body(inputs))
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+
+    lines = _ndjson(resp.content)
+    *items, summary = lines
+    assert [item["index"] for item in items] == list(range(7))
+    assert [item["embedding"] for item in items] == [[1.0], [2.0], [3.0], [4.0], [1.0], [2.0], [3.0]]
+    assert items[1]["custom_id"] == "x"
+    assert "custom_id" not in items[0]
+    assert summary == {
+        "object": "summary",
+        "model": "bge-m3",
+        "count": 7,
+        "usage": {"prompt_tokens": 7, "total_tokens": 7},
+    }
+    # window(3)마다 백엔드 호출
+    assert fake.calls == [["a", "bb", "ccc"], ["dddd", "e", "ff"], ["ggg"]]
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_errors_inline(client, fake):
+    resp = await client.post(
+        "/v1/embeddings/stream?model=bge-m3", content=b'"a"\n"b"\n"c"\n{"text": 1}\n'
+    )
+    assert resp.status_code == 200
+    *items, error = _ndjson(resp.content)
+    assert [item["index"] for item in items] == [0, 1, 2]
+    assert error["error"]["type"] == "invalid_request_error"
+    assert "line 4" in error["error"]["message"]
+
+    fake.fail_on = "e"
+    resp = await client.post("/v1/embeddings/stream?model=bge-m3", content=_body(list("abcdef")))
+    *items, error = _ndjson(resp.content)
+    assert [item["index"] for item in items] == [0, 1, 2]
+    assert error["error"]["type"] == "backend_error"
+
+
+@pytest.mark.asyncio
+async def test_stream_unknown_model(client):
+    resp = await client.post("/v1/embeddings/stream?model=nope", content=b'"a"\n')
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_stream_gives_up_on_busy_backend(client, fake, monkeypatch):
+    monkeypatch.setattr(router_module, "STREAM_BUSY_TIMEOUT", 0.05)
+    fake.fail_on = "busy"
+    resp = await client.post("/v1/embeddings/stream?model=bge-m3", content=_body(["a"]))
+    (error,) = _ndjson(resp.content)
+    assert error["error"]["type"] == "gateway_busy"
+    assert 2 <= len(fake.calls) <= 10
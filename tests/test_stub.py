@@ -0,0 +1,121 @@
+import asyncio
+import base64
+import socket
+import struct
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from embedding_gateway.backends.ollama import OllamaBackend
+from embedding_gateway.backends.tei import TEIBackend
+from embedding_gateway.stub import StubConfig, create_app, deterministic_vector, fake_docker
+
+
+def _client(app, base_url: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=base_url)
+
+
+def test_deterministic_vector_is_stable_and_normalized():
+    a = deterministic_vector("m", "hello", 16)
+    assert a == deterministic_vector("m", "hello", 16)
+    assert a != deterministic_vector("m", "world", 16)
+    assert a != deterministic_vector("other", "hello", 16)
+    assert abs(sum(v * v for v in a) - 1.0) < 1e-9
+
+
+@pytest.mark.asyncio
+async def test_ollama_stub_serves_backend():
+    app = create_app(StubConfig(kind="ollama", models=["bge-m3"], dims=8))
+    ollama = OllamaBackend(base_url="http://ollama")
+    ollama.client = _client(app, "http://ollama")
+
+    result = await ollama.embed(["a", "b"], "bge-m3")
+    assert [d.embedding for d in result.data] == [
+        deterministic_vector("bge-m3", t, 8) for t in ("a", "b")
+    ]
+    assert result.usage.prompt_tokens > 0
+    assert await ollama.list_models() == ["bge-m3"]
+    await ollama.close()
+
+
+@pytest.mark.asyncio
+async def test_tei_stub_info_base64_and_error_injection():
+    app = create_app(StubConfig(kind="tei", models=["org/A"], dims=4, error_rate=1.0, error_status=503))
+    async with _client(app, "http://tei") as client:
+        assert (await client.get("/info")).json()["model_id"] == "org/A"
+        r = await client.post("/v1/embeddings", json={"input": ["x"]})
+        assert r.status_code == 503
+
+    app = create_app(StubConfig(kind="tei", models=["org/A"], dims=4))
+    async with _client(app, "http://tei") as client:
+        r = await client.post("/v1/embeddings", json={"input": "x", "encoding_format": "base64"})
+        packed = base64.b64decode(r.json()["data"][0]["embedding"])
+        assert list(struct.unpack("<4f", packed)) == pytest.approx(
+            deterministic_vector("org/A", "x", 4), rel=1e-6
+        )
+
+
+@pytest.mark.asyncio
+async def test_stub_rejects_over_concurrency_limit():
+    app = create_app(StubConfig(
+        kind="vllm", models=["m"], dims=2, latency="fixed:50",
+        max_concurrency=1, reject_overload=True,
+    ))
+    async with _client(app, "http://vllm") as client:
+        responses = await asyncio.gather(*(
+            client.post("/v1/embeddings", json={"input": "x", "model": "m"})
+            for _ in range(3)
+        ))
+        assert sorted(r.status_code for r in responses) == [200, 429, 429]
+        assert (await client.get("/v1/models")).json()["data"][0]["id"] == "m"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_fake_docker_runs_managed_swap_end_to_end(tmp_path, monkeypatch):
+    monkeypatch.setenv("STUB_DOCKER_STATE", str(tmp_path))
+    monkeypatch.setenv("STUB_DIMS", "4")
+    port = _free_port()
+    tei = TEIBackend(
+        base_url=f"http://127.0.0.1:{port}",
+        default_model="org/A",
+        available_models=["org/A", "org/B"],
+        docker_image="stub",
+        container_name="stub-tei",
+        docker_command=[sys.executable, "-m", "embedding_gateway.stub", "docker"],
+        swap_min_hold=0.0,
+        swap_timeout=30.0,
+    )
+    tei.health_poll_interval = 0.1
+    try:
+        a = await tei.embed(["hello"], "org/A")
+        b = await tei.embed(["hello"], "org/B")
+        assert a.data[0].embedding == deterministic_vector("org/A", "hello", 4)
+        assert b.data[0].embedding == deterministic_vector("org/B", "hello", 4)
+        assert tei.stats()["swap_timings"]["recreate"]["count"] == 2
+    finally:
+        await tei.close()
+        assert fake_docker(["rm", "-f", "stub-tei"]) == 0
+    assert fake_docker(["ps", "-a"]) == 0
+
+
+def test_fake_docker_serializes_concurrent_commands(tmp_path, monkeypatch):
+    monkeypatch.setenv("STUB_DOCKER_STATE", str(tmp_path))
+    monkeypatch.setenv("STUB_DOCKER_SPAWN", "0")
+    cmd = [sys.executable, "-m", "embedding_gateway.stub", "docker"]
+    # 동시에 실행해도 컨테이너 기록이 사라지지 않아야 함
+    procs = [
+        subprocess.Popen([*cmd, "run", "-d", "--name", f"c{i}", "-p", f"{9000 + i}:80",
+                          "stub", "--model-id", "m"])
+        for i in range(8)
+    ]
+    assert [p.wait() for p in procs] == [0] * 8
+    out = subprocess.run([*cmd, "ps", "-a"], capture_output=True, text=True, check=True)
+    assert sorted(out.stdout.split()) == sorted(f"c{i}" for i in range(8))
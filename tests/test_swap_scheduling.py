@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from embedding_gateway.backends.tei import TEIBackend
+from embedding_gateway.errors import SwapWaitTooLongError
+from embedding_gateway.models import EmbeddingData, EmbeddingResponse, UsageInfo
+
+
+def make_backend(fail_swap: bool = False) -> TEIBackend:
+    tei = TEIBackend(
+        base_url="http://localhost:8080",
+        default_model="A",
+        available_models=["A", "B"],
+        docker_image="tei:test",
+        swap_min_hold=0.0,
+    )
+    tei.current_model = "A"
+    tei.swaps = []
+    tei.served = []
+
+    async def fake_swap(model_id):
+        await asyncio.sleep(0.01)
+        if fail_swap:
+            raise RuntimeError("docker run failed")
+        tei.swaps.append(model_id)
+        tei.current_model = model_id
+
+    async def fake_post(texts, model, dimensions, encoding_format, client=None):
+        assert tei.current_model == model
+        await asyncio.sleep(0.01)
+        tei.served.append(model)
+        return EmbeddingResponse(
+            data=[EmbeddingData(embedding=[0.5], index=0)],
+            model=model,
+            usage=UsageInfo(prompt_tokens=1, total_tokens=1),
+        )
+
+    tei._swap_model = fake_swap
+    tei._post_embeddings = fake_post
+    return tei
+
+
+@pytest.mark.asyncio
+async def test_alternating_models_swap_once():
+    tei = make_backend()
+
+    await asyncio.gather(*[tei.embed(["x"], m) for m in ("A", "B", "A", "B")])
+
+    assert tei.swaps == ["B"]
+    assert tei.served == ["A", "A", "B", "B"]
+    assert tei.scheduler.stats()["swaps"] == 1
+    assert "B" in tei.scheduler.swap_estimates
+    await tei.close()
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_estimated_swap_exceeds_tolerance():
+    tei = make_backend()
+    tei.scheduler.swap_estimates["B"] = 90.0
+
+    with pytest.raises(SwapWaitTooLongError) as exc:
+        await tei.scheduler.acquire("B", max_wait=30.0)
+    assert exc.value.retry_after == 90.0
+    assert tei.scheduler.stats()["rejected"] == 1
+    await tei.close()
+
+
+@pytest.mark.asyncio
+async def test_zero_tolerance_does_not_wait_for_swap():
+    tei = make_backend()
+    tei.scheduler.swap_estimates["B"] = 5.0
+
+    with pytest.raises(SwapWaitTooLongError):
+        await tei.scheduler.acquire("B", max_wait=0.0)
+    # 로딩된 모델은 그대로 처리
+    await tei.scheduler.acquire("A", max_wait=0.0)
+    tei.scheduler.release()
+    await tei.close()
+
+
+@pytest.mark.asyncio
+async def test_swap_failure_fails_waiters_and_keeps_serving_loaded_model():
+    tei = make_backend(fail_swap=True)
+
+    results = await asyncio.gather(
+        tei.embed(["x"], "B"), tei.embed(["y"], "B"), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    await tei.embed(["z"], "A")
+    assert tei.served == ["A"]
+    assert tei.scheduler.stats()["swap_failures"] == 1
+    await tei.close()
+
+
+@pytest.mark.asyncio
+async def test_max_swap_wait_header_returns_503(client):
+    from embedding_gateway import router as router_module
+
+    tei = router_module.registry.backends["tei"]
+    tei.scheduler.swap_estimates["nlpai-lab/KURE-v1"] = 120.0
+
+    response = await client.post(
+        "/v1/embeddings",
+        json={"input": "hi", "model": "nlpai-lab/KURE-v1"},
+        headers={"X-Max-Swap-Wait": "10"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "120"
@@ -0,0 +1,121 @@
+import pytest
+
+from tests.helpers import FAKE_DOCKER, StubTEIBackend
+
+
+def make_backend(strategy: str) -> StubTEIBackend:
+    tei = StubTEIBackend(
+        base_url="http://localhost:8080",
+        default_model="A",
+        available_models=["org/A", "org/B"],
+        docker_image="tei:test",
+        docker_command=FAKE_DOCKER,
+        swap_strategy=strategy,
+        swap_min_hold=0.0,
+    )
+    tei.health_poll_interval = 0.0
+    return tei
+
+
+@pytest.mark.asyncio
+async def test_reuse_strategy_creates_once_then_stops_and_starts(docker_log):
+    tei = make_backend("reuse")
+
+    for model in ("org/A", "org/B", "org/A", "org/B"):
+        await tei.embed(["x"], model)
+
+    commands = [cmd[:2] for cmd in docker_log()]
+    runs = [cmd for cmd in docker_log() if cmd[0] == "run"]
+    assert [r[r.index("--name") + 1] for r in runs] == [
+        "tei-embeddings.org-a", "tei-embeddings.org-b",
+    ]
+    assert ["start", "tei-embeddings.org-a"] in commands
+    assert ["stop", "tei-embeddings.org-b"] in commands
+    timings = tei.stats()["swap_timings"]
+    assert timings["create"]["count"] == 2
+    assert timings["start"]["count"] == 2
+    await tei.close()
+
+
+@pytest.mark.asyncio
+async def test_recreate_strategy_records_timings(docker_log):
+    tei = make_backend("recreate")
+
+    await tei.embed(["x"], "org/A")
+    await tei.embed(["x"], "org/B")
+
+    assert [cmd[0] for cmd in docker_log()] == ["rm", "run", "rm", "run"]
+    assert tei.stats()["swap_timings"]["recreate"]["count"] == 2
+    await tei.close()
+
+
+@pytest.mark.asyncio
+async def test_reuse_gc_removes_containers_of_dropped_models(docker_log):
+    tei = make_backend("reuse")
+    await tei.embed(["x"], "org/A")
+    await tei.embed(["x"], "org/B")
+
+    tei.available_models = ["org/B"]
+    removed = await tei.collect_garbage()
+
+    assert removed == ["tei-embeddings.org-a"]
+    await tei.close()
+
+
+def test_unknown_swap_strategy_rejected():
+    with pytest.raises(ValueError, match="swap strategy"):
+        make_backend("hot-swap")
+
+
+@pytest.mark.asyncio
+async def test_bluegreen_serves_old_model_during_swap_then_flips(docker_log):
+    import asyncio
+
+    tei = make_backend("bluegreen")
+    await tei.embed(["x"], "org/A")
+    assert tei.client.base_url.port == 8180  # 첫 스왑도 green 쪽에 띄움
+
+    started = asyncio.Event()
+    release = asyncio.Event()
+    wait_healthy = tei._wait_healthy
+
+    async def slow_healthy(client=None):
+        started.set()
+        await release.wait()
+        await wait_healthy(client)
+
+    tei._wait_healthy = slow_healthy
+    swap_to_b = asyncio.create_task(tei.embed(["x"], "org/B"))
+    await started.wait()
+
+    # 새 컨테이너가 뜨는 동안에도 org/A는 기존 컨테이너에서 바로 처리
+    during = await asyncio.wait_for(tei.embed(["x"], "org/A"), 1.0)
+    assert during.data[0].embedding == [8180.0]
+
+    release.set()
+    b = await swap_to_b
+    assert b.data[0].embedding == [8080.0]
+    await tei._drain_task
+
+    assert ["rm", "-f", "tei-embeddings-green"] in docker_log()
+    assert tei.stats()["swap_timings"]["bluegreen"]["count"] == 2
+    await tei.close()
+
+
+@pytest.mark.asyncio
+async def test_bluegreen_failed_warmup_keeps_old_container(docker_log):
+    tei = make_backend("bluegreen")
+    await tei.embed(["x"], "org/A")
+    old_client = tei.client
+
+    async def broken_healthy(client=None):
+        raise TimeoutError("not healthy")
+
+    tei._wait_healthy = broken_healthy
+    with pytest.raises(TimeoutError):
+        await tei.embed(["x"], "org/B")
+
+    assert tei.client is old_client
+    assert tei.current_model == "org/A"
+    assert docker_log()[-1] == ["rm", "-f", "tei-embeddings"]
+    await tei.close()
@@ -0,0 +1,146 @@
+import asyncio
+
+import httpx
+import pytest
+
+from embedding_gateway import metrics
+from embedding_gateway import router as router_module
+from embedding_gateway.admission import AdmissionController, ConcurrencyLimiter
+from embedding_gateway.tenants import Tenant, TenantRegistry, TokenBucket
+
+
+def test_token_bucket_take_charge_and_oversized_requests():
+    bucket = TokenBucket(rate=10.0, capacity=10.0)
+    assert bucket.take(25) == 0.0  # 가득 찬 bucket은 capacity보다 큰 요청도 통과
+    assert bucket.tokens < -14
+    assert bucket.take(1) == pytest.approx(1.6, abs=0.05)
+
+    bucket = TokenBucket(rate=100.0, capacity=100.0)
+    bucket.charge(150)
+    assert bucket.take(0) == pytest.approx(0.5, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_weighted_fair_queuing_across_tenants():
+    limiter = ConcurrencyLimiter("tei", max_concurrency=1, max_queue=10, weights={"a": 3.0})
+    await limiter.acquire()
+    order = []
+
+    async def request(tenant):
+        await limiter.acquire(tenant=tenant)
+        order.append(tenant)
+
+    # b가 먼저 쌓여 있어도 가중치 3인 a가 슬롯의 3/4를 받는다
+    tasks = [asyncio.create_task(request("b")) for _ in range(4)]
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(request("a")) for _ in range(4)]
+    await asyncio.sleep(0)
+    for _ in range(8):
+        limiter.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    assert order == ["a", "a", "b", "a", "a", "b", "b", "b"]
+
+
+def test_registry_identifies_tenants_by_key():
+    registry = TenantRegistry({"k1": "search"}, {"search": Tenant("search", weight=2.0)})
+    assert registry.identify("k1").name == "search"
+    assert registry.identify("unknown").name == "default"
+    assert registry.identify(None).name == "default"
+    assert registry.weights == {"search": 2.0, "default": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_gateway_throttles_tenant_and_records_metrics(client, monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={
+            "data": [{"embedding": [0.1], "index": 0}],
+            "usage": {"prompt_tokens": 5, "total_tokens": 5},
+        })
+
+    tei = router_module.registry.get_backend("nlpai-lab/KURE-v1")
+    monkeypatch.setattr(tei, "docker_image", "")
+    tei.client = httpx.AsyncClient(base_url="http://tei", transport=httpx.MockTransport(handler))
+    registry = TenantRegistry(
+        {"backfill-key": "backfill"},
+        {"backfill": Tenant("backfill", texts_per_second=0.5, burst_seconds=4.0)},
+    )
+    monkeypatch.setattr(router_module, "tenants", registry)
+    texts = metrics.TENANT_TEXTS.labels("backfill")
+    throttled = metrics.TENANT_THROTTLED.labels("backfill", "texts")
+    before = (texts.value, throttled.value)
+
+    async def post(**headers):
+        return await client.post(
+            "/v1/embeddings",
+            json={"model": "nlpai-lab/KURE-v1", "input": "hi"},
+            headers=headers,
+        )
+
+    assert (await post(**{"X-API-Key": "backfill-key"})).status_code == 200
+    assert (await post(Authorization="Bearer backfill-key")).status_code == 200
+    r = await post(**{"X-API-Key": "backfill-key"})
+    assert r.status_code == 429
+    assert int(r.headers["retry-after"]) >= 1
+    # 다른 tenant는 영향 없음
+    assert (await post()).status_code == 200
+
+    assert (texts.value - before[0], throttled.value - before[1]) == (2, 1)
+    stats = (await client.get("/stats")).json()["tenants"]
+    assert stats["backfill"]["throttled_texts"] == 1
+    assert stats["default"]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_admission_rejection_refunds_tenant_quota(client, monkeypatch):
+    tei = router_module.registry.get_backend("nlpai-lab/KURE-v1")
+    monkeypatch.setattr(tei, "docker_image", "")
+    registry = TenantRegistry(
+        {"k": "search"}, {"search": Tenant("search", texts_per_second=1.0, burst_seconds=3.0)}
+    )
+    monkeypatch.setattr(router_module, "tenants", registry)
+    limiter = ConcurrencyLimiter("tei", max_concurrency=1, max_queue=0)
+    await limiter.acquire()  # 슬롯이 가득 차 있어 바로 429
+    monkeypatch.setattr(router_module, "admission", AdmissionController({"tei": limiter}))
+
+    r = await client.post(
+        "/v1/embeddings",
+        json={"model": "nlpai-lab/KURE-v1", "input": ["a", "b", "c"]},
+        headers={"X-API-Key": "k"},
+    )
+    assert r.status_code == 429
+    assert limiter.stats()["rejected_queue_full"] == 1
+    # 처리되지 않은 요청은 tenant 한도를 소모하지 않는다
+    assert registry.tenants["search"].texts.tokens == pytest.approx(3.0)
+    assert registry.tenants["search"].throttled["texts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_token_limit_applies_to_passthrough_without_cache(client, monkeypatch):
+    body = (
+        b'{"object":"list","data":[{"object":"embedding","embedding":[0.1],"index":0}],'
+        b'"model":"nlpai-lab/KURE-v1","usage":{"prompt_tokens":50,"total_tokens":50}}'
+    )
+    tei = router_module.registry.get_backend("nlpai-lab/KURE-v1")
+    monkeypatch.setattr(tei, "docker_image", "")
+    tei.client = httpx.AsyncClient(
+        base_url="http://tei",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)),
+    )
+    monkeypatch.setattr(router_module, "passthrough", True)
+    monkeypatch.setattr(router_module, "cache", None)
+    monkeypatch.setattr(router_module, "store", None)
+    registry = TenantRegistry({"k": "search"}, {"search": Tenant("search", tokens_per_second=10.0)})
+    monkeypatch.setattr(router_module, "tenants", registry)
+
+    async def post():
+        return await client.post(
+            "/v1/embeddings", json={"model": "nlpai-lab/KURE-v1", "input": "hi"},
+            headers={"X-API-Key": "k"},
+        )
+
+    # passthrough 응답의 usage(50 tokens)로 사후 차감 → 다음 요청은 한도 초과
+    assert (await post()).content == body
+    r = await post()
+    assert r.status_code == 429
+    assert registry.tenants["search"].throttled["tokens"] == 1
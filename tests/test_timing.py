@@ -0,0 +1,91 @@
+import json
+import logging
+
+import httpx
+import pytest
+
+from embedding_gateway import context, timing
+from embedding_gateway import router as router_module
+from tests.helpers import FAKE_DOCKER, StubTEIBackend
+
+
+def _phases(header: str) -> dict[str, float]:
+    phases = {}
+    for part in header.split(", "):
+        name, dur = part.split(";dur=")
+        phases[name] = float(dur)
+    return phases
+
+
+@pytest.fixture
+def tei_remote(client, monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={
+            "data": [{"embedding": [0.1, 0.2], "index": 0}],
+            "usage": {"prompt_tokens": 3, "total_tokens": 3},
+        })
+
+    tei = router_module.registry.get_backend("nlpai-lab/KURE-v1")
+    monkeypatch.setattr(tei, "docker_image", "")
+    tei.client = httpx.AsyncClient(
+        base_url="http://tei", transport=httpx.MockTransport(handler)
+    )
+    return tei
+
+
+@pytest.mark.asyncio
+async def test_sampled_request_returns_server_timing_and_access_log(
+    client, tei_remote, monkeypatch, caplog
+):
+    monkeypatch.setattr(timing, "sample_rate", 1.0)
+    with caplog.at_level(logging.INFO, logger="embedding_gateway.access"):
+        r = await client.post(
+            "/v1/embeddings", json={"model": "nlpai-lab/KURE-v1", "input": "hi"}
+        )
+    assert r.status_code == 200
+
+    phases = _phases(r.headers["server-timing"])
+    assert {"resolve", "backend", "parse", "encode", "total"} <= set(phases)
+    assert phases["total"] >= phases["backend"]
+
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["resolved_model"] == "nlpai-lab/KURE-v1"
+    assert entry["backend"] == "tei"
+    assert entry["status"] == 200
+    assert entry["items"] == 1
+    assert entry["prompt_tokens"] == 3
+    assert set(entry["phases_ms"]) == set(phases)
+
+
+@pytest.mark.asyncio
+async def test_unsampled_request_has_no_server_timing(client, tei_remote, monkeypatch):
+    monkeypatch.setattr(timing, "sample_rate", 0.0)
+    r = await client.post(
+        "/v1/embeddings", json={"model": "nlpai-lab/KURE-v1", "input": "hi"}
+    )
+    assert r.status_code == 200
+    assert "server-timing" not in r.headers
+
+
+@pytest.mark.asyncio
+async def test_scheduler_wait_is_split_into_swap_and_queue(docker_log):
+    tei = StubTEIBackend(
+        base_url="http://localhost:8080",
+        default_model="A",
+        available_models=["org/A"],
+        docker_image="tei:test",
+        docker_command=FAKE_DOCKER,
+        swap_min_hold=0.0,
+    )
+    tei.health_poll_interval = 0.0
+    timer = timing.PhaseTimer()
+    token = context.timer.set(timer)
+    try:
+        await tei.embed(["x"], "org/A")
+    finally:
+        context.timer.reset(token)
+    await tei.close()
+
+    assert timer.phases["swap"] > 0
+    assert timer.phases["queue"] >= 0
+    assert "backend" in timer.phases
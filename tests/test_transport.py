@@ -0,0 +1,54 @@
+import httpx
+import pytest
+
+from embedding_gateway.backends import transport
+from embedding_gateway.backends.ollama import OllamaBackend
+from embedding_gateway.backends.transport import HTTPOptions, make_client, pool_stats, prewarm
+
+
+@pytest.mark.asyncio
+async def test_make_client_applies_pool_limits_and_split_timeouts():
+    options = HTTPOptions(max_connections=8, connect_timeout=2.0, pool_timeout=0.5)
+    client = make_client("http://tei", 30.0, options, "tei")
+
+    assert client.timeout.connect == 2.0
+    assert client.timeout.pool == 0.5
+    assert client.timeout.read == 30.0
+    assert pool_stats(client) == {
+        "connections": 0, "active": 0, "idle": 0, "max_connections": 8, "utilization": 0.0,
+    }
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_http2_falls_back_without_h2(monkeypatch):
+    monkeypatch.setattr(transport, "h2", None)
+    client = make_client("http://tei", 30.0, HTTPOptions(http2=True), "tei")
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_prewarm_sends_concurrent_requests():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"version": "x"})
+
+    ollama = OllamaBackend(base_url="http://ollama", http=HTTPOptions(prewarm=4))
+    ollama.client = httpx.AsyncClient(
+        base_url="http://ollama", transport=httpx.MockTransport(handler)
+    )
+    await ollama.prewarm()
+    assert seen == ["/api/version"] * 4
+    assert await prewarm(ollama.client, "/api/version", 0) == 0
+    await ollama.close()
+
+
+@pytest.mark.asyncio
+async def test_metrics_expose_pool_gauges(client):
+    r = await client.get("/metrics")
+    assert (
+        'embedding_gateway_http_pool_max_connections{backend="ollama",'
+        'url="http://localhost:11434"} 100'
+    ) in r.text